@@ -8,6 +8,7 @@ import logging
 import sqlite3
 from werkzeug.security import generate_password_hash
 from rezscan_app.config import Config
+from rezscan_app.models.database import connect
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +23,7 @@ hashed_pw = generate_password_hash(password)
 logger.info("Generated password hash for admin user")
 
 try:
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     c = conn.cursor()
 
     # Check if the users table exists first
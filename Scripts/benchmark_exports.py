@@ -0,0 +1,124 @@
+"""
+Benchmark the streaming audit log export against the old in-memory export.
+
+Builds a throwaway database with a synthetic audit log, then exports it
+both ways and prints wall time and peak Python memory for each.
+
+Usage:
+    python Scripts/benchmark_exports.py [--rows N] [--chunk-size N] [--memory]
+"""
+import sys
+import os
+import argparse
+import csv
+import io
+import logging
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytz
+from flask import Flask
+from rezscan_app.config import Config
+from rezscan_app.models.database import connect, init_db, close_db
+from rezscan_app.utils.exports import LocalTimeConverter, iter_csv
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ACTIONS = ['view', 'scan', 'scan_failed', 'error', 'export', 'check_out']
+QUERY = "SELECT timestamp, username, action, target, details FROM audit_log ORDER BY timestamp DESC"
+HEADER = ["Timestamp", "Username", "Action", "Target", "Details"]
+
+def populate(conn, rows, batch=100000):
+    now = datetime.utcnow()
+    for start in range(0, rows, batch):
+        entries = []
+        for _ in range(min(batch, rows - start)):
+            stamp = now - timedelta(seconds=random.randint(0, 365 * 86400))
+            details = 'Viewed page' if random.random() < 0.8 else f"Updated at {stamp.strftime('%Y-%m-%dT%H:%M:%S')}"
+            entries.append((f'user{random.randrange(50)}', random.choice(ACTIONS), 'page', stamp.strftime('%Y-%m-%d %H:%M:%S'), details))
+        conn.executemany("INSERT INTO audit_log (username, action, target, timestamp, details) VALUES (?, ?, ?, ?, ?)", entries)
+        conn.commit()
+
+def legacy_export(conn, local_tz):
+    # The pre-streaming implementation: fetchall, StringIO, then a BytesIO copy
+    def parse_and_convert_timestamp(text):
+        for match in re.findall(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?', text):
+            try:
+                utc_dt = pytz.utc.localize(datetime.fromisoformat(match.replace('T', ' ')))
+                text = text.replace(match, utc_dt.astimezone(local_tz).strftime('%m-%d-%Y %H:%M:%S'))
+            except ValueError:
+                continue
+        return text
+
+    rows = conn.execute(QUERY).fetchall()
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(HEADER)
+    for row in rows:
+        utc_dt = pytz.utc.localize(datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S'))
+        local_timestamp = utc_dt.astimezone(local_tz).strftime('%m-%d-%Y %H:%M:%S')
+        writer.writerow([local_timestamp, row[1], row[2], row[3], parse_and_convert_timestamp(row[4] or '')])
+    return len(io.BytesIO(output.getvalue().encode()).getvalue())
+
+def streaming_export(local_tz, chunk_size):
+    converter = LocalTimeConverter(local_tz)
+    format_row = lambda row: [converter.to_local_us(row[0]), row[1], row[2], row[3], converter.convert_text(row[4])]
+    return sum(len(chunk) for chunk in iter_csv(QUERY, [], HEADER, format_row=format_row, chunk_size=chunk_size))
+
+def measure(label, func, trace_memory=False):
+    # tracemalloc slows allocation-heavy code several times over, so timings
+    # and peak memory are reported from separate runs
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    size = func()
+    elapsed = time.perf_counter() - started
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label}: peak Python memory {peak / 1024 / 1024:.1f} MB")
+    else:
+        print(f"{label}: {elapsed:.2f} s, {size / 1024 / 1024:.1f} MB of CSV")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--skip-legacy', action='store_true', help="Only run the streaming export")
+    parser.add_argument('--memory', action='store_true', help="Also measure peak memory (slow)")
+    args = parser.parse_args()
+
+    local_tz = pytz.timezone(Config.TIMEZONE)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config.from_object(Config)
+        app.config['DB_PATH'] = os.path.join(tmp, 'benchmark.db')
+
+        with app.app_context():
+            init_db()
+            conn = connect(app.config['DB_PATH'])
+            print(f"Populating {args.rows} audit log rows...")
+            populate(conn, args.rows)
+
+            if not args.skip_legacy:
+                measure('in-memory export', lambda: legacy_export(conn, local_tz))
+                if args.memory:
+                    measure('in-memory export', lambda: legacy_export(conn, local_tz), trace_memory=True)
+            conn.close()
+
+        with app.test_request_context():
+            measure('streaming export', lambda: streaming_export(local_tz, args.chunk_size))
+            if args.memory:
+                measure('streaming export', lambda: streaming_export(local_tz, args.chunk_size), trace_memory=True)
+            close_db()
+
+if __name__ == "__main__":
+    main()
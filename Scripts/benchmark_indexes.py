@@ -0,0 +1,143 @@
+"""
+Benchmark the hot-path index pack (schema migration 2).
+
+Builds a throwaway database with synthetic scans, audit log and schedule
+data, then prints the query plan and timing for each hot query before and
+after migration 2's indexes are created.
+
+Usage:
+    python Scripts/benchmark_indexes.py [--scans N] [--audit N] [--residents N]
+"""
+import sys
+import os
+import argparse
+import logging
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from rezscan_app.config import Config
+from rezscan_app.models.database import connect, init_db
+from rezscan_app.models.migrations import MIGRATIONS
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+LOCATIONS = [('Unit 1', f'Location {i}', f'L{i}', 'Education') for i in range(20)]
+HOUSING = ['Delta', 'Echo', 'Foxtrot', 'Dorm 5', 'Dorm 6', 'A Pod', 'B North', 'B South']
+ACTIONS = ['view', 'scan', 'scan_failed', 'error', 'export', 'check_out']
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+QUERIES = [
+    ('scans today (range)', "SELECT COUNT(*) FROM scans WHERE timestamp >= ? AND timestamp < ?", 'today'),
+    ('scan log first page', "SELECT * FROM scans ORDER BY timestamp DESC LIMIT 10", ()),
+    ('location activity', "SELECT COUNT(*) FROM scans WHERE location = ? AND timestamp >= ?", 'location'),
+    ('scans by status', "SELECT COUNT(*) FROM scans WHERE status = ?", ('Out',)),
+    ('audit log first page', "SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT 10", ()),
+    ('audit log by action', "SELECT * FROM audit_log WHERE action = ? ORDER BY timestamp DESC LIMIT 10", ('export',)),
+    ('audit log by user', "SELECT COUNT(*) FROM audit_log WHERE username = ?", ('user7',)),
+    ('residents in group', "SELECT mdoc FROM resident_schedules WHERE group_id = ?", (42,)),
+    ('groups for resident', "SELECT group_id FROM resident_schedules WHERE mdoc = ?", ('100042',)),
+    ('blocks for group/day', "SELECT * FROM schedule_blocks WHERE group_id = ? AND day_of_week = ?", (42, 'Monday')),
+    ('residents in housing', "SELECT COUNT(*) FROM residents WHERE housing_unit = ?", ('Echo',)),
+    ('location by prefix', "SELECT name FROM locations WHERE prefix = ? COLLATE NOCASE", ('l7',)),
+]
+
+def populate(conn, scans, audit, residents):
+    now = datetime.now()
+    stamp = lambda: (now - timedelta(seconds=random.randint(0, 90 * 86400))).strftime('%Y-%m-%d %H:%M:%S')
+    conn.executemany("INSERT INTO locations (bldg, name, prefix, type) VALUES (?, ?, ?, ?)", LOCATIONS)
+    conn.executemany(
+        "INSERT INTO residents (name, mdoc, housing_unit) VALUES (?, ?, ?)",
+        [(f'Resident {i}', str(100000 + i), random.choice(HOUSING)) for i in range(residents)]
+    )
+    conn.executemany(
+        "INSERT INTO scans (mdoc, timestamp, status, location) VALUES (?, ?, ?, ?)",
+        [(str(100000 + random.randrange(residents)), stamp(), random.choice(['In', 'Out']), random.choice(LOCATIONS)[1])
+         for _ in range(scans)]
+    )
+    conn.executemany(
+        "INSERT INTO audit_log (username, action, target, timestamp, details) VALUES (?, ?, ?, ?, ?)",
+        [(f'user{random.randrange(50)}', random.choice(ACTIONS), 'page', stamp(), 'benchmark') for _ in range(audit)]
+    )
+    conn.executemany(
+        "INSERT INTO schedule_groups (name, category) VALUES (?, ?)",
+        [(f'Group {i}', 'Education') for i in range(200)]
+    )
+    conn.executemany(
+        "INSERT INTO schedule_blocks (group_id, day_of_week, location, start_time, end_time) VALUES (?, ?, ?, ?, ?)",
+        [(g, d, 'Location 1', '08:00', '09:00') for g in range(1, 201) for d in DAYS]
+    )
+    conn.executemany(
+        "INSERT INTO resident_schedules (mdoc, group_id) VALUES (?, ?)",
+        [(str(100000 + random.randrange(residents)), random.randint(1, 200)) for _ in range(residents * 3)]
+    )
+    conn.commit()
+
+def resolve_params(params):
+    today = datetime.now().strftime('%Y-%m-%d')
+    if params == 'today':
+        return (f'{today} 00:00:00', f'{today} 23:59:59')
+    if params == 'location':
+        return ('Location 3', (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S'))
+    return params
+
+def measure(conn, repeat=5):
+    results = {}
+    for label, sql, params in QUERIES:
+        params = resolve_params(params)
+        plan = '; '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+        started = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql, params).fetchall()
+        results[label] = (plan, (time.perf_counter() - started) * 1000 / repeat)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scans', type=int, default=200000)
+    parser.add_argument('--audit', type=int, default=200000)
+    parser.add_argument('--residents', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config.from_object(Config)
+        app.config['DB_PATH'] = os.path.join(tmp, 'benchmark.db')
+
+        with app.app_context():
+            # Create the full schema, then drop migration 2's indexes to get the
+            # "before" state; the rest of the migration chain stays applied
+            init_db()
+            conn = connect(app.config['DB_PATH'])
+            index_statements = next(statements for version, _, statements in MIGRATIONS if version == 2)
+            for statement in index_statements:
+                if statement.startswith('CREATE INDEX'):
+                    conn.execute(f"DROP INDEX IF EXISTS {statement.split()[5]}")
+            conn.commit()
+
+            print(f"Populating {args.scans} scans, {args.audit} audit rows, {args.residents} residents...")
+            populate(conn, args.scans, args.audit, args.residents)
+            conn.execute("ANALYZE")
+            before = measure(conn)
+
+            for statement in index_statements:
+                conn.execute(statement)
+            conn.commit()
+            after = measure(conn)
+            conn.close()
+
+    for label, _, _ in QUERIES:
+        plan_before, ms_before = before[label]
+        plan_after, ms_after = after[label]
+        print(f"\n{label}: {ms_before:.2f} ms -> {ms_after:.2f} ms")
+        print(f"  before: {plan_before}")
+        print(f"  after:  {plan_after}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark the movement schedule PDF parser.
+
+Generates a synthetic movement schedule PDF (200 pages by default) with
+reportlab, then times the old PyPDF2 path (if PyPDF2 is installed), pdfium
+in a single process, and pdfium across the process pool: once with a cold
+pool (the first large upload in a worker pays for spawning it) and once
+warm. The pool is capped at one process per CPU, so on a machine with
+fewer CPUs than --workers the parallel runs use fewer processes.
+
+Usage:
+    python Scripts/benchmark_pdf_parser.py [--pages N] [--workers N] [--pages-per-task N]
+"""
+import sys
+import os
+import argparse
+import logging
+import random
+import tempfile
+import time
+
+# Project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from rezscan_app.utils.schedule_parser import parse_schedule_blocks, parse_ocr_text
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ROOMS = ['Rm 101 Math', 'Rm 109 Reading', 'WC Art Room', 'CR 2 Welding', 'Unit 3 Study Hall']
+SURNAMES = ['SMITH', 'JOHNSON', 'WILLIAMS', 'BROWN', 'JONES', 'GARCIA', 'MILLER', 'DAVIS', 'LOPEZ', 'WILSON']
+GIVEN = ['JAMES', 'MARY', 'ROBERT', 'PATRICIA', 'JOHN', 'JENNIFER', 'MICHAEL', 'LINDA', 'DAVID', 'ANN']
+
+def build_pdf(path, pages, blocks_per_page=4, residents_per_block=10):
+    pdf = canvas.Canvas(path, pagesize=letter)
+    for page in range(pages):
+        y = 750
+        for block in range(blocks_per_page):
+            hour = 7 + (page + block) % 10
+            pdf.drawString(50, y, f"{hour}:00 - {hour + 1}:00 {random.choice(ROOMS)}")
+            y -= 15
+            for _ in range(residents_per_block):
+                name = f"{random.choice(SURNAMES)}, {random.choice(GIVEN)}"
+                pdf.drawString(70, y, f"{name} - {random.randint(100000, 999999)} - Dorm {random.randint(1, 6)}")
+                y -= 14
+            y -= 8
+        pdf.showPage()
+    pdf.save()
+
+def parse_legacy(path):
+    """The previous implementation: PyPDF2 and string concatenation."""
+    from PyPDF2 import PdfReader
+    text = ""
+    with open(path, "rb") as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return parse_ocr_text(text)
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    blocks = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    residents = sum(len(b['residents']) for b in blocks)
+    print(f"{label:<28} {elapsed:8.2f}s  {len(blocks):6d} blocks  {residents:7d} resident lines")
+    return blocks
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the movement schedule PDF parser.")
+    parser.add_argument('--pages', type=int, default=200, help="Pages in the synthetic schedule")
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help="Worker processes for the parallel run")
+    parser.add_argument('--pages-per-task', type=int, default=10, help="Pages per worker task")
+    parser.add_argument('--skip-legacy', action='store_true', help="Skip the PyPDF2 run")
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'movement.pdf')
+        start = time.perf_counter()
+        build_pdf(path, args.pages)
+        print(f"Built {args.pages}-page schedule ({os.path.getsize(path) // 1024} KiB) in {time.perf_counter() - start:.2f}s")
+
+        if not args.skip_legacy:
+            try:
+                timed("PyPDF2 (legacy)", parse_legacy, path)
+            except ImportError:
+                print("PyPDF2 not installed; skipping the legacy run")
+        serial = timed("pdfium, 1 process", parse_schedule_blocks, path, workers=1, pages_per_task=args.pages_per_task)
+        processes = min(args.workers, os.cpu_count() or 1)
+        for run in ('cold', 'warm'):
+            parallel = timed(f"pdfium, {processes} processes ({run})", parse_schedule_blocks, path,
+                             workers=args.workers, pages_per_task=args.pages_per_task, parallel_min_pages=0)
+            if serial != parallel:
+                logger.error("Serial and parallel runs produced different blocks")
+                return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
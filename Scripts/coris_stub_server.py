@@ -0,0 +1,145 @@
+"""
+Local stand-in for the CORIS residents API, for exercising the sync client.
+
+Serves synthetic residents as paged JSON ({"results": [...], "next": url})
+or, with --unpaged, as one bare JSON array. Honours page_size,
+updated_since and If-None-Match (answering 304 while the data is unchanged).
+POST /touch?count=N marks N residents as changed so an incremental sync has
+something to fetch.
+
+Usage:
+    python Scripts/coris_stub_server.py [--port 8765] [--residents N] [--unpaged]
+    CORIS_API_URL=http://127.0.0.1:8765/api/residents flask run
+"""
+import sys
+import argparse
+import json
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+AREAS = ['North', 'South', 'East', 'West']
+HOUSING = ['A Walk', 'B Walk', 'Women Ctr', 'Dorm 1', 'Dorm 2']
+
+class Dataset:
+    def __init__(self, count):
+        self.lock = threading.Lock()
+        self.clock = datetime(2024, 1, 1)
+        self.version = 0
+        self.residents = [self._make(i) for i in range(count)]
+
+    def _tick(self):
+        self.clock += timedelta(seconds=1)
+        return self.clock.isoformat()
+
+    def _make(self, i):
+        return {
+            'mdoc': str(100000 + i),
+            'name': f"Resident {i}",
+            'area': random.choice(AREAS),
+            'housing_unit': random.choice(HOUSING),
+            'level': str(random.randint(1, 4)),
+            'photo': '',
+            'updated_at': self._tick()
+        }
+
+    def touch(self, count):
+        with self.lock:
+            for resident in random.sample(self.residents, min(count, len(self.residents))):
+                resident['level'] = str(random.randint(1, 4))
+                resident['updated_at'] = self._tick()
+            self.version += 1
+
+    def etag(self):
+        return f'"v{self.version}"'
+
+    def changed_since(self, since):
+        with self.lock:
+            rows = [r for r in self.residents if not since or r['updated_at'] > since]
+        return sorted(rows, key=lambda r: (r['updated_at'], r['mdoc']))
+
+def make_handler(dataset, unpaged, api_key):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status, body, headers=None):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path != '/api/residents':
+                return self._send_json(404, {'error': 'not found'})
+            if api_key and self.headers.get('Authorization') != f'Bearer {api_key}':
+                return self._send_json(401, {'error': 'unauthorized'})
+
+            query = parse_qs(parsed.query)
+            since = query.get('updated_since', [None])[0]
+            page_size = int(query.get('page_size', [500])[0])
+            page = int(query.get('page', [1])[0])
+
+            etag = dataset.etag()
+            if page == 1 and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            rows = dataset.changed_since(since)
+            if unpaged:
+                return self._send_json(200, rows, {'ETag': etag})
+
+            start = (page - 1) * page_size
+            body = {'results': rows[start:start + page_size], 'next': None}
+            if start + page_size < len(rows):
+                params = {'page': page + 1, 'page_size': page_size}
+                if since:
+                    params['updated_since'] = since
+                body['next'] = f"{parsed.path}?{urlencode(params)}"
+            self._send_json(200, body, {'ETag': etag})
+
+        def do_POST(self):
+            parsed = urlparse(self.path)
+            if parsed.path != '/touch':
+                return self._send_json(404, {'error': 'not found'})
+            count = int(parse_qs(parsed.query).get('count', [10])[0])
+            dataset.touch(count)
+            self._send_json(200, {'touched': count, 'version': dataset.version})
+
+        def log_message(self, format, *args):
+            logger.info(format % args)
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a stub CORIS residents API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--residents', type=int, default=5000, help="Number of synthetic residents")
+    parser.add_argument('--unpaged', action='store_true', help="Return one bare JSON array instead of pages")
+    parser.add_argument('--api-key', default='', help="Require this bearer token (default: accept any)")
+    args = parser.parse_args()
+
+    dataset = Dataset(args.residents)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(dataset, args.unpaged, args.api_key))
+    logger.info(f"Stub CORIS API with {args.residents} residents on http://{args.host}:{args.port}/api/residents")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Generate rezscan_app/routes/manifest.py, the list of blueprints create_app() registers.
+
+Reads every module under rezscan_app/routes/ as source (nothing is imported)
+and records each module-level `name = Blueprint(...)` assignment. Fails if
+two blueprints are registered under the same name.
+
+Run it after adding, renaming or removing a blueprint. With --check it only
+reports whether the committed manifest is up to date (exit 1 if not).
+
+Usage:
+    python Scripts/generate_blueprint_manifest.py [--check]
+"""
+import sys
+import argparse
+import ast
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ROUTES_DIR = PROJECT_ROOT / 'rezscan_app' / 'routes'
+MANIFEST_PATH = ROUTES_DIR / 'manifest.py'
+
+HEADER = '''# Generated by Scripts/generate_blueprint_manifest.py -- do not edit by hand.
+# Regenerate after adding, renaming or removing a blueprint.
+
+# (module, blueprint variable) pairs registered by create_app(), in order
+BLUEPRINTS = [
+'''
+
+def find_blueprints():
+    """
+    Return [(module, variable, blueprint name)] for every route module, sorted by module.
+
+    Raises:
+        SystemExit: If two blueprints are registered under the same name.
+    """
+    found = []
+    for path in sorted(ROUTES_DIR.rglob('*.py')):
+        if path.name.startswith('__') or path == MANIFEST_PATH:
+            continue
+        module = 'rezscan_app.' + '.'.join(path.relative_to(ROUTES_DIR.parent).with_suffix('').parts)
+        tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+        for node in tree.body:
+            if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)):
+                continue
+            func = node.value.func
+            if getattr(func, 'id', getattr(func, 'attr', None)) != 'Blueprint':
+                continue
+            name_arg = node.value.args[0] if node.value.args else None
+            name = name_arg.value if isinstance(name_arg, ast.Constant) else None
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    found.append((module, target.id, name))
+
+    seen = {}
+    for module, variable, name in found:
+        if name in seen:
+            raise SystemExit(f"Blueprint name '{name}' is defined in both {seen[name]} and {module}.{variable}")
+        seen[name] = f"{module}.{variable}"
+    return found
+
+def render(blueprints):
+    lines = [HEADER]
+    for module, variable, name in blueprints:
+        lines.append(f"    ({module!r}, {variable!r}),  # {name}\n")
+    lines.append("]\n")
+    return ''.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the static blueprint manifest.")
+    parser.add_argument('--check', action='store_true', help="Only check that the manifest is up to date")
+    args = parser.parse_args()
+
+    blueprints = find_blueprints()
+    content = render(blueprints)
+    current = MANIFEST_PATH.read_text(encoding='utf-8') if MANIFEST_PATH.exists() else None
+    if args.check:
+        if content != current:
+            print(f"{MANIFEST_PATH.relative_to(PROJECT_ROOT)} is out of date; run {Path(__file__).name}.")
+            return 1
+        print("Blueprint manifest is up to date.")
+        return 0
+
+    if content == current:
+        print("Blueprint manifest is already up to date.")
+        return 0
+    MANIFEST_PATH.write_text(content, encoding='utf-8')
+    print(f"Wrote {MANIFEST_PATH.relative_to(PROJECT_ROOT)} with {len(blueprints)} blueprints.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
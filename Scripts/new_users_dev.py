@@ -9,6 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 try:
     from rezscan_app.config import Config
+    from rezscan_app.models.database import connect
 except ImportError as e:
     print("Error: Could not import Config. Ensure you are running this from the correct project directory.")
     raise e
@@ -32,7 +33,7 @@ def main():
     c = None
 
     try:
-        with sqlite3.connect(db_path) as conn:
+        with connect(db_path) as conn:
             c = conn.cursor()
 
             # Check if the users table exists
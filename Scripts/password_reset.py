@@ -4,6 +4,11 @@ import logging
 import sqlite3
 from werkzeug.security import generate_password_hash
 
+# Project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rezscan_app.models.database import connect
+
 # --- Configure Logging ---
 logger = logging.getLogger(__name__)
 
@@ -25,7 +30,7 @@ try:
         logger.error(f"Database file does not exist at {db_path}")
         raise FileNotFoundError(f"Database file not found: {db_path}")
 
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     c = conn.cursor()
 
     # Check if the users table exists first
@@ -0,0 +1,116 @@
+"""
+Report where worker start-up time goes.
+
+Runs create_app() in a fresh interpreter under `python -X importtime`,
+then prints the cumulative import time of each route module (i.e. each
+blueprint) and of the app's utility modules, slowest first. It also lists
+any heavy optional library loaded at start-up and the module that pulled
+it in. A dependency shared by several modules is counted against the
+first one to import it. With --check it exits non-zero if a heavy library is loaded at
+start-up, so it can be run as a check before deploying.
+
+Usage:
+    python Scripts/profile_startup.py [--top N] [--check]
+"""
+import sys
+import os
+import argparse
+import subprocess
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Libraries that must only be imported by the code paths that use them
+HEAVY_MODULES = ('pandas', 'numpy', 'reportlab', 'pypdfium2', 'pdfplumber', 'PyPDF2', 'requests', 'PIL', 'ijson')
+
+# create_app() loads route modules with importlib.import_module, which -X
+# importtime does not log, so __import__ each blueprint module first to
+# attribute its dependencies
+STARTUP_CODE = """
+import rezscan_app
+from rezscan_app.routes.manifest import BLUEPRINTS
+for module_name, _ in BLUEPRINTS:
+    __import__(module_name)
+rezscan_app.create_app()
+"""
+
+def run_importtime():
+    """Run create_app() under -X importtime; return (stderr lines, wall seconds)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"create_app() failed with exit code {result.returncode}")
+    return result.stderr.splitlines(), elapsed
+
+def parse_importtime(lines):
+    """
+    Parse -X importtime output.
+
+    Returns:
+        List of (module, cumulative_us, ancestors) in import order, where
+        ancestors are the modules whose import triggered this one,
+        outermost first.
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        name = name[1:]  # Drop the separator's space; the rest is indentation
+        level = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(cumulative_us), level))
+
+    # Children are printed before their parent, so walk backwards keeping
+    # the chain of enclosing imports on a stack
+    parsed = []
+    stack = []
+    for module, cumulative_us, level in reversed(entries):
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        parsed.append((module, cumulative_us, [name for _, name in stack]))
+        stack.append((level, module))
+    parsed.reverse()
+    return parsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile module import time during create_app().")
+    parser.add_argument('--top', type=int, default=15, help="Utility modules to list")
+    parser.add_argument('--check', action='store_true', help="Exit 1 if a heavy library is imported at start-up")
+    args = parser.parse_args()
+
+    lines, elapsed = run_importtime()
+    parsed = parse_importtime(lines)
+    total_us = sum(cumulative_us for _, cumulative_us, ancestors in parsed if not ancestors)
+    print(f"create_app() in a fresh interpreter: {elapsed:.2f}s wall, {total_us / 1000:.0f}ms importing")
+
+    routes = [(m, us) for m, us, _ in parsed if m.startswith('rezscan_app.routes.') and m.count('.') == 3]
+    print("\nRoute modules (blueprints), cumulative import time:")
+    for module, us in sorted(routes, key=lambda item: -item[1]):
+        print(f"  {us / 1000:8.1f}ms  {module}")
+
+    utils = [(m, us) for m, us, _ in parsed if m.startswith('rezscan_app.utils.') or m.startswith('rezscan_app.models.')]
+    print(f"\nSlowest rezscan_app.utils / models modules (top {args.top}):")
+    for module, us in sorted(utils, key=lambda item: -item[1])[:args.top]:
+        print(f"  {us / 1000:8.1f}ms  {module}")
+
+    # Only the outermost heavy import of each chain (e.g. reportlab, not the PIL it loads)
+    heavy = [(m, us, ancestors) for m, us, ancestors in parsed
+             if m in HEAVY_MODULES and not any(name.split('.')[0] in HEAVY_MODULES for name in ancestors)]
+    if heavy:
+        print("\nHeavy libraries loaded at start-up:")
+        for module, us, ancestors in heavy:
+            app_chain = [name for name in ancestors if name.startswith('rezscan_app')]
+            via = app_chain[-1] if app_chain else (ancestors[-1] if ancestors else 'top level')
+            print(f"  {us / 1000:8.1f}ms  {module} (imported by {via})")
+    else:
+        print("\nNo heavy libraries loaded at start-up.")
+
+    return 1 if args.check and heavy else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import sys
+import os
+import logging
+import sqlite3
+
+# Project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from rezscan_app.config import Config
+    from rezscan_app.models.database import connect, rebuild_resident_current_status
+except ImportError as e:
+    print("Error: Could not import rezscan_app. Ensure you are running this from the correct project directory.")
+    raise e
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    db_path = Config.DB_PATH
+    logger.info(f"Database path set to: {db_path}")
+
+    try:
+        with connect(db_path) as conn:
+            c = conn.cursor()
+
+            # Check if the resident_current_status table exists
+            c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='resident_current_status';")
+            if not c.fetchone():
+                logger.error("resident_current_status table does not exist. Please run the application once to initialize the database.")
+                raise Exception("resident_current_status table missing.")
+
+            count = rebuild_resident_current_status(conn)
+            conn.commit()
+            print(f"Rebuilt current status for {count} residents.")
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
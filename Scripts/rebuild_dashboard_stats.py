@@ -0,0 +1,69 @@
+"""
+Verify or rebuild the scan counters behind the dashboard statistics.
+
+Compares the counter-backed statistics with ones computed from the scans
+table and, with --rebuild, recreates the counters from scratch first.
+
+Usage:
+    python Scripts/rebuild_dashboard_stats.py [--rebuild] [--day YYYY-MM-DD]
+"""
+import sys
+import os
+import argparse
+import logging
+import sqlite3
+
+# Project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from rezscan_app.config import Config
+    from rezscan_app.models.database import connect
+    from rezscan_app.utils.dashboard_stats import read_dashboard_stats, compute_dashboard_stats, rebuild_scan_counts
+except ImportError as e:
+    print("Error: Could not import rezscan_app. Ensure you are running this from the correct project directory.")
+    raise e
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify or rebuild the dashboard scan counters.")
+    parser.add_argument('--rebuild', action='store_true', help="Recreate the counters from the scans table first")
+    parser.add_argument('--day', help="Day to compare scans_today for (default: today)")
+    args = parser.parse_args()
+
+    db_path = Config.DB_PATH
+    logger.info(f"Database path set to: {db_path}")
+
+    try:
+        with connect(db_path) as conn:
+            c = conn.cursor()
+            c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='scan_daily_counts';")
+            if not c.fetchone():
+                logger.error("scan_daily_counts table does not exist. Please run the application once to migrate the database.")
+                raise Exception("scan_daily_counts table missing.")
+
+            if args.rebuild:
+                count = rebuild_scan_counts(conn)
+                conn.commit()
+                print(f"Rebuilt {count} scan counters.")
+
+            counted = read_dashboard_stats(conn, args.day)
+            computed = compute_dashboard_stats(conn, args.day)
+            mismatches = [key for key in computed if counted.get(key) != computed[key]]
+            for key in mismatches:
+                print(f"Mismatch in {key}: counters {counted.get(key)!r}, scans {computed[key]!r}")
+            if mismatches:
+                return 1
+            print(f"Counters match the scans table ({computed['scans_today']} scans today, "
+                  f"{len(computed['location_totals'])} locations).")
+            return 0
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {e}")
+        raise
+
+if __name__ == "__main__":
+    sys.exit(main())
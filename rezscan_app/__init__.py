@@ -4,15 +4,21 @@ from flask_login import LoginManager, current_user
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from rezscan_app.models.User import User
-import importlib.util
-import sys
-from pathlib import Path
+import importlib
+import time
 import logging
 from datetime import datetime
 from traceback import format_exc
 import sqlite3
 from rezscan_app.models.database import get_db
 
+# Endpoints exempt from the default rate limits, applied after blueprint registration
+RATE_LIMIT_EXEMPT_ENDPOINTS = (
+    'events.scan_events',
+    'scanner.last_scan_partial',
+    'jobs.job_status',
+)
+
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 
@@ -145,80 +151,71 @@ def create_app():
             return value
 
     # Initialize Database
-    from rezscan_app.models.database import init_db, close_db
+    from rezscan_app.models.database import init_db, close_db, start_checkpoint_scheduler, get_pragma_report, get_pool
+
+    # Register database teardown (before init so the startup connection is returned to the pool)
+    app.teardown_appcontext(close_db)
+    logger.debug("Registered database teardown handler")
+
     with app.app_context():
         try:
             init_db()
-            # Create index on scans(mdoc, timestamp) for performance
-            with get_db() as conn:
-                conn.execute("CREATE INDEX IF NOT EXISTS idx_scans_mdoc_timestamp ON scans(mdoc, timestamp);")
-                conn.commit()
-            logger.info("Database initialized successfully with scans index")
+            get_pool()  # Pre-warm this worker's connection pool
+            logger.info("Database initialized and migrated successfully")
+            start_checkpoint_scheduler(app.config['SQLITE_CHECKPOINT_INTERVAL'])
+            from rezscan_app.utils.jobs import prune_jobs
+            prune_jobs(app.config['JOB_RETENTION_DAYS'])
         except Exception as e:
             logger.error(f"Error initializing database: {str(e)}")
             raise
 
-    # Register database teardown
-    app.teardown_appcontext(close_db)
-    logger.debug("Registered database teardown handler")
-
     # Health Check Endpoint
     @app.route('/health', methods=['GET'])
     def health_check():
         try:
             logger.debug("Health check requested")
-            return jsonify({"status": "healthy", "message": "Application is running"}), 200
+            from rezscan_app.utils.audit_logging import get_audit_writer_stats
+            return jsonify({
+                "status": "healthy",
+                "message": "Application is running",
+                "audit_log": get_audit_writer_stats(),
+                "sqlite": get_pragma_report(get_db()),
+                "db_pool": get_pool().stats()
+            }), 200
         except Exception as e:
             logger.error(f"Health check failed: {str(e)}")
             return jsonify({"status": "unhealthy", "message": str(e)}), 500
 
-    # Dynamic Blueprint Registration
-    def register_blueprints(app):
-        blueprints_dir = Path(__file__).parent / 'routes'
-        logger.debug(f"Scanning blueprints directory: {blueprints_dir}")
-        
-        def scan_directory(directory):
-            for item in directory.rglob('*.py'):
-                if item.name.startswith('__'):
-                    logger.debug(f"Skipping special file: {item.name}")
-                    continue
-                    
-                # Convert the file path to a module path
-                relative_path = item.relative_to(blueprints_dir.parent)
-                module_parts = list(relative_path.parts[:-1]) + [relative_path.stem]
-                module_name = f"rezscan_app.{'.'.join(module_parts)}"
-                
-                try:
-                    logger.debug(f"Attempting to load module: {module_name}")
-                    # Import the module dynamically
-                    spec = importlib.util.spec_from_file_location(module_name, item)
-                    if spec is None:
-                        logger.error(f"Failed to create spec for module: {module_name}")
-                        continue
-                    module = importlib.util.module_from_spec(spec)
-                    sys.modules[module_name] = module
-                    spec.loader.exec_module(module)
-                    
-                    # Look for blueprint instance in the module
-                    for attr_name in dir(module):
-                        attr = getattr(module, attr_name)
-                        if hasattr(attr, '__class__') and attr.__class__.__name__ == 'Blueprint':
-                            app.register_blueprint(attr)
-                            logger.info(f"Successfully registered blueprint: {attr_name} from {module_name}")
-                            
-                except Exception as e:
-                    logger.error(f"Error registering blueprint from {module_name}: {str(e)}")
+    # Blueprint Registration from the static manifest (Scripts/generate_blueprint_manifest.py)
+    from rezscan_app.routes.manifest import BLUEPRINTS
 
-        try:
-            scan_directory(blueprints_dir)
-            logger.info("Blueprint registration completed")
-        except Exception as e:
-            logger.error(f"Error during blueprint registration: {str(e)}")
+    def register_blueprints(app):
+        registered = 0
+        for module_name, attr_name in BLUEPRINTS:
+            try:
+                started = time.perf_counter()
+                module = importlib.import_module(module_name)
+                app.register_blueprint(getattr(module, attr_name))
+                registered += 1
+                logger.debug(f"Registered blueprint {attr_name} from {module_name} in {(time.perf_counter() - started) * 1000:.1f}ms")
+            except Exception as e:
+                logger.error(f"Error registering blueprint {attr_name} from {module_name}: {str(e)}")
+        return registered
 
     try:
         logger.debug("Starting blueprint registration process")
-        register_blueprints(app)
-        logger.info("Blueprint registration completed")
+        started = time.perf_counter()
+        registered = register_blueprints(app)
+        logger.info(f"Registered {registered} of {len(BLUEPRINTS)} blueprints in {(time.perf_counter() - started) * 1000:.1f}ms")
+        # Kiosk pages and job progress pages poll these continuously; under
+        # the default limits they would be cut off within the hour
+        for endpoint in RATE_LIMIT_EXEMPT_ENDPOINTS:
+            if endpoint in app.view_functions:
+                limiter.exempt(app.view_functions[endpoint])
+        if app.config['PRECOMPILE_ROUTES']:
+            started = time.perf_counter()
+            app.url_map.update()
+            logger.info(f"Compiled {len(list(app.url_map.iter_rules()))} routes in {(time.perf_counter() - started) * 1000:.1f}ms")
     except Exception as e:
         logger.error(f"Error during blueprint registration: {str(e)}")
 
@@ -15,11 +15,27 @@ class Config:
     SESSION_COOKIE_SECURE = bool(int(os.getenv('SESSION_COOKIE_SECURE', 1)))  # Enforce HTTPS
     SESSION_COOKIE_HTTPONLY = True  # Prevent JavaScript access to cookies
     SESSION_COOKIE_SAMESITE = os.getenv('SESSION_COOKIE_SAMESITE', 'Lax')  # CSRF protection
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 30))  # Seconds a worker reuses a logged-in user's row; bounds how late role changes reach other workers
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 256))  # Users cached per worker
 
     # --- Database ---
     DB_PATH = os.getenv('DB_PATH', os.path.join(base_dir, 'data', 'rezscan.db'))
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)  # Ensure DB directory exists
 
+    # --- SQLite Connection Tuning ---
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')  # WAL lets readers run alongside the writer
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # Safe with WAL, far fewer fsyncs than FULL
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))  # Wait for locks instead of 'database is locked'
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -20000))  # Negative = KiB (about 20 MB page cache)
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # 256 MB memory-mapped I/O
+    SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')  # Temp tables and sort spill in memory
+    SQLITE_CHECKPOINT_INTERVAL = int(os.getenv('SQLITE_CHECKPOINT_INTERVAL', 300))  # Seconds between WAL checkpoints, 0 disables
+    SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', 256))  # Prepared statements cached per connection
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))  # Max pooled connections per worker
+    DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 2))  # Connections pre-warmed at startup
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))  # Seconds to wait for a free connection
+    DB_POOL_HEALTH_CHECK_IDLE = float(os.getenv('DB_POOL_HEALTH_CHECK_IDLE', 30))  # Ping connections idle longer than this
+
     # --- File Uploads ---
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', os.path.join(base_dir, 'static', 'uploads'))
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)  # Ensure upload directory exists
@@ -36,15 +52,56 @@ class Config:
     LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 3))   # 7 backup files
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
 
+    # --- Audit Log ---
+    AUDIT_LOG_MODE = os.getenv('AUDIT_LOG_MODE', 'async')  # 'async' (batched background writer) or 'sync'
+    AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', 100))  # Max entries per executemany
+    AUDIT_LOG_FLUSH_INTERVAL_MS = int(os.getenv('AUDIT_LOG_FLUSH_INTERVAL_MS', 250))  # Max time an entry waits in the buffer
+    AUDIT_LOG_QUEUE_SIZE = int(os.getenv('AUDIT_LOG_QUEUE_SIZE', 10000))  # Bounded buffer; overflow is written synchronously
+    # Compliance-critical actions that are always written synchronously
+    AUDIT_LOG_SYNC_ACTIONS = set(os.getenv(
+        'AUDIT_LOG_SYNC_ACTIONS',
+        'add_user,edit_user,delete_user,reset_password,update_password,update_settings,'
+        'delete,delete_resident,delete_all_residents,rollback_import,'
+        'login_success,login_failed,logout,unauthorized_access'
+    ).split(','))
+
     # --- Localization ---
     TIMEZONE = os.getenv('TIMEZONE', 'America/New_York')
 
+    # --- Live Scan Events ---
+    SCAN_EVENTS_POLL_INTERVAL = float(os.getenv('SCAN_EVENTS_POLL_INTERVAL', 1.0))  # Seconds between cross-worker sequence checks
+    SCAN_EVENTS_KEEPALIVE = int(os.getenv('SCAN_EVENTS_KEEPALIVE', 15))  # Seconds between SSE keepalive comments
+    # Each open stream holds a request thread, so run gunicorn with threads
+    # (--threads) or gevent and size them for the kiosks, or a sync worker
+    # sits on one stream until it ends
+    SCAN_EVENTS_STREAM_SECONDS = int(os.getenv('SCAN_EVENTS_STREAM_SECONDS', 60))  # Max stream length before client reconnects
+    SCAN_EVENTS_RETRY = int(os.getenv('SCAN_EVENTS_RETRY', 2))  # Seconds the browser waits before reconnecting
+
+    # --- Startup ---
+    PRECOMPILE_ROUTES = bool(int(os.getenv('PRECOMPILE_ROUTES', 1)))  # Build the URL matcher in create_app() rather than on the first request
+
+    # --- Dashboards ---
+    DASHBOARD_STATS_TTL = int(os.getenv('DASHBOARD_STATS_TTL', 30))  # Seconds dashboard statistics are cached per worker
+
+    # --- Background Jobs ---
+    JOB_MODE = os.getenv('JOB_MODE', 'background')  # 'background' (worker threads) or 'inline' (run inside the request)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # Job worker threads per process
+    JOB_FILES_DIR = os.getenv('JOB_FILES_DIR', os.path.join(base_dir, 'data', 'jobs'))  # Job uploads and export outputs
+    JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', 7))  # Finished jobs and their files are pruned after this
+    PDF_PARSE_WORKERS = int(os.getenv('PDF_PARSE_WORKERS', min(4, os.cpu_count() or 1)))  # Processes extracting PDF pages per upload
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 10))  # Pages each PDF worker extracts per task
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 100))  # Shorter PDFs are extracted in-process, without the pool
+
     # --- Feature Toggles ---
     ENABLE_FEATURE_X = bool(int(os.getenv('ENABLE_FEATURE_X', 0)))
 
     # --- API Keys ---
     CORIS_API_URL = os.getenv('CORIS_API_URL', 'https://coris.example.gov/api/residents')
     CORIS_API_KEY = os.getenv('CORIS_API_KEY', 'default-key')
+    CORIS_CONNECT_TIMEOUT = float(os.getenv('CORIS_CONNECT_TIMEOUT', 5))  # Seconds to establish a connection
+    CORIS_READ_TIMEOUT = float(os.getenv('CORIS_READ_TIMEOUT', 60))  # Seconds to wait between bytes of a response
+    CORIS_PAGE_SIZE = int(os.getenv('CORIS_PAGE_SIZE', 500))  # Residents requested per page
+    CORIS_BATCH_SIZE = int(os.getenv('CORIS_BATCH_SIZE', 500))  # Residents upserted per transaction
 
 class DevelopmentConfig(Config):
     """Configuration for development environment."""
@@ -61,4 +118,6 @@ class TestingConfig(Config):
     """Configuration for testing environment."""
     TESTING = True
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'CRITICAL')
-    DB_PATH = os.getenv('DB_PATH', os.path.join(base_dir, 'data', 'test.db'))
\ No newline at end of file
+    DB_PATH = os.getenv('DB_PATH', os.path.join(base_dir, 'data', 'test.db'))
+    AUDIT_LOG_MODE = os.getenv('AUDIT_LOG_MODE', 'sync')  # Deterministic audit rows in tests
+    JOB_MODE = os.getenv('JOB_MODE', 'inline')  # Jobs finish before the request returns
\ No newline at end of file
@@ -1,13 +1,23 @@
 from flask_login import UserMixin
+from rezscan_app.config import Config
 from rezscan_app.models.database import get_db
+from rezscan_app.utils.cache import TTLCache
 from werkzeug.security import check_password_hash
 
+# Per-worker cache of user rows for the login user_loader. Writes in this
+# worker invalidate it; other workers pick changes up when entries expire.
+_user_cache = TTLCache(ttl=Config.USER_CACHE_TTL, max_size=Config.USER_CACHE_SIZE)
+
+USER_COLUMNS = "id, username, role, theme, default_view, default_unit"
+
 class User(UserMixin):
-    def __init__(self, id, username, role, theme=None):
+    def __init__(self, id, username, role, theme=None, default_view=None, default_unit=None):
         self.id = id
         self.username = username
         self.role = role
         self.theme = theme or 'dark'
+        self.default_view = default_view
+        self.default_unit = default_unit
 
     def get_id(self):
         return str(self.id)
@@ -20,14 +30,18 @@ class User(UserMixin):
             user_id = int(user_id)
         except ValueError:
             return None
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT id, username, role, theme FROM users WHERE id = ?", (user_id,))
-        user = cursor.fetchone()
-        cursor.close()
-        if user:
-            return User(id=user['id'], username=user['username'], role=user['role'], theme=user['theme'])
-        return None
+        user = _user_cache.get(user_id)
+        if user is None:
+            db = get_db()
+            cursor = db.cursor()
+            cursor.execute(f"SELECT {USER_COLUMNS} FROM users WHERE id = ?", (user_id,))
+            row = cursor.fetchone()
+            cursor.close()
+            if not row:
+                return None
+            user = dict(row)
+            _user_cache.set(user_id, user)
+        return User(**user)
 
     @staticmethod
     def authenticate(username, password):
@@ -35,9 +49,25 @@ class User(UserMixin):
             return None
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT id, username, password, role, theme FROM users WHERE username = ?", (username,))
-        user = cursor.fetchone()
+        cursor.execute(f"SELECT {USER_COLUMNS}, password FROM users WHERE username = ?", (username,))
+        row = cursor.fetchone()
         cursor.close()
-        if user and check_password_hash(user['password'], password):
-            return User(id=user['id'], username=user['username'], role=user['role'], theme=user['theme'])
-        return None
\ No newline at end of file
+        if row and check_password_hash(row['password'], password):
+            user = {key: row[key] for key in row.keys() if key != 'password'}
+            _user_cache.set(user['id'], user)
+            return User(**user)
+        return None
+
+    @staticmethod
+    def invalidate(user_id=None):
+        """
+        Drop cached user rows after a change to the users table.
+
+        Args:
+            user_id: The changed user's id, or None to drop every entry (e.g.
+                when the change was made by username).
+        """
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.invalidate(int(user_id))
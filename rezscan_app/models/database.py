@@ -1,20 +1,298 @@
 import logging
 import sqlite3
 import os
-from flask import g, current_app
+import threading
+import time
+from flask import g, current_app, has_app_context
+from rezscan_app.models.migrations import run_migrations
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Config keys that make up the connection tuning applied by connect()
+SQLITE_SETTING_KEYS = (
+    'SQLITE_JOURNAL_MODE',
+    'SQLITE_SYNCHRONOUS',
+    'SQLITE_BUSY_TIMEOUT_MS',
+    'SQLITE_CACHE_SIZE',
+    'SQLITE_MMAP_SIZE',
+    'SQLITE_TEMP_STORE',
+    'SQLITE_STATEMENT_CACHE',
+)
+
+def get_sqlite_settings(config=None):
+    """
+    Return the connection tuning settings.
+
+    Args:
+        config: Optional mapping of config values. Defaults to the current app's
+            config inside an app context, otherwise the base Config class.
+
+    Returns:
+        A dict of the SQLITE_* settings plus DB_PATH.
+    """
+    if config is None:
+        if has_app_context():
+            config = current_app.config
+        else:
+            from rezscan_app.config import Config
+            config = vars(Config)
+    return {key: config[key] for key in SQLITE_SETTING_KEYS + ('DB_PATH',)}
+
+def connect(db_path=None, settings=None, **kwargs):
+    """
+    Open a SQLite connection with the configured pragmas applied.
+
+    This is the single connection factory for the app, background threads and
+    the Scripts, so every connection runs with the same journal and lock settings.
+
+    Args:
+        db_path: Database path. Defaults to the configured DB_PATH.
+        settings: Optional settings dict from get_sqlite_settings().
+        **kwargs: Passed through to sqlite3.connect().
+
+    Returns:
+        An open sqlite3.Connection.
+    """
+    settings = settings or get_sqlite_settings()
+    db_path = db_path or settings['DB_PATH']
+    kwargs.setdefault('timeout', settings['SQLITE_BUSY_TIMEOUT_MS'] / 1000)
+    kwargs.setdefault('cached_statements', settings['SQLITE_STATEMENT_CACHE'])
+    conn = sqlite3.connect(db_path, **kwargs)
+    apply_pragmas(conn, settings)
+    return conn
+
+def apply_pragmas(conn, settings):
+    """Apply the connection tuning pragmas to an open connection."""
+    conn.execute(f"PRAGMA journal_mode = {settings['SQLITE_JOURNAL_MODE']}")
+    conn.execute(f"PRAGMA synchronous = {settings['SQLITE_SYNCHRONOUS']}")
+    conn.execute(f"PRAGMA busy_timeout = {int(settings['SQLITE_BUSY_TIMEOUT_MS'])}")
+    conn.execute(f"PRAGMA cache_size = {int(settings['SQLITE_CACHE_SIZE'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['SQLITE_MMAP_SIZE'])}")
+    conn.execute(f"PRAGMA temp_store = {settings['SQLITE_TEMP_STORE']}")
+    conn.execute('PRAGMA foreign_keys = ON')
+
+def get_pragma_report(conn):
+    """
+    Report the pragma values actually in effect on a connection.
+
+    Args:
+        conn: Database connection.
+
+    Returns:
+        A dict of pragma name to current value.
+    """
+    pragmas = ['journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store', 'foreign_keys']
+    return {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in pragmas}
+
+def checkpoint(conn, mode='PASSIVE'):
+    """
+    Run a WAL checkpoint.
+
+    Args:
+        conn: Database connection.
+        mode: PASSIVE, FULL, RESTART or TRUNCATE.
+
+    Returns:
+        A (busy, log_frames, checkpointed_frames) tuple.
+    """
+    return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+
+_checkpoint_thread = None
+
+def start_checkpoint_scheduler(interval, settings=None):
+    """
+    Start a daemon thread that checkpoints the WAL every interval seconds.
+
+    Passive checkpoints never block readers or writers, so running one per
+    worker is safe. Does nothing if interval is 0 or a scheduler is already running.
+
+    Args:
+        interval: Seconds between checkpoints.
+        settings: Optional settings dict from get_sqlite_settings().
+    """
+    global _checkpoint_thread
+    if not interval or (_checkpoint_thread and _checkpoint_thread.is_alive()):
+        return
+    settings = settings or get_sqlite_settings()
+
+    def run():
+        conn = connect(settings=settings)
+        try:
+            while True:
+                time.sleep(interval)
+                try:
+                    busy, log_frames, checkpointed = checkpoint(conn)
+                    logger.debug(f"WAL checkpoint: busy={busy}, log_frames={log_frames}, checkpointed={checkpointed}")
+                except sqlite3.Error as e:
+                    logger.error(f"WAL checkpoint failed: {str(e)}")
+        finally:
+            conn.close()
+
+    _checkpoint_thread = threading.Thread(target=run, name='wal-checkpoint', daemon=True)
+    _checkpoint_thread.start()
+    logger.info(f"Started WAL checkpoint scheduler (interval={interval}s)")
+
+class ConnectionPool:
+    """
+    Thread-safe pool of pre-configured SQLite connections for one worker.
+
+    Connections keep their pragmas and sqlite3 statement cache between
+    requests, so a checkout skips the open, pragma and statement-parse cost.
+    Idle connections are pinged before reuse once they have sat longer than
+    health_check_idle seconds; broken ones are replaced.
+    """
+
+    def __init__(self, settings, max_size=8, min_size=0, timeout=10.0, health_check_idle=30.0):
+        self.settings = settings
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_idle = health_check_idle
+        self.pid = os.getpid()
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'created': 0,
+            'checkouts': 0,
+            'returns': 0,
+            'discarded': 0,
+            'waits': 0,
+            'wait_ms': 0.0,
+            'health_checks': 0,
+            'max_in_use': 0
+        }
+        for _ in range(min(min_size, max_size)):
+            self._idle.append((self._create(), time.monotonic()))
+        logger.info(f"Created connection pool for {settings['DB_PATH']} (max_size={max_size}, prewarmed={len(self._idle)})")
+
+    def _create(self):
+        conn = connect(settings=self.settings, check_same_thread=False)
+        self._size += 1
+        self._stats['created'] += 1
+        return conn
+
+    def checkout(self):
+        """Return a connection, creating one or waiting up to timeout if needed."""
+        with self._cond:
+            started = time.monotonic()
+            if not self._idle and self._size >= self.max_size:
+                self._stats['waits'] += 1
+                logger.warning(f"Connection pool exhausted ({self.max_size} in use), waiting")
+                if not self._cond.wait_for(lambda: self._idle or self._size < self.max_size, self.timeout):
+                    raise sqlite3.OperationalError(f"Timed out after {self.timeout}s waiting for a database connection")
+            self._stats['wait_ms'] += (time.monotonic() - started) * 1000
+            if self._idle:
+                conn, idle_since = self._idle.pop()
+            else:
+                conn, idle_since = self._create(), time.monotonic()
+            self._stats['checkouts'] += 1
+            self._stats['max_in_use'] = max(self._stats['max_in_use'], self._size - len(self._idle))
+
+        if time.monotonic() - idle_since > self.health_check_idle:
+            conn = self._health_check(conn)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, rolling back any open transaction."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.error(f"Discarding pooled connection that failed to roll back: {str(e)}")
+            self._discard(conn)
+            return
+        with self._cond:
+            self._stats['returns'] += 1
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _health_check(self, conn):
+        with self._cond:
+            self._stats['health_checks'] += 1
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"Replacing unhealthy pooled connection: {str(e)}")
+            self._discard(conn)
+            with self._cond:
+                return self._create()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+
+    def health_check(self):
+        """Ping every idle connection, replacing any that fail. Returns True if all were healthy."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        healthy = True
+        for conn, _ in idle:
+            checked = self._health_check(conn)
+            healthy = healthy and checked is conn
+            with self._cond:
+                self._idle.append((checked, time.monotonic()))
+                self._cond.notify()
+        return healthy
+
+    def stats(self):
+        """Return a snapshot of pool counters and current usage."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+        stats['wait_ms'] = round(stats['wait_ms'], 2)
+        return stats
+
+    def close(self):
+        """Close all idle connections."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            conn.close()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool():
+    """
+    Return this worker's connection pool for the configured database.
+
+    Pools are keyed by database path and rebuilt after a fork, so a pool
+    created before gunicorn forks is never shared between workers.
+    """
+    config = current_app.config
+    db_path = config['DB_PATH']
+    pool = _pools.get(db_path)
+    if pool is None or pool.pid != os.getpid():
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None or pool.pid != os.getpid():
+                pool = ConnectionPool(
+                    get_sqlite_settings(config),
+                    max_size=config['DB_POOL_SIZE'],
+                    min_size=config['DB_POOL_MIN_SIZE'],
+                    timeout=config['DB_POOL_TIMEOUT'],
+                    health_check_idle=config['DB_POOL_HEALTH_CHECK_IDLE']
+                )
+                _pools[db_path] = pool
+    return pool
+
 def get_db():
     if 'db' not in g:
         try:
-            db_path = current_app.config['DB_PATH']
-            logger.debug(f"Opening database connection to: {db_path}")
-            g.db = sqlite3.connect(db_path)
-            g.db.row_factory = sqlite3.Row
-            g.db.execute('PRAGMA foreign_keys = ON')  # Enable foreign keys
-            logger.debug("Database connection established with foreign keys enabled")
+            g.db = get_pool().checkout()
+            logger.debug("Checked out pooled database connection")
         except sqlite3.Error as e:
             logger.error(f"Error opening database connection: {str(e)}")
             raise
@@ -24,10 +302,10 @@ def close_db(e=None):
     db = g.pop('db', None)
     if db is not None:
         try:
-            db.close()
-            logger.debug("Database connection closed")
+            get_pool().release(db)
+            logger.debug("Database connection returned to pool")
         except sqlite3.Error as e:
-            logger.error(f"Error closing database connection: {str(e)}")
+            logger.error(f"Error returning database connection to pool: {str(e)}")
 
 def init_db():
     db_path = current_app.config['DB_PATH']
@@ -41,7 +319,7 @@ def init_db():
         raise
 
     try:
-        with sqlite3.connect(db_path) as conn:
+        with connect(db_path) as conn:
             c = conn.cursor()
             logger.debug("Established temporary connection for database initialization")
 
@@ -95,6 +373,22 @@ def init_db():
                 logger.error(f"Error creating scans table: {str(e)}")
                 raise
 
+            # Resident Current Status table (latest scan per resident, maintained on every scan write)
+            try:
+                c.execute('''
+                    CREATE TABLE IF NOT EXISTS resident_current_status (
+                        mdoc TEXT PRIMARY KEY,
+                        location TEXT,
+                        status TEXT,
+                        timestamp DATETIME
+                    )
+                ''')
+                c.execute("CREATE INDEX IF NOT EXISTS idx_resident_current_status_status ON resident_current_status(status)")
+                logger.debug("Created resident_current_status table")
+            except sqlite3.Error as e:
+                logger.error(f"Error creating resident_current_status table: {str(e)}")
+                raise
+
             # Users table
             try:
                 c.execute('''
@@ -134,25 +428,20 @@ def init_db():
 
             # Resident Last Scans view
             try:
+                c.execute("DROP VIEW IF EXISTS resident_last_scan")
                 c.execute('''
-                CREATE VIEW IF NOT EXISTS resident_last_scan AS
+                CREATE VIEW resident_last_scan AS
                 SELECT 
                     r.name,
                     r.mdoc,
                     r.unit,
                     r.housing_unit,
                     r.level,
-                    s.location AS last_scan_location,
-                    s.timestamp AS last_scan_time,
-                    s.status AS last_scan_status
+                    cs.location AS last_scan_location,
+                    cs.timestamp AS last_scan_time,
+                    cs.status AS last_scan_status
                 FROM residents r
-                LEFT JOIN scans s ON r.mdoc = s.mdoc
-                WHERE s.timestamp = (
-                    SELECT MAX(timestamp)
-                    FROM scans
-                    WHERE mdoc = r.mdoc
-                )
-                OR s.timestamp IS NULL
+                LEFT JOIN resident_current_status cs ON r.mdoc = cs.mdoc
             ''')
                 logger.debug("Created resident_last_scan view")
             except sqlite3.Error as e:
@@ -323,19 +612,60 @@ def init_db():
                 logger.error(f"Error seeding default settings: {str(e)}")
                 raise
                 
+            # Populate resident_current_status for databases that predate it
+            try:
+                c.execute("SELECT EXISTS (SELECT 1 FROM resident_current_status)")
+                if not c.fetchone()[0]:
+                    rebuild_resident_current_status(conn)
+            except sqlite3.Error as e:
+                logger.error(f"Error populating resident_current_status: {str(e)}")
+                raise
+
             # Commit changes
             conn.commit()
             logger.info("Database schema creation completed")
 
+            # Apply versioned migrations (indexes and later schema changes)
+            run_migrations(conn)
+
             # Verify tables
             c.execute("SELECT name FROM sqlite_master WHERE type='table'")
             tables = [row[0] for row in c.fetchall()]
             logger.info(f"Tables in database: {', '.join(tables)}")
+            logger.info(f"SQLite settings in effect: {get_pragma_report(conn)}")
 
     except sqlite3.Error as e:
         logger.error(f"Error during database initialization: {str(e)}")
         raise
 
+def rebuild_resident_current_status(conn):
+    """
+    Recreate resident_current_status from the full scans table.
+
+    The caller is responsible for committing.
+
+    Args:
+        conn: Database connection.
+
+    Returns:
+        The number of residents with a current status.
+    """
+    c = conn.cursor()
+    c.execute("DELETE FROM resident_current_status")
+    c.execute('''
+        INSERT INTO resident_current_status (mdoc, location, status, timestamp)
+        SELECT mdoc, location, status, timestamp
+        FROM (
+            SELECT mdoc, location, status, timestamp,
+                   ROW_NUMBER() OVER (PARTITION BY mdoc ORDER BY timestamp DESC, scanid DESC) AS rn
+            FROM scans
+        )
+        WHERE rn = 1
+    ''')
+    count = c.rowcount
+    logger.info(f"Rebuilt resident_current_status with {count} residents")
+    return count
+
 def init_app(app):
     logger.debug("Registering database teardown with Flask app")
     app.teardown_appcontext(close_db)
\ No newline at end of file
@@ -0,0 +1,302 @@
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Shared by the resident version triggers; the resident index reloads when it moves
+RESIDENTS_VERSION_BUMP = (
+    "INSERT INTO settings (category, key, value) VALUES ('cache', 'residents_version', '1') "
+    "ON CONFLICT(category, key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;"
+)
+
+# Hour bucket of a scan as local wall-clock time ('YYYY-MM-DD HH:00'). Scans
+# from the API carry an ISO timestamp with an offset, which strftime() would
+# shift to UTC, so the bucket is cut from the text instead.
+ROLLUP_HOUR = "substr(replace({row}.timestamp, 'T', ' '), 1, 13) || ':00'"
+
+# Day of a scan as local wall-clock date ('YYYY-MM-DD'), cut from the text
+# for the same reason as ROLLUP_HOUR; DATE() would move late-evening API
+# scans onto the next day
+SCAN_DAY = "substr(replace({row}.timestamp, 'T', ' '), 1, 10)"
+
+# Recomputes scan_daily_counts from the scans table; shared with the rebuild path
+SCAN_COUNT_BACKFILL = f"""
+    INSERT INTO scan_daily_counts (day, location, scans)
+    SELECT {SCAN_DAY.format(row='s')}, COALESCE(s.location, ''), COUNT(*)
+    FROM scans s
+    GROUP BY 1, 2
+"""
+
+# Recomputes scan_rollup_hourly from the scans table; shared with the rebuild path
+ROLLUP_BACKFILL = f"""
+    INSERT INTO scan_rollup_hourly (location, hour, ins, outs, occupancy)
+    SELECT location, hour, ins, outs,
+           SUM(ins - outs) OVER (PARTITION BY location ORDER BY hour)
+    FROM (
+        SELECT s.location, {ROLLUP_HOUR.format(row='s')} AS hour,
+               SUM(s.status = 'In') AS ins, SUM(s.status = 'Out') AS outs
+        FROM scans s
+        WHERE s.location IS NOT NULL
+        GROUP BY 1, 2
+    )
+"""
+
+# Ordered schema migrations: (version, description, statements).
+# Append new entries with the next version number; never edit applied ones.
+MIGRATIONS = [
+    (1, 'Index scans by resident and time', [
+        "CREATE INDEX IF NOT EXISTS idx_scans_mdoc_timestamp ON scans(mdoc, timestamp)",
+    ]),
+    (2, 'Indexes for hot query paths', [
+        "CREATE INDEX IF NOT EXISTS idx_scans_timestamp ON scans(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_scans_location_timestamp ON scans(location, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_scans_status ON scans(status)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_action ON audit_log(action)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_username ON audit_log(username)",
+        "CREATE INDEX IF NOT EXISTS idx_resident_schedules_group_id ON resident_schedules(group_id)",
+        "CREATE INDEX IF NOT EXISTS idx_resident_schedules_mdoc ON resident_schedules(mdoc)",
+        "CREATE INDEX IF NOT EXISTS idx_schedule_blocks_group_day ON schedule_blocks(group_id, day_of_week)",
+        "CREATE INDEX IF NOT EXISTS idx_residents_housing_unit ON residents(housing_unit)",
+        "CREATE INDEX IF NOT EXISTS idx_locations_prefix_nocase ON locations(prefix COLLATE NOCASE)",
+        "ANALYZE",
+    ]),
+    (3, 'Background jobs table', [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            username TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            payload TEXT,
+            progress INTEGER DEFAULT 0,
+            total INTEGER,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            worker TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_finished ON jobs(status, finished_at)",
+    ]),
+    (4, 'Resident content hashes for CORIS delta detection', [
+        "ALTER TABLE residents ADD COLUMN content_hash TEXT",
+        # Any write that changes a resident without setting a new hash
+        # (CSV import, edits, rollbacks) invalidates the stored one
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_residents_content_hash_stale
+        AFTER UPDATE OF name, unit, housing_unit, level, photo ON residents
+        WHEN NEW.content_hash IS OLD.content_hash AND NEW.content_hash IS NOT NULL
+        BEGIN
+            UPDATE residents SET content_hash = NULL WHERE mdoc = NEW.mdoc;
+        END
+        """,
+    ]),
+    (5, 'Bump the resident index version on resident changes', [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_version_insert AFTER INSERT ON residents
+        BEGIN
+            {RESIDENTS_VERSION_BUMP}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_version_delete AFTER DELETE ON residents
+        BEGIN
+            {RESIDENTS_VERSION_BUMP}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_residents_version_update
+        AFTER UPDATE OF mdoc, name, housing_unit ON residents
+        BEGIN
+            {RESIDENTS_VERSION_BUMP}
+        END
+        """,
+    ]),
+    (6, 'Persisted schedule match suggestions', [
+        "ALTER TABLE schedule_match_review ADD COLUMN candidates_version TEXT",
+        """
+        CREATE TABLE IF NOT EXISTS schedule_match_candidates (
+            review_id INTEGER NOT NULL REFERENCES schedule_match_review(id) ON DELETE CASCADE,
+            rank INTEGER NOT NULL,
+            kind TEXT NOT NULL CHECK(kind IN ('mdoc', 'name', 'fuzzy')),
+            mdoc TEXT NOT NULL,
+            name TEXT,
+            housing_unit TEXT,
+            score REAL NOT NULL,
+            PRIMARY KEY (review_id, rank)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_schedule_match_review_status_id ON schedule_match_review(status, id)",
+    ]),
+    (7, 'Scan counters by day and location for the dashboards', [
+        """
+        CREATE TABLE IF NOT EXISTS scan_daily_counts (
+            day TEXT NOT NULL,
+            location TEXT NOT NULL,
+            scans INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, location)
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT INTO scan_daily_counts (day, location, scans)
+        SELECT DATE(timestamp), COALESCE(location, ''), COUNT(*)
+        FROM scans
+        GROUP BY 1, 2
+        """,
+        # Scans without a location are counted under '' so the key stays unique
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_scans_count_insert AFTER INSERT ON scans
+        BEGIN
+            INSERT INTO scan_daily_counts (day, location, scans)
+            VALUES (DATE(NEW.timestamp), COALESCE(NEW.location, ''), 1)
+            ON CONFLICT(day, location) DO UPDATE SET scans = scans + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_scans_count_delete AFTER DELETE ON scans
+        BEGIN
+            UPDATE scan_daily_counts SET scans = scans - 1
+            WHERE day = DATE(OLD.timestamp) AND location = COALESCE(OLD.location, '');
+        END
+        """,
+    ]),
+    (8, 'Hourly occupancy rollups for the heatmap', [
+        """
+        CREATE TABLE IF NOT EXISTS scan_rollup_hourly (
+            location TEXT NOT NULL,
+            hour TEXT NOT NULL,
+            ins INTEGER NOT NULL DEFAULT 0,
+            outs INTEGER NOT NULL DEFAULT 0,
+            occupancy INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (location, hour)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_scan_rollup_hourly_hour ON scan_rollup_hourly(hour)",
+        ROLLUP_BACKFILL,
+        # occupancy is the running total of ins - outs at the end of the hour,
+        # so a scan also shifts every later hour of its location (normally none)
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_scans_rollup_insert AFTER INSERT ON scans
+        WHEN NEW.location IS NOT NULL
+        BEGIN
+            INSERT INTO scan_rollup_hourly (location, hour, ins, outs, occupancy)
+            VALUES (
+                NEW.location, {ROLLUP_HOUR.format(row='NEW')},
+                NEW.status = 'In', NEW.status = 'Out',
+                COALESCE((
+                    SELECT occupancy FROM scan_rollup_hourly
+                    WHERE location = NEW.location AND hour < {ROLLUP_HOUR.format(row='NEW')}
+                    ORDER BY hour DESC LIMIT 1
+                ), 0) + (NEW.status = 'In') - (NEW.status = 'Out')
+            )
+            ON CONFLICT(location, hour) DO UPDATE SET
+                ins = ins + excluded.ins,
+                outs = outs + excluded.outs,
+                occupancy = occupancy + excluded.ins - excluded.outs;
+            UPDATE scan_rollup_hourly
+            SET occupancy = occupancy + (NEW.status = 'In') - (NEW.status = 'Out')
+            WHERE location = NEW.location AND hour > {ROLLUP_HOUR.format(row='NEW')};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_scans_rollup_delete AFTER DELETE ON scans
+        WHEN OLD.location IS NOT NULL
+        BEGIN
+            UPDATE scan_rollup_hourly
+            SET ins = ins - (OLD.status = 'In'), outs = outs - (OLD.status = 'Out')
+            WHERE location = OLD.location AND hour = {ROLLUP_HOUR.format(row='OLD')};
+            UPDATE scan_rollup_hourly
+            SET occupancy = occupancy - (OLD.status = 'In') + (OLD.status = 'Out')
+            WHERE location = OLD.location AND hour >= {ROLLUP_HOUR.format(row='OLD')};
+        END
+        """,
+    ]),
+    (9, 'Key scan counters on the local date of the timestamp text', [
+        "DROP TRIGGER IF EXISTS trg_scans_count_insert",
+        "DROP TRIGGER IF EXISTS trg_scans_count_delete",
+        "DELETE FROM scan_daily_counts",
+        SCAN_COUNT_BACKFILL,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_scans_count_insert AFTER INSERT ON scans
+        BEGIN
+            INSERT INTO scan_daily_counts (day, location, scans)
+            VALUES ({SCAN_DAY.format(row='NEW')}, COALESCE(NEW.location, ''), 1)
+            ON CONFLICT(day, location) DO UPDATE SET scans = scans + 1;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_scans_count_delete AFTER DELETE ON scans
+        BEGIN
+            UPDATE scan_daily_counts SET scans = scans - 1
+            WHERE day = {SCAN_DAY.format(row='OLD')} AND location = COALESCE(OLD.location, '');
+        END
+        """,
+    ]),
+]
+
+def get_schema_version(conn):
+    """
+    Return the highest applied migration version.
+
+    Args:
+        conn: Database connection.
+
+    Returns:
+        The current schema version, or 0 if no migrations have been applied.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def run_migrations(conn, migrations=MIGRATIONS):
+    """
+    Apply every pending migration, each in its own transaction.
+
+    Args:
+        conn: Database connection with no open transaction.
+        migrations: Ordered list of (version, description, statements).
+
+    Returns:
+        The list of versions applied.
+    """
+    # Workers booting together race to migrate: each step takes the write
+    # lock first and re-reads the version under it, so only one applies it
+    current = get_schema_version(conn)
+    applied = []
+    for version, description, statements in migrations:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if get_schema_version(conn) >= version:
+                conn.commit()
+                logger.debug(f"Schema migration {version} was applied by another worker")
+                continue
+            logger.info(f"Applying schema migration {version}: {description}")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Schema migration {version} failed: {str(e)}")
+            raise
+        applied.append(version)
+    if applied:
+        logger.info(f"Schema migrated from version {current} to {applied[-1]}")
+    else:
+        logger.debug(f"Schema is up to date at version {current}")
+    return applied
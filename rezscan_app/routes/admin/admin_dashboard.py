@@ -1,8 +1,8 @@
 from flask import Blueprint, render_template, flash
-from rezscan_app.models.database import get_db
 from flask_login import login_required, current_user
 from rezscan_app.routes.common.auth import role_required
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.dashboard_stats import get_dashboard_stats
 import sqlite3
 import logging
 
@@ -17,50 +17,7 @@ def admin_dashboard():
     logger.debug(f"User {username} accessed admin dashboard")
     
     try:
-        db = get_db()
-        c = db.cursor()
-
-        c.execute("SELECT COUNT(*) FROM residents")
-        total_residents = c.fetchone()[0]
-
-        c.execute("SELECT COUNT(*) FROM scans WHERE DATE(timestamp) = DATE('now', 'localtime')")
-        scans_today = c.fetchone()[0]
-
-        c.execute('''
-            SELECT COUNT(*)
-            FROM (
-                SELECT mdoc, MAX(timestamp) AS latest_time
-                FROM scans
-                GROUP BY mdoc
-                HAVING (SELECT status FROM scans WHERE mdoc = scans.mdoc AND timestamp = latest_time) = 'In'
-            )
-        ''')
-        checked_in = c.fetchone()[0]
-
-        c.execute("SELECT COUNT(*) FROM users")
-        total_users = c.fetchone()[0]
-
-        c.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
-        total_admins = c.fetchone()[0]
-
-        c.execute('''
-                SELECT location, COUNT(*) as scan_count
-                FROM scans
-                WHERE location IS NOT NULL
-                GROUP BY location
-                ORDER BY scan_count DESC
-                LIMIT 1
-        ''')
-        result = c.fetchone()
-        top_location = result[0] if result else None
-
-        stats = {
-            'total_residents': total_residents,
-            'scans_today': scans_today,
-            'checked_in': checked_in,
-            'total_users': total_users,
-            'top_location': top_location
-        }
+        stats = get_dashboard_stats()
 
         # log_audit_action(username, 'view', 'admin_dashboard', f"Viewed dashboard with stats: {stats}")
         log_audit_action(username, 'view', 'admin_dashboard', "Viewed admin dashboard")
@@ -3,6 +3,8 @@ from flask_login import login_required, current_user
 from rezscan_app.models.database import get_db
 from rezscan_app.routes.common.auth import role_required
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.location_registry import VERSION_CATEGORY
+from rezscan_app.utils.coris_sync import SYNC_CATEGORY
 import sqlite3
 import logging
 import re
@@ -50,7 +52,8 @@ def manage_admin_settings():
             return redirect(url_for('settings.manage_settings'))
 
         try:
-            c.execute("SELECT category, key, value FROM settings ORDER BY category, key")
+            # Internal bookkeeping rows are not user-editable settings
+            c.execute("SELECT category, key, value FROM settings WHERE category NOT IN (?, ?) ORDER BY category, key", (VERSION_CATEGORY, SYNC_CATEGORY))
             settings = c.fetchall()
             log_audit_action(username, 'view', 'settings', "Viewed settings page")
             logger.debug(f"User {username} fetched settings")
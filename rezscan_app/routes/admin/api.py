@@ -5,6 +5,8 @@ from flask_limiter.util import get_remote_address
 from rezscan_app.models.database import get_db
 from rezscan_app.routes.common.auth import role_required
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.scan_logic import update_current_status
+from rezscan_app.utils.scan_events import publish_scan_event
 from rezscan_app.config import Config
 import logging
 from datetime import datetime
@@ -51,7 +53,7 @@ def get_resident_status(mdoc):
 
         resident_id, name = resident
 
-        c.execute("SELECT timestamp, status, location FROM scans WHERE mdoc = ? ORDER BY timestamp DESC LIMIT 1", (mdoc,))
+        c.execute("SELECT timestamp, status, location FROM resident_current_status WHERE mdoc = ?", (mdoc,))
         scan = c.fetchone()
 
         if not scan:
@@ -129,7 +131,9 @@ def api_scan():
             INSERT INTO scans (mdoc, timestamp, status, location)
             VALUES (?, ?, ?, ?)
         ''', (mdoc, timestamp, direction, location))
+        update_current_status(c, mdoc, timestamp, direction, location)
         db.commit()
+        publish_scan_event()
 
         log_audit_action(username, 'scan', 'scan', f"Recorded scan for MDOC {mdoc} at {location}")
         logger.info(f"User {username} recorded scan for MDOC {mdoc} at {location}")
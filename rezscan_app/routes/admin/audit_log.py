@@ -1,15 +1,14 @@
-from flask import Blueprint, render_template, request, send_file, flash, url_for, redirect
+from flask import Blueprint, render_template, request, flash, url_for, redirect
 from flask_login import login_required, current_user
 from rezscan_app.routes.common.auth import role_required
 from rezscan_app.models.database import get_db
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.exports import LocalTimeConverter, iter_csv, csv_response, save_export
+from rezscan_app.utils.jobs import job_handler, enqueue_job
 from rezscan_app.config import Config
-import io
-import csv
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
-import re
 import sqlite3
 
 logger = logging.getLogger(__name__)
@@ -18,20 +17,51 @@ audit_log_bp = Blueprint('audit_log', __name__)
 # Pagination settings
 PER_PAGE = 10
 
-def parse_and_convert_timestamp(text, local_tz):
-    """Convert UTC timestamps in text to local time."""
-    iso_pattern = r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?'
-    matches = re.findall(iso_pattern, text)
-    for match in matches:
+def _local_day_to_utc(date_str, local_tz, days=0):
+    """Return local midnight of date_str (plus days) as a stored UTC timestamp string."""
+    local_dt = local_tz.localize(datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=days))
+    return local_dt.astimezone(pytz.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def _build_audit_filters(username, action, start_date, end_date, local_tz):
+    """
+    Build the WHERE clause shared by the audit log view, its count and the export.
+
+    Dates are local calendar days, converted to a half-open UTC timestamp range
+    so the timestamp index can be used.
+
+    Returns:
+        Tuple of (clause, params, invalid_dates).
+    """
+    clause = ""
+    params = []
+    invalid_dates = []
+    if username:
+        clause += " AND username LIKE ?"
+        params.append(f"%{username}%")
+    if action:
+        clause += " AND action = ?"
+        params.append(action)
+    if start_date:
+        try:
+            params.append(_local_day_to_utc(start_date, local_tz))
+            clause += " AND timestamp >= ?"
+        except ValueError:
+            invalid_dates.append(('start', start_date))
+    if end_date:
         try:
-            utc_dt = datetime.fromisoformat(match.replace('T', ' '))
-            utc_dt = pytz.utc.localize(utc_dt)
-            local_dt = utc_dt.astimezone(local_tz)
-            local_str = local_dt.strftime('%m-%d-%Y %H:%M:%S')
-            text = text.replace(match, local_str)
+            params.append(_local_day_to_utc(end_date, local_tz, days=1))
+            clause += " AND timestamp < ?"
         except ValueError:
-            continue
-    return text
+            invalid_dates.append(('end', end_date))
+    return clause, params, invalid_dates
+
+def _get_audit_filter_args():
+    return (
+        request.args.get('username', '').strip(),
+        request.args.get('action', '').strip(),
+        request.args.get('start_date', ''),
+        request.args.get('end_date', '')
+    )
 
 @audit_log_bp.route('/admin/auditlog', methods=['GET'], strict_slashes=False)
 @login_required
@@ -42,45 +72,18 @@ def view_audit_log():
     
     log_audit_action(username, 'view', 'audit_log', 'Viewed audit log page')
 
-    username_filter = request.args.get('username', '').strip()
-    action_filter = request.args.get('action', '').strip()
-    start_date = request.args.get('start_date', '')
-    end_date = request.args.get('end_date', '')
+    username_filter, action_filter, start_date, end_date = _get_audit_filter_args()
     page = int(request.args.get('page', 1))
 
-    query = "SELECT id, timestamp, username, action, target, details FROM audit_log WHERE 1=1"
-    params = []
     local_tz = pytz.timezone(Config.TIMEZONE)
+    filter_clause, filter_params, invalid_dates = _build_audit_filters(username_filter, action_filter, start_date, end_date, local_tz)
+    for which, value in invalid_dates:
+        flash(f"Invalid {which} date format.", "warning")
+        logger.warning(f"User {username} provided invalid {which} date: {value}")
 
-    if username_filter:
-        query += " AND username LIKE ?"
-        params.append(f"%{username_filter}%")
-    if action_filter:
-        query += " AND action = ?"
-        params.append(action_filter)
-    if start_date:
-        try:
-            local_dt = datetime.strptime(start_date, '%Y-%m-%d')
-            local_dt = local_tz.localize(local_dt)
-            utc_dt = local_dt.astimezone(pytz.utc)
-            query += " AND DATE(timestamp) >= ?"
-            params.append(utc_dt.strftime('%Y-%m-%d'))
-        except ValueError:
-            flash("Invalid start date format.", "warning")
-            logger.warning(f"User {username} provided invalid start date: {start_date}")
-    if end_date:
-        try:
-            local_dt = datetime.strptime(end_date, '%Y-%m-%d')
-            local_dt = local_tz.localize(local_dt)
-            utc_dt = local_dt.astimezone(pytz.utc)
-            query += " AND DATE(timestamp) <= ?"
-            params.append(utc_dt.strftime('%Y-%m-%d'))
-        except ValueError:
-            flash("Invalid end date format.", "warning")
-            logger.warning(f"User {username} provided invalid end date: {end_date}")
-
+    query = "SELECT id, timestamp, username, action, target, details FROM audit_log WHERE 1=1" + filter_clause
     query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
-    params.extend([PER_PAGE, (page - 1) * PER_PAGE])
+    params = filter_params + [PER_PAGE, (page - 1) * PER_PAGE]
 
     try:
         with get_db() as conn:
@@ -88,16 +91,14 @@ def view_audit_log():
             c.execute(query, params)
             rows = c.fetchall()
 
+            converter = LocalTimeConverter(local_tz)
             logs = []
             for row in rows:
-                utc_dt = datetime.strptime(row[1], '%Y-%m-%d %H:%M:%S')
-                utc_dt = pytz.utc.localize(utc_dt)
-                local_dt = utc_dt.astimezone(local_tz)
-                local_timestamp = local_dt.strftime('%Y-%m-%d %H:%M:%S')
-                details = parse_and_convert_timestamp(row[5] or '', local_tz)
+                local_timestamp = converter.to_local(row[1])
+                details = converter.convert_text(row[5])
                 logs.append((row[0], local_timestamp, row[2], row[3], row[4], details))
 
-            c.execute("SELECT COUNT(*) FROM audit_log WHERE 1=1" + _build_filter_clause(username_filter, action_filter, start_date, end_date, local_tz), _build_filter_params(username_filter, action_filter, start_date, end_date, local_tz))
+            c.execute("SELECT COUNT(*) FROM audit_log WHERE 1=1" + filter_clause, filter_params)
             total_logs = c.fetchone()[0]
 
             c.execute("SELECT DISTINCT action FROM audit_log ORDER BY action")
@@ -124,41 +125,45 @@ def view_audit_log():
                            end_date=end_date,
                            actions=actions)
 
-def _build_filter_clause(username, action, start_date, end_date, local_tz):
-    clause = ""
-    if username:
-        clause += " AND username LIKE ?"
-    if action:
-        clause += " AND action = ?"
-    if start_date:
-        clause += " AND DATE(timestamp) >= ?"
-    if end_date:
-        clause += " AND DATE(timestamp) <= ?"
-    return clause
+def build_audit_log_export(username, username_filter='', action_filter='', start_date='', end_date=''):
+    """
+    Return the CSV chunks for an audit log export with the on-screen filters.
 
-def _build_filter_params(username, action, start_date, end_date, local_tz):
-    params = []
-    if username:
-        params.append(f"%{username}%")
-    if action:
-        params.append(action)
-    if start_date:
-        try:
-            local_dt = datetime.strptime(start_date, '%Y-%m-%d')
-            local_dt = local_tz.localize(local_dt)
-            utc_dt = local_dt.astimezone(pytz.utc)
-            params.append(utc_dt.strftime('%Y-%m-%d'))
-        except ValueError:
-            pass
-    if end_date:
-        try:
-            local_dt = datetime.strptime(end_date, '%Y-%m-%d')
-            local_dt = local_tz.localize(local_dt)
-            utc_dt = local_dt.astimezone(pytz.utc)
-            params.append(utc_dt.strftime('%Y-%m-%d'))
-        except ValueError:
-            pass
-    return params
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format.
+    """
+    local_tz = pytz.timezone(Config.TIMEZONE)
+    filter_clause, filter_params, invalid_dates = _build_audit_filters(username_filter, action_filter, start_date, end_date, local_tz)
+    if invalid_dates:
+        raise ValueError(f"Invalid date(s): {invalid_dates}")
+
+    converter = LocalTimeConverter(local_tz)
+
+    def format_row(row):
+        return [converter.to_local_us(row[0]), row[1], row[2], row[3], converter.convert_text(row[4])]
+
+    filters = f"username='{username_filter}', action='{action_filter}', start_date='{start_date}', end_date='{end_date}'"
+
+    def on_complete(count):
+        logger.info(f"User {username} successfully exported {count} audit log entries")
+        log_audit_action(username, 'export', 'audit_log', f"Exported {count} audit log entries as CSV, {filters}")
+
+    chunks = iter_csv(
+        "SELECT timestamp, username, action, target, details FROM audit_log WHERE 1=1" + filter_clause + " ORDER BY timestamp DESC",
+        filter_params,
+        ["Timestamp", "Username", "Action", "Target", "Details"],
+        format_row=format_row,
+        on_complete=on_complete
+    )
+    # Logged up front as well: a download abandoned part-way never reaches on_complete
+    log_audit_action(username, 'export_started', 'audit_log', f"Started audit log CSV export, {filters}")
+    return chunks
+
+@job_handler('export_audit_log')
+def run_audit_log_export_job(job, payload):
+    """Background job: write an audit log export to a downloadable file."""
+    chunks = build_audit_log_export(job.username, *payload['filters'])
+    return save_export(job, chunks, 'audit_log_export.csv')
 
 @audit_log_bp.route('/admin/auditlog/export', methods=['GET'], strict_slashes=False)
 @login_required
@@ -166,35 +171,25 @@ def _build_filter_params(username, action, start_date, end_date, local_tz):
 def export_audit_log():
     username = current_user.username
     logger.debug(f"User {username} requested audit log export")
-    
-    log_audit_action(username, 'export', 'audit_log', 'Exported audit log as CSV')
 
-    try:
-        with get_db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT timestamp, username, action, target, details FROM audit_log ORDER BY timestamp DESC")
-            rows = c.fetchall()
-
-            local_tz = pytz.timezone(Config.TIMEZONE)
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(["Timestamp", "Username", "Action", "Target", "Details"])
-
-            for row in rows:
-                utc_dt = datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S')
-                utc_dt = pytz.utc.localize(utc_dt)
-                local_dt = utc_dt.astimezone(local_tz)
-                local_timestamp = local_dt.strftime('%m-%d-%Y %H:%M:%S')
-                details = parse_and_convert_timestamp(row[4] or '', local_tz)
-                writer.writerow([local_timestamp, row[1], row[2], row[3], details])
-
-            output.seek(0)
-            logger.info(f"User {username} successfully exported audit log")
-            return send_file(io.BytesIO(output.getvalue().encode()),
-                             mimetype='text/csv',
-                             as_attachment=True,
-                             download_name='audit_log_export.csv')
+    filters = _get_audit_filter_args()
+    background = request.args.get('background', 0, type=int) == 1
 
+    try:
+        if background:
+            # Validate the dates here so a bad range is reported on the page, not the job
+            invalid_dates = _build_audit_filters(*filters, pytz.timezone(Config.TIMEZONE))[2]
+            if invalid_dates:
+                raise ValueError(f"Invalid date(s): {invalid_dates}")
+            job_id = enqueue_job('export_audit_log', {'filters': filters}, username)
+            return redirect(url_for('jobs.view_job', job_id=job_id))
+
+        return csv_response(build_audit_log_export(username, *filters), 'audit_log_export.csv')
+
+    except ValueError as e:
+        logger.warning(f"User {username} requested audit log export with invalid dates: {str(e)}")
+        flash("Invalid date format for audit log export.", "warning")
+        return redirect(url_for('audit_log.view_audit_log'))
     except sqlite3.Error as e:
         logger.error(f"User {username} failed to export audit log: {str(e)}")
         log_audit_action(username, 'export_failed', 'audit_log', f"Database error: {str(e)}")
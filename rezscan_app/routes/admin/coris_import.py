@@ -1,11 +1,12 @@
 import logging
-import requests
-from flask import Blueprint, flash, redirect, url_for
+from flask import Blueprint, flash, redirect, url_for, request, current_app
 from rezscan_app.models.database import get_db
 from flask_login import login_required, current_user
 from rezscan_app.routes.common.auth import role_required
 from rezscan_app.config import Config
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.jobs import job_handler, enqueue_job
+from rezscan_app.utils.coris_sync import get_coris_client, sync_coris_residents
 
 coris_bp = Blueprint('coris_import', __name__)
 logger = logging.getLogger(__name__)
@@ -25,55 +26,55 @@ def get_api_settings():
         logger.error(f"Error fetching API settings: {str(e)}")
         return Config.CORIS_API_URL, Config.CORIS_API_KEY
 
+@job_handler('import_coris')
+def run_coris_import_job(job, payload):
+    """Background job: pull new and changed residents from CORIS and upsert them."""
+    username = job.username
+    url, api_key = get_api_settings()
+    full = payload.get('full', False)
+    client = get_coris_client(url, api_key, current_app.config)
+
+    try:
+        job.progress(0, None, "Fetching residents from CORIS", force=True)
+        stats = sync_coris_residents(
+            get_db(), client, full=full,
+            batch_size=current_app.config['CORIS_BATCH_SIZE'],
+            progress=job.progress
+        )
+    except Exception as e:
+        log_audit_action(username, 'import_coris_failed', 'residents', f"Import failed: {str(e)}")
+        logger.error(f"User {username} failed to import from CORIS: {str(e)}")
+        raise
+
+    if stats['not_modified']:
+        message = "CORIS reports no changes since the last import"
+    else:
+        message = f"{stats['added']} added, {stats['changed']} changed, {stats['unchanged']} unchanged"
+        if stats['removed'] is not None:
+            message += f", {stats['removed']} no longer in CORIS"
+    job.progress(stats['fetched'], stats['fetched'], message, force=True)
+    log_audit_action(
+        username, 'import_coris', 'residents',
+        f"{'Full' if full else 'Incremental'} sync: fetched {stats['fetched']}, added {stats['added']}, "
+        f"changed {stats['changed']}, unchanged {stats['unchanged']}, removed {stats['removed']}, skipped {stats['skipped']}"
+    )
+    logger.info(f"User {username} synced CORIS residents: {stats['added']} added, {stats['changed']} changed")
+    return stats
+
 @coris_bp.route('/admin/coris/import', methods=['GET'], strict_slashes=False)
 @login_required
 @role_required('admin')
 def import_coris_residents():
     username = current_user.username
     logger.debug(f"User {username} initiated CORIS import")
-    
-    CORIS_API_URL, CORIS_API_KEY = get_api_settings()
-    headers = {'Authorization': f'Bearer {CORIS_API_KEY}'}
-    
-    try:
-        response = requests.get(CORIS_API_URL, headers=headers)
-        response.raise_for_status()
-        data = response.json()
 
-        with get_db() as db:
-            c = db.cursor()
-            imported = 0
-
-            for r in data:
-                mdoc = r.get('mdoc')
-                name = r.get('name')
-                unit = r.get('area')  # Assuming API uses 'area', mapping to 'unit'
-                housing = r.get('housing_unit')
-                level = r.get('level')
-                photo = r.get('photo')
-
-                if not mdoc or not name:
-                    continue
-
-                c.execute("""
-                    INSERT INTO residents (mdoc, name, unit, housing_unit, level, photo)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(mdoc) DO UPDATE SET
-                        name=excluded.name,
-                        unit=excluded.unit,
-                        housing_unit=excluded.housing_unit,
-                        level=excluded.level,
-                        photo=excluded.photo
-                """, (mdoc, name, unit, housing, level, photo))
-                imported += 1
-
-            db.commit()
-            flash(f"✅ Imported or updated {imported} residents from CORIS.", "success")
-            log_audit_action(username, 'import_coris', 'residents', f"Imported/updated {imported} residents")
-            logger.info(f"User {username} successfully imported {imported} residents from CORIS")
+    try:
+        # ?full=1 ignores the stored watermark and re-fetches every resident
+        job_id = enqueue_job('import_coris', {'full': request.args.get('full') == '1'}, username)
     except Exception as e:
         flash(f"❌ CORIS import failed: {str(e)}", "danger")
-        log_audit_action(username, 'import_coris_failed', 'residents', f"Import failed: {str(e)}")
-        logger.error(f"User {username} failed to import from CORIS: {str(e)}")
+        logger.error(f"User {username} failed to start CORIS import: {str(e)}")
+        return redirect(url_for('admin.admin_dashboard'))
 
-    return redirect(url_for('admin.admin_dashboard'))
\ No newline at end of file
+    flash("CORIS import started.", "info")
+    return redirect(url_for('jobs.view_job', job_id=job_id, next=url_for('admin.admin_dashboard')))
@@ -6,6 +6,7 @@ from rezscan_app.routes.common.auth import role_required
 from rezscan_app.utils.logging_config import setup_logging
 from rezscan_app.utils.constants import LOCATION_TYPES
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.location_registry import invalidate_locations
 import sqlite3
 import logging
 from rezscan_app.config import Config
@@ -44,6 +45,7 @@ def manage_locations():
                 else:
                     try:
                         c.execute("INSERT INTO locations (bldg, name, prefix, type) VALUES (?, ?, ?, ?)", (bldg, name, prefix, location_type))
+                        invalidate_locations(conn)
                         conn.commit()
                         flash(f"Location '{name}' added.", "success")
                         log_audit_action(username, 'add_location', 'locations', f"Added location: {name}, bldg: {bldg}, prefix: {prefix}, type: {location_type}")
@@ -81,6 +83,8 @@ def delete_location(location_id):
             
             c.execute("DELETE FROM locations WHERE id = ?", (location_id,))
             deleted_rows = c.rowcount
+            if deleted_rows > 0:
+                invalidate_locations(conn)
             conn.commit()
             
             if deleted_rows > 0:
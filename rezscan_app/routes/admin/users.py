@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from rezscan_app.models.database import get_db
+from rezscan_app.models.User import User
 from werkzeug.security import generate_password_hash
 from rezscan_app.utils.constants import VALID_ROLES, MIN_PASSWORD_LENGTH
 from rezscan_app.routes.common.auth import role_required
@@ -126,6 +127,7 @@ def edit_user(username):
                     flash(f"User '{username}' not found.", "warning")
                 else:
                     conn.commit()
+                    User.invalidate()
                     logger.info(f"User {current_username} updated role for '{username}' to '{new_role}'")
                     log_audit_action(current_username, 'edit_user', 'users', f"Updated role for {username} to {new_role}")
                     flash(f"Role for '{username}' updated to '{new_role}'.", "success")
@@ -209,6 +211,7 @@ def delete_user(username):
                 flash(f"User '{username}' not found.", "warning")
             else:
                 conn.commit()
+                User.invalidate()
                 logger.info(f"User {current_username} deleted user '{username}'")
                 log_audit_action(current_username, 'delete_user', 'users', f"Deleted user {username}")
                 flash(f"User '{username}' deleted.", "warning")
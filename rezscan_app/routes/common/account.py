@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 from flask_login import login_required, current_user
 from werkzeug.security import generate_password_hash
 from rezscan_app.models.database import get_db
+from rezscan_app.models.User import User
 import logging
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -60,28 +61,14 @@ def account():
         logger.error(f"Error fetching housing units for user {current_user.username}: {str(e)}")
         flash("Error loading housing units.", "danger")
 
-    # Get user's current details
+    # Get user's current details (loaded with the user, see User.get)
     user_data = {
         'username': current_user.username,
         'role': current_user.role,
         'theme': current_user.theme,
-        'default_view': 'All Locations',
-        'default_unit': 'All Units'
+        'default_view': current_user.default_view or 'All Locations',
+        'default_unit': current_user.default_unit or 'All Units'
     }
-    try:
-        with get_db() as conn:
-            c = conn.cursor()
-            c.execute(
-                "SELECT default_view, default_unit FROM users WHERE username = ?",
-                (current_user.username,)
-            )
-            result = c.fetchone()
-            if result:
-                user_data['default_view'] = result[0] or 'All Locations'
-                user_data['default_unit'] = result[1] or 'All Units'
-    except Exception as e:
-        logger.error(f"Error fetching user data for {current_user.username}: {str(e)}")
-        flash("Error loading user data.", "danger")
 
     if request.method == 'POST':
         new_password = request.form.get('new_password')
@@ -134,6 +121,7 @@ def account():
                     )
 
                 conn.commit()
+                User.invalidate(current_user.id)
                 # Update current_user attributes to reflect changes
                 current_user.theme = theme
                 current_user.default_view = default_view
@@ -173,6 +161,7 @@ def update_theme():
                 (new_theme, current_user.id)
             )
             conn.commit()
+        User.invalidate(current_user.id)
 
         # Update current_user.theme to reflect the new theme
         current_user.theme = new_theme
@@ -0,0 +1,76 @@
+from flask import Blueprint, Response, request, current_app
+from flask_login import login_required, current_user
+from rezscan_app.models.database import get_db, get_sqlite_settings
+from rezscan_app.utils.scan_events import scan_event_bus, fetch_events_since
+import logging
+import sqlite3
+import queue
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/events/scans', methods=['GET'], strict_slashes=False)
+@login_required
+def scan_events():
+    """
+    Server-sent events stream of new scans.
+
+    Each event carries the scanid as its SSE id, so a reconnecting EventSource
+    resumes from Last-Event-ID. Streams end after SCAN_EVENTS_STREAM_SECONDS so
+    a worker thread is never held indefinitely; the browser reconnects on its own
+    after SCAN_EVENTS_RETRY seconds. An open stream occupies a request thread for
+    its whole length, so this needs threaded or gevent workers; under plain sync
+    workers every kiosk pins a worker.
+    """
+    username = current_user.username
+    config = current_app.config
+    scan_event_bus.start(get_sqlite_settings(), config['SCAN_EVENTS_POLL_INTERVAL'])
+
+    # Subscribe before reading the backlog so nothing falls between the two;
+    # overlap is skipped by id in the stream below
+    subscription = scan_event_bus.subscribe()
+    backlog = []
+    last_event_id = request.headers.get('Last-Event-ID', '').strip()
+    if last_event_id.isdigit():
+        try:
+            backlog = fetch_events_since(get_db(), int(last_event_id))
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching scan event backlog for user {username}: {str(e)}")
+    keepalive = config['SCAN_EVENTS_KEEPALIVE']
+    deadline = time.monotonic() + config['SCAN_EVENTS_STREAM_SECONDS']
+    logger.debug(f"User {username} subscribed to scan events (backlog={len(backlog)})")
+
+    def stream():
+        try:
+            yield f"retry: {config['SCAN_EVENTS_RETRY'] * 1000}\n\n"
+            last_sent = 0
+            for event in backlog:
+                last_sent = event['id']
+                yield _format_event(event)
+            while time.monotonic() < deadline:
+                try:
+                    event = subscription.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event['id'] <= last_sent:
+                    continue
+                last_sent = event['id']
+                yield _format_event(event)
+        finally:
+            scan_event_bus.unsubscribe(subscription)
+            logger.debug(f"User {username} scan event stream closed")
+
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Also covers clients that disconnect before the stream is first iterated
+    response.call_on_close(lambda: scan_event_bus.unsubscribe(subscription))
+    return response
+
+def _format_event(event):
+    return f"id: {event['id']}\nevent: scan\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,55 @@
+from flask import Blueprint, render_template, jsonify, request, abort, send_from_directory, current_app
+from flask_login import login_required, current_user
+from rezscan_app.utils.jobs import get_job
+from rezscan_app.utils.audit_logging import log_audit_action
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+jobs_bp = Blueprint('jobs', __name__)
+
+def _get_visible_job(job_id):
+    """Return the job if the current user started it or is an admin, otherwise abort."""
+    try:
+        job = get_job(job_id)
+    except sqlite3.Error as e:
+        logger.error(f"Database error loading job {job_id}: {str(e)}")
+        abort(500)
+    if job is None:
+        abort(404)
+    if job['username'] != current_user.username and current_user.role != 'admin':
+        logger.warning(f"User {current_user.username} denied access to job {job_id}")
+        abort(403)
+    return job
+
+def _safe_next(url):
+    # Only allow same-site relative redirects
+    return url if url and url.startswith('/') and not url.startswith('//') else None
+
+@jobs_bp.route('/jobs/<int:job_id>', methods=['GET'], strict_slashes=False)
+@login_required
+def job_status(job_id):
+    """JSON status of a background job: status, progress, total, message, result and error."""
+    return jsonify(_get_visible_job(job_id))
+
+@jobs_bp.route('/jobs/<int:job_id>/view', methods=['GET'], strict_slashes=False)
+@login_required
+def view_job(job_id):
+    job = _get_visible_job(job_id)
+    return render_template('common/job_status.html', job=job, next_url=_safe_next(request.args.get('next')))
+
+@jobs_bp.route('/jobs/<int:job_id>/download', methods=['GET'], strict_slashes=False)
+@login_required
+def download_job_file(job_id):
+    job = _get_visible_job(job_id)
+    result = job['result'] or {}
+    if job['status'] != 'succeeded' or not result.get('file'):
+        abort(404)
+    log_audit_action(current_user.username, 'download', 'job', f"Downloaded {result.get('download_name')} from job {job_id}")
+    return send_from_directory(
+        current_app.config['JOB_FILES_DIR'],
+        result['file'],
+        as_attachment=True,
+        download_name=result.get('download_name', result['file'])
+    )
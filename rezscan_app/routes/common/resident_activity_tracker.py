@@ -3,11 +3,14 @@ from flask_login import login_required, current_user
 from rezscan_app.models.database import get_db
 from datetime import datetime
 import logging
-import pandas as pd
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from rezscan_app.config import Config
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.scan_logic import update_current_status
+from rezscan_app.utils.scan_events import publish_scan_event
+from rezscan_app.utils.location_registry import get_locations
+from rezscan_app.utils.scan_rollups import HEATMAP_RANGES, DEFAULT_HEATMAP_RANGE, heatmap_start_hour, read_occupancy_heatmap
 import pytz
 
 resident_activity_tracker_bp = Blueprint('resident_activity_tracker', __name__)
@@ -36,27 +39,15 @@ def live_dashboard():
     locations = []
     buildings = []
     try:
-        with get_db() as conn:
-            c = conn.cursor()
-            c.execute('SELECT name, bldg FROM locations ORDER BY name')
-            location_data = c.fetchall()
-            locations = [row[0] for row in location_data]
-            buildings = sorted(list(set(row[1] for row in location_data)))
+        location_data = get_locations()
+        locations = [loc['name'] for loc in location_data]
+        buildings = sorted(list(set(loc['bldg'] for loc in location_data)))
     except Exception as e:
         logger.error(f"Error fetching locations/buildings for user {current_user.username}: {str(e)}")
         flash("Error loading locations/buildings.", "danger")
 
-    # Get user's default_view from users table
-    default_view = 'All Locations'
-    try:
-        with get_db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT default_view FROM users WHERE username = ?", (current_user.username,))
-            result = c.fetchone()
-            if result and result[0]:
-                default_view = result[0]
-    except Exception as e:
-        logger.error(f"Error fetching default_view for user {current_user.username}: {str(e)}")
+    # default_view is loaded with the user (see User.get)
+    default_view = current_user.default_view or 'All Locations'
 
     # Determine view_type and selected_view based on default_view and URL params
     view_type = request.args.get('view_type', None)
@@ -95,43 +86,29 @@ def live_dashboard():
                 details=f'Accessed resident activity dashboard with sort={sort}, direction={direction}, view_type={view_type}, view={selected_view}'
             )
 
-            # Get latest scans
-            c.execute('''
-                SELECT s.mdoc, MAX(s.timestamp) AS latest_time, r.name
-                FROM scans s
-                LEFT JOIN residents r ON s.mdoc = r.mdoc
-                GROUP BY s.mdoc
-            ''')
-            latest_scans = c.fetchall()
-            logger.debug(f"Retrieved {len(latest_scans)} latest scans")
+            # Current 'In' residents in one set-based read of resident_current_status,
+            # with view filters and sorting done by SQLite
+            query = '''
+                SELECT r.name, cs.mdoc, r.unit, r.housing_unit, r.level, cs.timestamp, cs.location, l.bldg
+                FROM resident_current_status cs
+                LEFT JOIN residents r ON cs.mdoc = r.mdoc
+                LEFT JOIN locations l ON cs.location = l.name
+                WHERE cs.status = 'In'
+            '''
+            params = []
+            if view_type == 'Location' and selected_view != 'All Locations':
+                query += ' AND cs.location = ?'
+                params.append(selected_view)
+            elif view_type == 'Building' and selected_view != 'All Buildings':
+                query += ' AND l.bldg = ?'
+                params.append(selected_view)
+            order_by = "LOWER(COALESCE(r.name, 'Unknown Resident'))" if sort == 'name' else 'cs.timestamp'
+            query += f' ORDER BY {order_by} {direction.upper()}'
+            c.execute(query, params)
+            checked_in = c.fetchall()
 
-            for mdoc, latest_time, name in latest_scans:
-                query = '''
-                    SELECT r.name, s.mdoc, r.unit, r.housing_unit, r.level, s.timestamp, s.location, l.bldg
-                    FROM scans s
-                    LEFT JOIN residents r ON s.mdoc = r.mdoc
-                    LEFT JOIN locations l ON s.location = l.name
-                    WHERE s.mdoc = ? AND s.timestamp = ? AND s.status = 'In'
-                '''
-                params = (mdoc, latest_time)
-                if view_type == 'Location' and selected_view != 'All Locations':
-                    query += ' AND s.location = ?'
-                    params += (selected_view,)
-                elif view_type == 'Building' and selected_view != 'All Buildings':
-                    query += ' AND l.bldg = ?'
-                    params += (selected_view,)
-                c.execute(query, params)
-                result = c.fetchone()
-                if result:
-                    checked_in.append(result)
-            
             logger.debug(f"Filtered to {len(checked_in)} checked-in residents for view_type={view_type}, selected_view={selected_view}")
 
-            if sort == 'name':
-                checked_in.sort(key=lambda x: (x[0] or 'Unknown Resident').lower(), reverse=(direction == 'desc'))
-            elif sort == 'timestamp':
-                checked_in.sort(key=lambda x: x[5], reverse=(direction == 'desc'))
-
             logger.info(f"User {current_user.username} successfully loaded {len(checked_in)} checked-in residents")
             conn.commit()
 
@@ -181,6 +158,7 @@ def check_out():
                 "INSERT INTO scans (mdoc, timestamp, status, location) VALUES (?, ?, ?, ?)",
                 (mdoc, current_timestamp, "Out", location)
             )
+            update_current_status(c, mdoc, current_timestamp, "Out", location)
             log_audit_action(
                 username=current_user.username,
                 action='check_out',
@@ -188,6 +166,7 @@ def check_out():
                 details=f'Checked out resident from {location}'
             )
             conn.commit()
+            publish_scan_event()
 
             logger.info(f"User {current_user.username} successfully checked out resident {resident_name} from {location}")
             flash(f"Resident {resident_name} checked out successfully.", "success")
@@ -210,11 +189,12 @@ def check_out():
 def heatmap_data():
     logger.debug(f"User {current_user.username} accessing heatmap data")
     
-    date_filter = request.args.get('date_filter', '1 day')
-    
+    date_filter = request.args.get('date_filter', DEFAULT_HEATMAP_RANGE)
+    if date_filter not in HEATMAP_RANGES:
+        date_filter = DEFAULT_HEATMAP_RANGE
+
     try:
         with get_db() as conn:
-            c = conn.cursor()
             log_audit_action(
                 username=current_user.username,
                 action='view',
@@ -222,40 +202,15 @@ def heatmap_data():
                 details=f'Accessed resident activity heatmap data with date_filter={date_filter}'
             )
 
-            c.execute('''
-                SELECT s.mdoc, MAX(s.timestamp) AS latest_time, r.name, r.unit, r.housing_unit, r.level, s.location
-                FROM scans s
-                LEFT JOIN residents r ON s.mdoc = r.mdoc
-                WHERE s.status = 'In' AND s.timestamp >= datetime('now', ?)
-                GROUP BY s.mdoc
-            ''', (f'-{date_filter}',))
-            data = c.fetchall()
-
-            if not data:
-                logger.warning("No checked-in residents found for heatmap")
-                return jsonify({
-                    'locations': [],
-                    'time_buckets': [],
-                    'values': []
-                })
-
-            df = pd.DataFrame(data, columns=['mdoc', 'latest_time', 'name', 'unit', 'housing_unit', 'level', 'location'])
-            df['timestamp'] = pd.to_datetime(df['latest_time'])
-            df['time_bucket'] = df['timestamp'].dt.floor('H').dt.strftime('%Y-%m-%d %H:00')
-
-            heatmap_data = df.groupby(['location', 'time_bucket']).size().unstack(fill_value=0)
-            locations = heatmap_data.index.tolist()
-            time_buckets = heatmap_data.columns.tolist()
-            values = heatmap_data.values.tolist()
+            # Hourly occupancy per location, pre-aggregated on write (migration 8)
+            heatmap_data = read_occupancy_heatmap(conn, heatmap_start_hour(date_filter))
+            if not heatmap_data['time_buckets']:
+                logger.warning("No scans found for heatmap")
 
-            logger.info(f"User {current_user.username} successfully loaded heatmap data with {len(locations)} locations and {len(time_buckets)} time buckets")
+            logger.info(f"User {current_user.username} successfully loaded heatmap data with {len(heatmap_data['locations'])} locations and {len(heatmap_data['time_buckets'])} time buckets")
             conn.commit()
 
-            return jsonify({
-                'locations': locations,
-                'time_buckets': time_buckets,
-                'values': values
-            })
+            return jsonify(heatmap_data)
 
     except Exception as e:
         logger.error(f"Error generating heatmap data for user {current_user.username}: {str(e)}", exc_info=True)
@@ -283,4 +238,4 @@ def heatmap():
             conn.commit()
     except Exception as e:
         logger.error(f"Failed to write audit log for heatmap page access: {str(e)}")
-    return render_template('common/heatmap.html')
\ No newline at end of file
+    return render_template('common/heatmap.html', ranges=list(HEATMAP_RANGES), default_range=DEFAULT_HEATMAP_RANGE)
\ No newline at end of file
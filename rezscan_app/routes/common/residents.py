@@ -1,19 +1,20 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file, jsonify, g
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, g
 from flask_login import login_required, current_user
 from rezscan_app.models.database import get_db
 from rezscan_app.routes.common.auth import role_required
 from rezscan_app.utils.constants import UNIT_OPTIONS, HOUSING_OPTIONS, LEVEL_OPTIONS, CSV_REQUIRED_HEADERS, CSV_OPTIONAL_HEADERS
 from rezscan_app.utils.file_utils import save_uploaded_file, allowed_file
 from rezscan_app.utils.logging_config import setup_logging
-from datetime import datetime
 import sqlite3
 import logging
-import csv
-import io
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.exports import iter_csv, csv_response, save_export
+from rezscan_app.utils.jobs import job_handler, enqueue_job, job_file_path
+import rezscan_app.utils.resident_import  # Registers the import_residents job handler
 import re
+import uuid
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -30,20 +31,14 @@ def user_key_func():
         return current_user.username
     return get_remote_address()
 
-@residents_bp.route('/residents', methods=['GET', 'POST'], strict_slashes=False)
-@login_required
-def residents():
-    username = current_user.username if current_user.is_authenticated else 'unknown'
-    logger.debug(f"User {username} accessing /admin/residents route")
-    
+def _get_resident_filter_args():
+    """Read and validate the residents list filters and sort from the query string."""
     search = request.args.get('search', '').strip()
     filter_unit = request.args.get('filterUnit', '').strip()
     filter_housing = request.args.get('filterHousing', '').strip()
     filter_level = request.args.get('filterLevel', '').strip()
     sort = request.args.get('sort', 'name')
     direction = request.args.get('direction', 'asc')
-    page = int(request.args.get('page', 1)) if request.args.get('page', '1').isdigit() else 1
-    per_page = 10
 
     if filter_unit not in UNIT_OPTIONS:
         filter_unit = ''
@@ -51,31 +46,48 @@ def residents():
         filter_housing = ''
     if filter_level not in LEVEL_OPTIONS:
         filter_level = ''
+    if sort not in ['name', 'mdoc', 'level']:
+        sort = 'name'
+    if direction not in ['asc', 'desc']:
+        direction = 'asc'
+    return search, filter_unit, filter_housing, filter_level, sort, direction
 
-    query = "SELECT id, name, mdoc, unit, housing_unit, level, photo FROM residents WHERE 1=1"
+def _build_resident_filters(search, filter_unit, filter_housing, filter_level):
+    """Return the WHERE clause and params shared by the residents list, its count and the export."""
+    clause = ""
     params = []
-
     if search:
-        query += " AND (name LIKE ? OR mdoc LIKE ?)"
+        clause += " AND (name LIKE ? OR mdoc LIKE ?)"
         params.extend([f'%{search}%', f'%{search}%'])
     if filter_unit:
-        query += " AND unit = ?"
+        clause += " AND unit = ?"
         params.append(filter_unit)
     if filter_housing:
-        query += " AND housing_unit = ?"
+        clause += " AND housing_unit = ?"
         params.append(filter_housing)
     if filter_level:
-        query += " AND level = ?"
+        clause += " AND level = ?"
         params.append(filter_level)
+    return clause, params
 
-    if sort not in ['name', 'mdoc', 'level']:
-        sort = 'name'
-    if direction not in ['asc', 'desc']:
-        direction = 'asc'
+def _resident_order_by(sort, direction):
+    return f" ORDER BY {'CAST(mdoc AS INTEGER)' if sort == 'mdoc' else sort} {direction}"
+
+@residents_bp.route('/residents', methods=['GET', 'POST'], strict_slashes=False)
+@login_required
+def residents():
+    username = current_user.username if current_user.is_authenticated else 'unknown'
+    logger.debug(f"User {username} accessing /admin/residents route")
+    
+    search, filter_unit, filter_housing, filter_level, sort, direction = _get_resident_filter_args()
+    page = int(request.args.get('page', 1)) if request.args.get('page', '1').isdigit() else 1
+    per_page = 10
 
-    query += f" ORDER BY {'CAST(mdoc AS INTEGER)' if sort == 'mdoc' else sort} {direction}"
+    filter_clause, filter_params = _build_resident_filters(search, filter_unit, filter_housing, filter_level)
+    query = "SELECT id, name, mdoc, unit, housing_unit, level, photo FROM residents WHERE 1=1" + filter_clause
+    query += _resident_order_by(sort, direction)
     query += " LIMIT ? OFFSET ?"
-    params.extend([per_page, (page - 1) * per_page])
+    params = filter_params + [per_page, (page - 1) * per_page]
 
     try:
         with get_db() as conn:
@@ -84,21 +96,7 @@ def residents():
             columns = ['id', 'name', 'mdoc', 'unit', 'housing_unit', 'level', 'photo']
             residents = [dict(zip(columns, row)) for row in c.fetchall()]
 
-            count_query = "SELECT COUNT(*) FROM residents WHERE 1=1"
-            count_params = []
-            if search:
-                count_query += " AND (name LIKE ? OR mdoc LIKE ?)"
-                count_params.extend([f'%{search}%', f'%{search}%'])
-            if filter_unit:
-                count_query += " AND unit = ?"
-                count_params.append(filter_unit)
-            if filter_housing:
-                count_query += " AND housing_unit = ?"
-                count_params.append(filter_housing)
-            if filter_level:
-                count_query += " AND level = ?"
-                count_params.append(filter_level)
-            c.execute(count_query, count_params)
+            c.execute("SELECT COUNT(*) FROM residents WHERE 1=1" + filter_clause, filter_params)
             filtered_count = c.fetchone()[0]
 
             c.execute("SELECT COUNT(*) FROM residents")
@@ -456,6 +454,41 @@ def delete_all_residents():
     
     return redirect(url_for('admin.admin_dashboard'))
 
+def build_residents_export(username, search='', filter_unit='', filter_housing='', filter_level='', sort='name', direction='asc'):
+    """Return the CSV chunks for a resident export with the on-screen filters and sort."""
+    filter_clause, filter_params = _build_resident_filters(search, filter_unit, filter_housing, filter_level)
+    
+    filters = f"search='{search}', unit='{filter_unit}', housing='{filter_housing}', level='{filter_level}'"
+    
+    def on_complete(count):
+        logger.info(f"User {username} exported {count} resident records to CSV")
+        log_audit_action(
+            username=username,
+            action='export',
+            target='residents',
+            details=f"Exported {count} resident records to CSV, {filters}"
+        )
+    
+    chunks = iter_csv(
+        "SELECT id, name, mdoc, unit, housing_unit, level, photo FROM residents WHERE 1=1" + filter_clause + _resident_order_by(sort, direction),
+        filter_params,
+        ['ID', 'Name', 'MDOC', 'Unit', 'Housing Unit', 'Level', 'Photo'],
+        on_complete=on_complete
+    )
+    # Logged up front as well: a download abandoned part-way never reaches on_complete
+    log_audit_action(
+        username=username,
+        action='export_started',
+        target='residents',
+        details=f"Started resident CSV export, {filters}"
+    )
+    return chunks
+
+@job_handler('export_residents')
+def run_residents_export_job(job, payload):
+    """Background job: write a resident export to a downloadable file."""
+    return save_export(job, build_residents_export(job.username, *payload['filters']), 'residents.csv')
+
 @residents_bp.route('/residents/export', strict_slashes=False)
 @login_required
 @role_required('admin')
@@ -464,34 +497,14 @@ def export_residents():
     username = current_user.username if current_user.is_authenticated else 'unknown'
     logger.debug(f"User {username} accessing /admin/residents/export route")
     
+    filters = _get_resident_filter_args()
+    
     try:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['ID', 'Name', 'MDOC', 'Unit', 'Housing Unit', 'Level', 'Photo'])
+        if request.args.get('background', 0, type=int) == 1:
+            job_id = enqueue_job('export_residents', {'filters': filters}, username)
+            return redirect(url_for('jobs.view_job', job_id=job_id))
         
-        with get_db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT id, name, mdoc, unit, housing_unit, level, photo FROM residents ORDER BY name")
-            rows = c.fetchall()
-            
-            for row in rows:
-                writer.writerow(row)
-            
-            logger.info(f"User {username} exported {len(rows)} resident records to CSV")
-            log_audit_action(
-                username=username,
-                action='export',
-                target='residents',
-                details=f"Exported {len(rows)} resident records to CSV"
-            )
-        
-        output.seek(0)
-        return send_file(
-            io.BytesIO(output.getvalue().encode()),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name='residents.csv'
-        )
+        return csv_response(build_residents_export(username, *filters), 'residents.csv')
     
     except sqlite3.Error as e:
         logger.error(f"Database error for user {username} during resident export: {str(e)}")
@@ -539,18 +552,6 @@ def upload_residents():
     username = current_user.username if current_user.is_authenticated else 'unknown'
     logger.debug(f"User {username} accessing /admin/residents/import/upload route")
     
-    messages = []
-    stats = {
-        'added': 0,
-        'updated': 0,
-        'deleted': 0,
-        'failed': 0,
-        'processed': 0
-    }
-    preview_changes = []
-    update_diffs = []
-    backup_entries = []
-
     file = request.files.get('csv_file')
     dry_run = request.form.get('dry_run') == 'yes'
 
@@ -577,164 +578,22 @@ def upload_residents():
         return jsonify({'success': False, 'message': 'Invalid file type. Only CSV files allowed.'}), 400
 
     try:
-        stream = io.StringIO(file.stream.read().decode("utf-8-sig"), newline=None)
-        reader = csv.DictReader(stream)
-        reader.fieldnames = [f.lower() for f in reader.fieldnames]
-
-        csv_data = {}
-        for raw_row in reader:
-            row = {k.lower(): v for k, v in raw_row.items()}
-
-            if not row.get('mdoc'):
-                stats['failed'] += 1
-                messages.append(f"✘ Missing MDOC for row: {raw_row}")
-                logger.warning(f"User {username} skipped row in CSV import: Missing MDOC")
-                continue
-
-            if not re.match(r'^\d{1,10}$', row['mdoc']):
-                stats['failed'] += 1
-                messages.append(f"✘ Invalid MDOC format for row: {row['mdoc']}")
-                logger.warning(f"User {username} skipped row in CSV import: Invalid MDOC format {row['mdoc']}")
-                continue
-
-            housing_unit = row.get('housing_unit', '')
-            replacements = {
-                'women ctr': "Women's Center",
-                'a walk': "SMWRC",
-                'b walk': "SMWRC",
-                'c walk': "SMWRC",
-                'd walk': "SMWRC",
-            }
-            for key, value in replacements.items():
-                if housing_unit.lower() == key:
-                    row['housing_unit'] = value
-                    break
-
-            csv_data[row['mdoc']] = row
+        text = file.stream.read().decode("utf-8-sig")
 
-        with get_db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT * FROM residents")
-            existing = {row['mdoc']: dict(row) for row in c.fetchall()}
-
-            for mdoc, new_data in csv_data.items():
-                stats['processed'] += 1
-                if mdoc not in existing:
-                    preview_changes.append(f"➕ Add: {new_data['name']}")
-                    stats['added'] += 1
-                    if not dry_run:
-                        try:
-                            c.execute("INSERT INTO residents (name, mdoc, unit, housing_unit, level, photo) VALUES (?, ?, ?, ?, ?, ?)",
-                                      (new_data['name'], new_data['mdoc'], new_data['unit'], new_data.get('housing_unit', ''), new_data['level'], new_data.get('photo', '')))
-                            logger.debug(f"User {username} added resident MDOC {mdoc} during import")
-                        except sqlite3.Error as e:
-                            stats['failed'] += 1
-                            messages.append(f"✘ Error adding {new_data['name']}: {str(e)}")
-                            logger.error(f"User {username} failed to add resident MDOC {mdoc}: {str(e)}")
-                else:
-                    current = existing[mdoc]
-                    diffs = {}
-                    for field in ['name', 'unit', 'housing_unit', 'level', 'photo']:
-                        if str(current[field]) != str(new_data.get(field, '')):
-                            diffs[field] = {'from': current[field], 'to': new_data.get(field, '')}
-
-                    if diffs:
-                        preview_changes.append(f"✏️ Update: {new_data['name']}")
-                        update_diffs.append({
-                            'mdoc': mdoc,
-                            'name': new_data['name'],
-                            'diffs': diffs
-                        })
-                        stats['updated'] += 1
-                        if not dry_run:
-                            try:
-                                backup_entries.append((mdoc, current['name'], current['unit'], current['housing_unit'], current['level'], current['photo']))
-                                c.execute("UPDATE residents SET name=?, unit=?, housing_unit=?, level=?, photo=? WHERE mdoc=?",
-                                          (new_data['name'], new_data['unit'], new_data.get('housing_unit', ''), new_data['level'], new_data.get('photo', ''), mdoc))
-                                logger.debug(f"User {username} updated resident MDOC {mdoc} during import")
-                            except sqlite3.Error as e:
-                                stats['failed'] += 1
-                                messages.append(f"✘ Error updating {new_data['name']}: {str(e)}")
-                                logger.error(f"User {username} failed to update resident MDOC {mdoc}: {str(e)}")
-
-            for mdoc in existing:
-                if mdoc not in csv_data:
-                    preview_changes.append(f"❌ Delete: {existing[mdoc]['name']}")
-                    stats['deleted'] += 1
-                    if not dry_run:
-                        try:
-                            current = existing[mdoc]
-                            backup_entries.append((mdoc, current['name'], current['unit'], current['housing_unit'], current['level'], current['photo']))
-                            c.execute("DELETE FROM residents WHERE mdoc = ?", (mdoc,))
-                            logger.debug(f"User {username} deleted resident MDOC {mdoc} during import")
-                        except sqlite3.Error as e:
-                            stats['failed'] += 1
-                            messages.append(f"✘ Error deleting MDOC {mdoc}: {str(e)}")
-                            logger.error(f"User {username} failed to delete resident MDOC {mdoc}: {str(e)}")
-
-            if not dry_run:
-                conn.commit()
-                messages.append("✅ Changes committed to database.")
-                logger.info(f"User {username} committed resident import: {stats['added']} added, {stats['updated']} updated, {stats['deleted']} deleted, {stats['failed']} failed")
-                
-                try:
-                    timestamp = datetime.utcnow().isoformat()
-                    summary = (stats['added'], stats['updated'], stats['deleted'], stats['failed'], stats['processed'])
-
-                    file.stream.seek(0)
-                    raw_csv = file.stream.read().decode("utf-8-sig")
-
-                    c.execute("""
-                        INSERT INTO import_history (timestamp, username, added, updated, deleted, failed, total, csv_content)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (timestamp, username, *summary, raw_csv))
-                    import_id = c.lastrowid
-
-                    for b in backup_entries:
-                        c.execute("""
-                            INSERT INTO resident_backups (import_id, mdoc, name, unit, housing_unit, level, photo)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """, (import_id, *b))
-
-                    conn.commit()
-                    logger.info(f"User {username} logged import to history @ {timestamp} with {len(backup_entries)} backup(s)")
-                    log_audit_action(
-                        username=username,
-                        action='import_residents',
-                        target='residents',
-                        details=f"Imported residents: {stats['added']} added, {stats['updated']} updated, {stats['deleted']} deleted, {stats['failed']} failed"
-                    )
-                except sqlite3.Error as e:
-                    logger.error(f"User {username} failed to log import history or backups: {str(e)}")
-                    log_audit_action(
-                        username=username,
-                        action='error',
-                        target='residents_import',
-                        details=f"Failed to log import history: {str(e)}"
-                    )
-                    messages.append(f"⚠️ Warning: Failed to log import history: {str(e)}")
-                    flash(f"Warning: Failed to log import history: {str(e)}", 'error')
-            else:
-                messages.append("🧪 Dry Run: No changes committed.")
-                logger.info(f"User {username} performed dry run import: {stats['processed']} rows processed")
-
-        log_audit_action(
-            username=username,
-            action='import_residents' if not dry_run else 'import_residents_dry_run',
-            target='residents',
-            details=f"Processed {stats['processed']} rows: {stats['added']} added, {stats['updated']} updated, {stats['deleted']} deleted, {stats['failed']} failed"
-        )
+        # Hand the roster to a background job; the page polls the status URL
+        path = job_file_path(f"upload-{uuid.uuid4().hex}.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        job_id = enqueue_job('import_residents', {'path': path, 'dry_run': dry_run}, username)
 
         if not dry_run:
-            flash(f"Import successful: {stats['added']} added, {stats['updated']} updated, {stats['deleted']} deleted, {stats['failed']} failed", 'success')
+            flash("Resident import started.", 'info')
 
         return jsonify({
             'success': True,
-            'messages': messages,
-            'stats': stats,
-            'preview_changes': preview_changes,
-            'update_diffs': update_diffs
-        })
+            'job_id': job_id,
+            'status_url': url_for('jobs.job_status', job_id=job_id)
+        }), 202
 
     except UnicodeDecodeError as e:
         logger.error(f"User {username} failed to read CSV: Invalid encoding - {str(e)}")
@@ -747,6 +606,17 @@ def upload_residents():
         flash(f"Invalid CSV encoding: {str(e)}", 'error')
         return jsonify({'success': False, 'message': f"Invalid CSV encoding: {str(e)}"}), 400
 
+    except ValueError as e:
+        logger.warning(f"User {username} uploaded an invalid resident CSV: {str(e)}")
+        log_audit_action(
+            username=username,
+            action='import_residents_failed',
+            target='residents',
+            details=f"Invalid CSV: {str(e)}"
+        )
+        flash(f"Invalid CSV: {str(e)}", 'error')
+        return jsonify({'success': False, 'message': f"Invalid CSV: {str(e)}"}), 400
+
     except sqlite3.Error as e:
         logger.error(f"Database error for user {username} during resident import: {str(e)}")
         log_audit_action(
@@ -782,18 +652,8 @@ def unit_residents():
     page = int(request.args.get('page', 1)) if request.args.get('page', '1').isdigit() else 1
     per_page = 10
 
-    # Get default_unit from users
-    default_unit = 'All Units'
-    try:
-        with get_db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT default_unit FROM users WHERE username = ?", (username,))
-            result = c.fetchone()
-            if result and result[0]:
-                default_unit = result[0]
-    except sqlite3.Error as e:
-        logger.error(f"Error fetching default_unit for user {username}: {str(e)}")
-        flash("Error loading user settings.", "danger")
+    # default_unit is loaded with the user (see User.get)
+    default_unit = current_user.default_unit or 'All Units'
 
     # Get level options
     level_options = []
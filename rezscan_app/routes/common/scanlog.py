@@ -1,17 +1,18 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, send_file, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import current_user, login_required
 from rezscan_app.models.database import get_db
 from rezscan_app.routes.common.auth import role_required
 from rezscan_app.utils.logging_config import setup_logging
-from rezscan_app.utils.constants import DATEFORMAT, TIMEFORMAT
 import logging
 import sqlite3
-import io
-import csv
 from datetime import datetime
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.cache import TTLCache
+from rezscan_app.utils.dashboard_stats import invalidate_dashboard_stats
+from rezscan_app.utils.exports import iter_csv, csv_response, save_export, split_timestamp
+from rezscan_app.utils.jobs import job_handler, enqueue_job
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -23,11 +24,102 @@ limiter = Limiter(
     default_limits=["200 per day", "50 per hour"]
 )
 
+# Page counts and dropdown options are approximate for up to these many seconds
+SCANLOG_COUNT_TTL = 60
+SCANLOG_OPTIONS_TTL = 300
+
+_count_cache = TTLCache(ttl=SCANLOG_COUNT_TTL, max_size=256)
+_options_cache = TTLCache(ttl=SCANLOG_OPTIONS_TTL, max_size=1)
+
 def user_key_func():
     if current_user.is_authenticated:
         return current_user.username
     return get_remote_address()
 
+def _build_scan_filters(search, status, location):
+    """Return the WHERE clause fragments and params shared by the page and count queries."""
+    clauses = []
+    params = []
+    if search:
+        clauses.append('(s.mdoc LIKE ? OR r.name LIKE ?)')
+        search_param = f'%{search}%'
+        params.extend([search_param, search_param])
+    if status:
+        clauses.append('s.status = ?')
+        params.append(status)
+    if location:
+        clauses.append('s.location = ?')
+        params.append(location)
+    return clauses, params
+
+def _count_scans(c, search, status, location):
+    """Total matching scans, cached per filter combination for SCANLOG_COUNT_TTL seconds."""
+    def compute():
+        clauses, params = _build_scan_filters(search, status, location)
+        query = 'SELECT COUNT(*) FROM scans s'
+        if search:
+            query += ' LEFT JOIN residents r ON s.mdoc = r.mdoc'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        c.execute(query, params)
+        return c.fetchone()[0]
+    return _count_cache.get_or_set((search, status, location), compute)
+
+def _filter_options(c):
+    """Distinct statuses and locations for the filter dropdowns, cached for SCANLOG_OPTIONS_TTL seconds."""
+    def compute():
+        # Both columns are indexed, so DISTINCT reads the index instead of the table
+        c.execute('SELECT DISTINCT status FROM scans ORDER BY status')
+        status_options = [row[0] for row in c.fetchall() if row[0]]
+        c.execute('SELECT DISTINCT location FROM scans ORDER BY location')
+        location_options = [row[0] for row in c.fetchall() if row[0]]
+        return status_options, location_options
+    return _options_cache.get_or_set('options', compute)
+
+def fetch_scan_page(c, per_page, search='', status='', location='', after=None, before=None, last=False):
+    """
+    Fetch one page of the scan log using keyset pagination on (timestamp, scanid).
+
+    Args:
+        c: Database cursor.
+        per_page: Rows per page.
+        search, status, location: Optional filters.
+        after: scanid of the last row of the previous page; returns the next older page.
+        before: scanid of the first row of the current page; returns the next newer page.
+        last: Return the oldest page.
+
+    Returns:
+        Tuple of (rows, has_newer, has_older). Rows are
+        (mdoc, name, timestamp, status, location, scanid), newest first.
+    """
+    clauses, params = _build_scan_filters(search, status, location)
+    cursor_id = after if after is not None else before
+    if cursor_id is not None:
+        c.execute('SELECT timestamp FROM scans WHERE scanid = ?', (cursor_id,))
+        row = c.fetchone()
+        if row is None:
+            cursor_id = after = before = None
+        else:
+            clauses.append('(s.timestamp, s.scanid) < (?, ?)' if after is not None else '(s.timestamp, s.scanid) > (?, ?)')
+            params.extend([row[0], cursor_id])
+
+    # Walk backwards from the oldest end when paging towards newer rows
+    ascending = before is not None or last
+    direction = 'ASC' if ascending else 'DESC'
+    query = 'SELECT s.mdoc, r.name, s.timestamp, s.status, s.location, s.scanid FROM scans s LEFT JOIN residents r ON s.mdoc = r.mdoc'
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += f' ORDER BY s.timestamp {direction}, s.scanid {direction} LIMIT ?'
+    c.execute(query, params + [per_page + 1])
+    rows = c.fetchall()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if ascending:
+        rows.reverse()
+        return rows, has_more, before is not None
+    return rows, after is not None, has_more
+
 @scanlog_bp.route('/scanlog', methods=['GET'], strict_slashes=False)
 @login_required
 def scanlog():
@@ -35,9 +127,11 @@ def scanlog():
     logger.debug(f"User {username} accessing /admin/scanlog route")
     
     # Pagination and filter parameters
-    page = request.args.get('page', 1, type=int)
+    page = max(request.args.get('page', 1, type=int), 1)
     per_page = 10
-    offset = (page - 1) * per_page
+    after = request.args.get('after', type=int)
+    before = request.args.get('before', type=int)
+    last = request.args.get('last', 0, type=int) == 1
     search = request.args.get('search', '').strip()
     status = request.args.get('status', '')
     location = request.args.get('location', '')
@@ -46,44 +140,21 @@ def scanlog():
         with get_db() as conn:
             c = conn.cursor()
             
-            # Build query with filters
-            query = 'SELECT * FROM scans_with_residents WHERE 1=1'
-            count_query = 'SELECT COUNT(*) FROM scans_with_residents WHERE 1=1'
-            params = []
-            
-            if search:
-                query += ' AND (mdoc LIKE ? OR name LIKE ?)'
-                count_query += ' AND (mdoc LIKE ? OR name LIKE ?)'
-                search_param = f'%{search}%'
-                params.extend([search_param, search_param])
-            
-            if status:
-                query += ' AND status = ?'
-                count_query += ' AND status = ?'
-                params.append(status)
-            
-            if location:
-                query += ' AND location = ?'
-                count_query += ' AND location = ?'
-                params.append(location)
-            
-            # Get total count
-            c.execute(count_query, params)
-            total_records = c.fetchone()[0]
+            total_records = _count_scans(c, search, status, location)
             total_pages = (total_records + per_page - 1) // per_page
             
-            # Fetch paginated data
-            query += ' ORDER BY timestamp DESC LIMIT ? OFFSET ?'
-            params.extend([per_page, offset])
-            c.execute(query, params)
-            data = c.fetchall()
+            # Size the oldest page so "Last" lines up with the pages reached by walking forward
+            limit = total_records - (total_pages - 1) * per_page if last and total_pages else per_page
+            data, has_newer, has_older = fetch_scan_page(
+                c, limit, search, status, location, after=after, before=before, last=last
+            )
+            if last:
+                page = max(total_pages, 1)
+            elif not has_newer:
+                page = 1
             logger.debug(f"User {username} fetched {len(data)} scan records for page {page}")
             
-            c.execute('SELECT DISTINCT status FROM scans_with_residents ORDER BY status')
-            status_options = [row[0] for row in c.fetchall() if row[0]]
-            
-            c.execute('SELECT DISTINCT location FROM scans_with_residents ORDER BY location')
-            location_options = [row[0] for row in c.fetchall() if row[0]]
+            status_options, location_options = _filter_options(c)
             
             log_audit_action(
                 username=username,
@@ -102,6 +173,10 @@ def scanlog():
                 total_pages=total_pages,
                 per_page=per_page,
                 total_records=total_records,
+                has_newer=has_newer,
+                has_older=has_older,
+                first_id=data[0][5] if data else None,
+                last_id=data[-1][5] if data else None,
                 search=search,
                 status=status,
                 location=location
@@ -127,9 +202,17 @@ def delete_scanlog():
     try:
         with get_db() as conn:
             c = conn.cursor()
+            # Clear the trigger-maintained rollups first so the per-row scan
+            # delete triggers find nothing left to adjust
+            c.execute("DELETE FROM scan_daily_counts")
+            c.execute("DELETE FROM scan_rollup_hourly")
             c.execute("DELETE FROM scans")
             deleted_rows = c.rowcount
+            c.execute("DELETE FROM resident_current_status")
             conn.commit()
+            _count_cache.clear()
+            _options_cache.clear()
+            invalidate_dashboard_stats()
             
             log_audit_action(
                 username=username,
@@ -152,6 +235,68 @@ def delete_scanlog():
         flash("Error deleting scan logs.", "danger")
         return redirect(url_for('admin.admin_dashboard'))
 
+def _validate_export_dates(*dates):
+    """Raise ValueError unless every non-empty date is YYYY-MM-DD."""
+    for value in dates:
+        if value:
+            datetime.strptime(value, '%Y-%m-%d')
+
+def build_scanlog_export(username, start_date='', end_date='', location=''):
+    """
+    Return the CSV chunks for a scan log export.
+
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format.
+    """
+    _validate_export_dates(start_date, end_date)
+    
+    query = "SELECT s.mdoc, r.name, s.timestamp, s.status, s.location FROM scans s LEFT JOIN residents r ON s.mdoc = r.mdoc WHERE 1=1"
+    params = []
+    if start_date:
+        query += " AND s.timestamp >= ?"
+        params.append(f"{start_date} 00:00:00")
+    if end_date:
+        query += " AND s.timestamp < date(?, '+1 day')"
+        params.append(end_date)
+    if location:
+        query += " AND s.location = ?"
+        params.append(location)
+    query += " ORDER BY s.timestamp DESC"
+    
+    def format_row(row):
+        date_str, time_str = split_timestamp(row[2])
+        return [row[0], row[1], date_str, time_str, row[3], row[4]]
+    
+    filters = f"start_date='{start_date}', end_date='{end_date}', location='{location}'"
+    
+    def on_complete(count):
+        logger.info(f"User {username} exported {count} scanlog records to CSV")
+        log_audit_action(
+            username=username,
+            action='export',
+            target='scanlog',
+            details=f"Exported {count} scanlog records to CSV, {filters}"
+        )
+    
+    chunks = iter_csv(
+        query, params, ['MDOC', 'Name', 'Date', 'Time', 'Status', 'Location'],
+        format_row=format_row, on_complete=on_complete
+    )
+    # Logged up front as well: a download abandoned part-way never reaches on_complete
+    log_audit_action(
+        username=username,
+        action='export_started',
+        target='scanlog',
+        details=f"Started scanlog CSV export, {filters}"
+    )
+    return chunks
+
+@job_handler('export_scanlog')
+def run_scanlog_export_job(job, payload):
+    """Background job: write a scan log export to a downloadable file."""
+    chunks = build_scanlog_export(job.username, payload['start_date'], payload['end_date'], payload['location'])
+    return save_export(job, chunks, 'scanlog.csv', gzip=payload['gzip'])
+
 @scanlog_bp.route('/scanlog/export', strict_slashes=False)
 @login_required
 @role_required('admin')
@@ -160,57 +305,32 @@ def export_scanlog():
     username = current_user.username if current_user.is_authenticated else 'unknown'
     logger.debug(f"User {username} accessing /admin/scanlog/export route")
     
+    start_date = request.args.get('start_date', '').strip()
+    end_date = request.args.get('end_date', '').strip()
+    location = request.args.get('location', '').strip()
+    compress = request.args.get('gzip', 0, type=int) == 1
+    background = request.args.get('background', 0, type=int) == 1
+    
     try:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['MDOC', 'Name', 'Date', 'Time', 'Status', 'Location'])
-        
-        with get_db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT mdoc, name, timestamp, status, location FROM scans_with_residents ORDER BY timestamp DESC")
-            rows = c.fetchall()
-            
-            for row in rows:
-                timestamp = datetime.strptime(row[2], '%Y-%m-%d %H:%M:%S') if row[2] else None
-                date_str = timestamp.strftime(DATEFORMAT) if timestamp else ''
-                time_str = timestamp.strftime(TIMEFORMAT) if timestamp else ''
-                writer.writerow([row[0], row[1], date_str, time_str, row[3], row[4]])
-            
-            logger.info(f"User {username} exported {len(rows)} scanlog records to CSV")
-            log_audit_action(
-                username=username,
-                action='export',
-                target='scanlog',
-                details=f"Exported {len(rows)} scanlog records to CSV"
-            )
+        if background:
+            # Validate the dates here so a bad range is reported on the form, not the job page
+            _validate_export_dates(start_date, end_date)
+            payload = {'start_date': start_date, 'end_date': end_date, 'location': location, 'gzip': compress}
+            job_id = enqueue_job('export_scanlog', payload, username)
+            return redirect(url_for('jobs.view_job', job_id=job_id))
         
-        output.seek(0)
-        return send_file(
-            io.BytesIO(output.getvalue().encode()),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name='scanlog.csv'
-        )
+        chunks = build_scanlog_export(username, start_date, end_date, location)
+        return csv_response(chunks, 'scanlog.csv', gzip=compress)
     
-    except sqlite3.Error as e:
-        logger.error(f"Database error for user {username} during scanlog export: {str(e)}")
-        log_audit_action(
-            username=username,
-            action='error',
-            target='scanlog_export',
-            details=f"Database error during export: {str(e)}"
-        )
-        flash("Error exporting scanlog.", "danger")
-        return redirect(url_for('scanlog.scanlog'))
     except ValueError as e:
-        logger.error(f"Timestamp parsing error for user {username} during scanlog export: {str(e)}")
+        logger.error(f"Invalid date range for user {username} during scanlog export: {str(e)}")
         log_audit_action(
             username=username,
             action='error',
             target='scanlog_export',
-            details=f"Timestamp parsing error: {str(e)}"
+            details=f"Invalid date range: start_date='{start_date}', end_date='{end_date}'"
         )
-        flash("Error exporting scanlog due to invalid timestamp format.", "danger")
+        flash("Invalid date range for scanlog export. Use YYYY-MM-DD.", "danger")
         return redirect(url_for('scanlog.scanlog'))
     except Exception as e:
         logger.error(f"Unexpected error for user {username} during scanlog export: {str(e)}")
@@ -221,4 +341,4 @@ def export_scanlog():
             details=f"Unexpected error during export: {str(e)}"
         )
         flash("Error exporting scanlog.", "danger")
-        return redirect(url_for('scanlog.scanlog'))
\ No newline at end of file
+        return redirect(url_for('scanlog.scanlog'))
@@ -143,21 +143,15 @@ def last_scan_partial():
         with get_db() as conn:
             c = conn.cursor()
             c.execute("""
-                SELECT s.mdoc, s.status AS direction, s.date || ' ' || s.time AS timestamp, r.name, l.name AS location
+                SELECT s.mdoc, UPPER(s.status) AS direction, s.timestamp, r.name, s.location
                 FROM scans s
                 LEFT JOIN residents r ON s.mdoc = r.mdoc
-                LEFT JOIN locations l ON s.location = l.prefix
-                ORDER BY s.date DESC, s.time DESC
+                ORDER BY s.scanid DESC
                 LIMIT 1
             """)
             scan = c.fetchone()
+            # Kiosks fetch this on every scan event, so successful reads are not audited
             logger.debug(f"User {username} fetched last scan: {'found' if scan else 'none'}")
-            log_audit_action(
-                username=username,
-                action='view',
-                target='last_scan_partial',
-                details=f"Fetched last scan: {'found' if scan else 'none'}"
-            )
     except sqlite3.Error as e:
         logger.error(f"Error fetching last scan for user {username}: {str(e)}")
         log_audit_action(
@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, redirect, url_for, flash
 from flask_login import login_required, current_user
-from rezscan_app.models.database import get_db
+from rezscan_app.utils.dashboard_stats import get_dashboard_stats
 import logging
 from rezscan_app.utils.audit_logging import log_audit_action
 from rezscan_app.config import Config
@@ -32,42 +32,7 @@ def dashboard():
         stats = {}
 
         if role in ['officer', 'scheduling', 'viewer']:
-            db = get_db()
-            c = db.cursor()
-
-            c.execute("SELECT COUNT(*) FROM residents")
-            total_residents = c.fetchone()[0]
-
-            c.execute("SELECT COUNT(*) FROM scans WHERE strftime('%Y-%m-%d', timestamp) = strftime('%Y-%m-%d', 'now', 'localtime')")
-            scans_today = c.fetchone()[0]
-
-            c.execute('''
-                SELECT COUNT(*)
-                FROM (
-                    SELECT mdoc, MAX(timestamp) AS latest_time
-                    FROM scans
-                    GROUP BY mdoc
-                    HAVING (SELECT status FROM scans WHERE mdoc = scans.mdoc AND timestamp = latest_time) = 'In'
-                )
-            ''')
-            checked_in = c.fetchone()[0]
-
-            c.execute('''
-                SELECT location, COUNT(*) as scan_count
-                FROM scans
-                WHERE location IS NOT NULL
-                GROUP BY location
-                ORDER BY scan_count DESC
-                LIMIT 1
-            ''')
-            top_location = c.fetchone()[0]
-
-            stats = {
-                'total_residents': total_residents,
-                'scans_today': scans_today,
-                'checked_in': checked_in,
-                'top_location': top_location
-            }
+            stats = get_dashboard_stats()
 
         logger.debug(f"Rendering {template_name} with stats: {stats}")
         return render_template(template_name, stats=stats, user=current_user)
@@ -0,0 +1,37 @@
+# Generated by Scripts/generate_blueprint_manifest.py -- do not edit by hand.
+# Regenerate after adding, renaming or removing a blueprint.
+
+# (module, blueprint variable) pairs registered by create_app(), in order
+BLUEPRINTS = [
+    ('rezscan_app.routes.admin.admin_dashboard', 'admin_bp'),  # admin
+    ('rezscan_app.routes.admin.admin_settings', 'admin_settings_bp'),  # admin_settings
+    ('rezscan_app.routes.admin.api', 'api_bp'),  # api
+    ('rezscan_app.routes.admin.audit_log', 'audit_log_bp'),  # audit_log
+    ('rezscan_app.routes.admin.coris_import', 'coris_bp'),  # coris_import
+    ('rezscan_app.routes.admin.locations', 'locations_bp'),  # locations
+    ('rezscan_app.routes.admin.permissions', 'permissions_bp'),  # permissions
+    ('rezscan_app.routes.admin.resident_import_history', 'import_history_bp'),  # import_history
+    ('rezscan_app.routes.admin.users', 'users_bp'),  # users
+    ('rezscan_app.routes.common.account', 'account_bp'),  # account
+    ('rezscan_app.routes.common.auth', 'auth_bp'),  # auth
+    ('rezscan_app.routes.common.events', 'events_bp'),  # events
+    ('rezscan_app.routes.common.jobs', 'jobs_bp'),  # jobs
+    ('rezscan_app.routes.common.resident_activity_tracker', 'resident_activity_tracker_bp'),  # resident_activity_tracker
+    ('rezscan_app.routes.common.residents', 'residents_bp'),  # residents
+    ('rezscan_app.routes.common.scanlog', 'scanlog_bp'),  # scanlog
+    ('rezscan_app.routes.common.scanner', 'scanner_bp'),  # scanner
+    ('rezscan_app.routes.common.user_dashboard', 'user_dashboard_bp'),  # user_dashboard
+    ('rezscan_app.routes.schedule.bulk_assign', 'bulk_bp'),  # bulk_assign
+    ('rezscan_app.routes.schedule.calendar_schedule', 'calendar_bp'),  # calendar_schedule
+    ('rezscan_app.routes.schedule.conflict_checker', 'conflict_bp'),  # conflict_checker
+    ('rezscan_app.routes.schedule.movement_board', 'movement_board_bp'),  # movement_board
+    ('rezscan_app.routes.schedule.movement_exports', 'movement_exports_bp'),  # movement_exports
+    ('rezscan_app.routes.schedule.movement_match', 'movement_match_bp'),  # movement_match
+    ('rezscan_app.routes.schedule.movement_upload', 'mvmt_schedules_bp'),  # mvmt_schedules
+    ('rezscan_app.routes.schedule.residents_schedule', 'resident_schedule_bp'),  # resident_schedule
+    ('rezscan_app.routes.schedule.schedule_match_review', 'schedule_review_bp'),  # schedule_review
+    ('rezscan_app.routes.schedule.schedule_printer', 'printer_bp'),  # schedule_printer
+    ('rezscan_app.routes.schedule.schedules', 'schedules_bp'),  # schedules
+    ('rezscan_app.routes.schedule.scheduling_dashboard', 'scheduling_bp'),  # scheduling
+    ('rezscan_app.routes.schedule.view_movement_schedule', 'movement_schedule_bp'),  # movement_schedule
+]
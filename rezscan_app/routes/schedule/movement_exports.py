@@ -7,8 +7,6 @@ from rezscan_app.routes.common.auth import role_required
 import datetime
 import csv
 import io
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 
 movement_exports_bp = Blueprint('movement_exports', __name__)
 
@@ -66,6 +64,10 @@ def export_movement_pdf():
         ''', (datetime.datetime.strptime(selected_date, '%Y-%m-%d').strftime('%A'),))
         rows = c.fetchall()
 
+        # Imported here so workers that never export a PDF don't load reportlab
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+
         buffer = io.BytesIO()
         pdf = canvas.Canvas(buffer, pagesize=letter)
         pdf.setTitle(f"Movement Board - {selected_date}")
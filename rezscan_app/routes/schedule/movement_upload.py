@@ -1,14 +1,41 @@
-from flask import Blueprint, render_template, request, session, redirect, url_for, flash
-from flask_login import login_required
+from flask import Blueprint, render_template, request, session, redirect, url_for, flash, current_app
+from flask_login import login_required, current_user
 from rezscan_app.routes.common.auth import role_required
-from rezscan_app.models.database import get_db
+from rezscan_app.utils.jobs import job_handler, enqueue_job, job_file_path, get_job
 import os
+import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
 mvmt_schedules_bp = Blueprint('mvmt_schedules', __name__)
 
+@job_handler('parse_movement_pdf')
+def run_parse_movement_job(job, payload):
+    """Background job: parse an uploaded movement schedule PDF into review text."""
+    from rezscan_app.utils.schedule_parser import parse_schedule_blocks
+    try:
+        job.progress(0, None, "Parsing schedule PDF", force=True)
+        parsed_blocks = parse_schedule_blocks(
+            payload['path'],
+            workers=current_app.config['PDF_PARSE_WORKERS'],
+            pages_per_task=current_app.config['PDF_PAGES_PER_TASK'],
+            parallel_min_pages=current_app.config['PDF_PARALLEL_MIN_PAGES'],
+            on_page=lambda done, total: job.progress(done, total, f"Extracted page {done} of {total}")
+        )
+    finally:
+        os.remove(payload['path'])
+
+    if not parsed_blocks:
+        raise ValueError("No schedule blocks found in the PDF.")
+
+    raw_text = "\n".join(
+        f"{block['time'] or 'All Day'} - {block['title']}\n" + "\n".join(block['residents'])
+        for block in parsed_blocks
+    )
+    job.progress(1, 1, f"Parsed {len(parsed_blocks)} schedule blocks", force=True)
+    return {'blocks': len(parsed_blocks), 'raw_text': raw_text}
+
 @mvmt_schedules_bp.route('/schedule/upload_movement', methods=['GET', 'POST'])
 @login_required
 @role_required('admin', 'scheduling')
@@ -19,30 +46,33 @@ def upload_movement():
             flash("Please upload a valid PDF file.", "warning")
             return redirect(request.url)
 
-        temp_path = os.path.join('tmp', uploaded_file.filename)
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+        temp_path = job_file_path(f"upload-{uuid.uuid4().hex}.pdf")
         uploaded_file.save(temp_path)
 
         try:
-            from rezscan_app.utils.schedule_parser import parse_schedule_blocks
-            parsed_blocks = parse_schedule_blocks(temp_path)
-
-            if not parsed_blocks:
-                flash("No schedule blocks found in the PDF.", "warning")
-                return redirect(request.url)
-
-            # Save raw text to session and redirect to preview route
-            raw_text = "\n".join(
-                f"{block['time'] or 'Block'} - {block['title']}\n" + "\n".join(block['residents'])
-                for block in parsed_blocks
-            )
-            session['movement_text'] = raw_text
-            flash("PDF successfully parsed. Ready to review and confirm.", "success")
-            return redirect(url_for('movement_match.match_preview'))
-
+            job_id = enqueue_job('parse_movement_pdf', {'path': temp_path}, current_user.username)
         except Exception as e:
-            logger.error(f"Error processing schedule PDF: {e}", exc_info=True)
+            logger.error(f"Error queuing schedule PDF: {e}", exc_info=True)
             flash("Failed to process the schedule file.", "danger")
             return redirect(request.url)
 
+        return redirect(url_for('jobs.view_job', job_id=job_id, next=url_for('mvmt_schedules.load_movement_job', job_id=job_id)))
+
     return render_template("schedule/upload_movement_preview.html")
+
+@mvmt_schedules_bp.route('/schedule/upload_movement/jobs/<int:job_id>')
+@login_required
+@role_required('admin', 'scheduling')
+def load_movement_job(job_id):
+    job = get_job(job_id)
+    if not job or job['kind'] != 'parse_movement_pdf' or job['username'] != current_user.username:
+        flash("Schedule upload not found.", "warning")
+        return redirect(url_for('mvmt_schedules.upload_movement'))
+    if job['status'] != 'succeeded':
+        flash(job['error'] or "The schedule file is still being processed.", "warning")
+        return redirect(url_for('jobs.view_job', job_id=job_id))
+
+    # The parsed text stays in the job result; the cookie session only holds the job id
+    session['movement_job_id'] = job_id
+    flash("PDF successfully parsed. Ready to review and confirm.", "success")
+    return redirect(url_for('movement_match.match_preview'))
@@ -3,7 +3,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from rezscan_app.routes.common.auth import role_required
 from rezscan_app.models.database import get_db
-from difflib import SequenceMatcher
+from rezscan_app.utils.match_suggestions import refresh_match_suggestions
 from flask import session
 import logging
 
@@ -11,103 +11,64 @@ logger = logging.getLogger(__name__)
 
 schedule_review_bp = Blueprint('schedule_review', __name__, url_prefix='/schedule')
 
+REVIEW_PAGE_SIZE = 50
+
 @schedule_review_bp.route('/review_matches', methods=['GET'])
 @login_required
 @role_required('admin', 'scheduling')
 def review_matches():
-    from rezscan_app.utils.schedule_parser import parse_source_line
-
     logger.debug(f"User {current_user.username} accessing schedule match review page.")
+    page = int(request.args.get('page', 1)) if request.args.get('page', '1').isdigit() else 1
+    page = max(page, 1)
     matches = []
+    total_pages = 1
     try:
         with get_db() as conn:
-            c = conn.cursor()
+            # Only rows added since, or computed before residents last changed, are recomputed
+            refresh_match_suggestions(conn)
 
-            c.execute("SELECT mdoc, name, housing_unit FROM residents")
-            residents = c.fetchall()
-            residents_by_mdoc = {r['mdoc']: r for r in residents if r['mdoc']}
-            all_residents = residents
+            c = conn.cursor()
+            c.execute("SELECT COUNT(*) FROM schedule_match_review WHERE status = 'pending'")
+            total_pages = max((c.fetchone()[0] + REVIEW_PAGE_SIZE - 1) // REVIEW_PAGE_SIZE, 1)
 
             c.execute('''
                 SELECT id, block_title, block_time, source_line,
                        suggested_name, suggested_mdoc, suggested_housing,
                        match_type, status
                 FROM schedule_match_review
+                WHERE status = 'pending'
                 ORDER BY id DESC
-            ''')
+                LIMIT ? OFFSET ?
+            ''', (REVIEW_PAGE_SIZE, (page - 1) * REVIEW_PAGE_SIZE))
             rows = c.fetchall()
 
-            for row in rows:
-                suggested_name = row['suggested_name']
-                mdoc = row['suggested_mdoc']
-                housing = row['suggested_housing']
-                match_type = row['match_type']
-                db_check = False
-                candidates = []
-                can_auto_approve = False
-
-                if not suggested_name or not mdoc or not housing:
-                    parsed = parse_source_line(row['source_line'] or "")
-                    if not suggested_name:
-                        suggested_name = parsed.get("suggested_name")
-                    if not mdoc:
-                        mdoc = parsed.get("suggested_mdoc")
-                    if not housing:
-                        housing = parsed.get("suggested_housing")
-                    logger.debug(f"[PARSE FILL] Row {row['id']}: name={suggested_name}, mdoc={mdoc}, housing={housing}")
-
-                if mdoc and mdoc in residents_by_mdoc:
-                    db_check = True
-                    can_auto_approve = True
-                    match_type = 'fuzzy'
-
-                elif suggested_name and suggested_name.strip():
-                    suggested_name = suggested_name.strip()
-
-                    if ',' not in suggested_name:
-                        logger.debug(f"[MATCH DEBUG] Skipping invalid name format: '{suggested_name}'")
-                    else:
-                        last, *first_parts = suggested_name.split(',')
-                        last = last.strip()
-                        first_initial = first_parts[0].strip()[0] if first_parts else ''
-
-                        possible = [r for r in all_residents if r['name'].split(',')[0].strip().lower() == last.lower()]
-
-                        if housing:
-                            possible = [r for r in possible if r['housing_unit'] and housing.lower() in r['housing_unit'].lower()]
-
-                        if first_initial:
-                            possible = [
-                                r for r in possible
-                                if len(r['name'].split(',')) > 1 and r['name'].split(',')[1].strip().startswith(first_initial)
-                            ]
-
-                        if not possible:
-                            threshold = 0.85
-                            def similar(a, b):
-                                return SequenceMatcher(None, a.lower(), b.lower()).ratio()
-
-                            possible = [r for r in all_residents if similar(r['name'], suggested_name) >= threshold]
-
-                        if possible:
-                            db_check = True
-                            candidates = possible
-                            logger.debug(f"[MATCH DEBUG] Candidates for '{suggested_name}' in block {row['id']}: {[r['name'] for r in possible]}")
-                        else:
-                            logger.debug(f"[MATCH DEBUG] No candidates found for '{suggested_name}' in block {row['id']}")
+            candidates_by_review = {}
+            if rows:
+                ids = [row['id'] for row in rows]
+                c.execute(f'''
+                    SELECT review_id, kind, mdoc, name, housing_unit, score
+                    FROM schedule_match_candidates
+                    WHERE review_id IN ({', '.join('?' * len(ids))})
+                    ORDER BY review_id, rank
+                ''', ids)
+                for cand in c.fetchall():
+                    candidates_by_review.setdefault(cand['review_id'], []).append(dict(cand))
 
+            for row in rows:
+                candidates = candidates_by_review.get(row['id'], [])
+                can_auto_approve = bool(candidates) and candidates[0]['kind'] == 'mdoc'
                 matches.append({
                     'id': row['id'],
                     'block_title': row['block_title'],
                     'block_time': row['block_time'],
                     'source_line': row['source_line'],
-                    'suggested_name': suggested_name,
-                    'suggested_mdoc': mdoc,
-                    'suggested_housing': housing,
-                    'match_type': match_type or 'unmatched',
+                    'suggested_name': row['suggested_name'],
+                    'suggested_mdoc': row['suggested_mdoc'],
+                    'suggested_housing': row['suggested_housing'],
+                    'match_type': 'fuzzy' if can_auto_approve else (row['match_type'] or 'unmatched'),
                     'status': row['status'],
-                    'db_check': db_check,
-                    'candidates': candidates,
+                    'db_check': bool(candidates),
+                    'candidates': [] if can_auto_approve else candidates,
                     'can_auto_approve': can_auto_approve,
                 })
 
@@ -115,7 +76,7 @@ def review_matches():
         logger.error(f"\u274c Error fetching schedule matches: {str(e)}", exc_info=True)
         flash("Failed to load schedule match review data.", "danger")
 
-    return render_template('schedule/review_matches.html', matches=matches)
+    return render_template('schedule/review_matches.html', matches=matches, page=page, total_pages=total_pages)
 
 @schedule_review_bp.route('/review/<int:match_id>/resolve_conflict', methods=['GET', 'POST'])
 @login_required
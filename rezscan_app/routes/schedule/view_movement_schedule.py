@@ -4,9 +4,9 @@ from flask_login import login_required
 from rezscan_app.routes.common.auth import role_required
 import datetime
 
-movement_board_bp = Blueprint('movement_schedule', __name__)
+movement_schedule_bp = Blueprint('movement_schedule', __name__)
 
-@movement_board_bp.route('/schedule/movement-schedule', methods=['GET'])
+@movement_schedule_bp.route('/schedule/movement-schedule', methods=['GET'])
 @login_required
 @role_required('scheduling')
 def view_movement_schedule():
@@ -1,19 +1,178 @@
+import atexit
 import logging
+import queue
 import sqlite3
-from rezscan_app.models.database import get_db
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+from rezscan_app.config import Config
+from rezscan_app.models.database import get_db, connect, get_sqlite_settings
 
 logger = logging.getLogger(__name__)
 
-def log_audit_action(username, action, target, details=None):
-    """Log an action to the audit_log table and logger."""
+INSERT_AUDIT_SQL = "INSERT INTO audit_log (username, action, target, timestamp, details) VALUES (?, ?, ?, ?, ?)"
+
+class AuditLogWriter:
+    """
+    Buffered audit log writer.
+
+    Entries go onto a bounded queue drained by a background thread, which
+    inserts them with executemany once batch_size entries are waiting or
+    flush_interval seconds have passed. When the queue stays full the caller
+    writes its entry synchronously, so backpressure never drops audit rows.
+    """
+
+    def __init__(self, settings, batch_size=100, flush_interval=0.25, queue_size=10000, enqueue_timeout=0.05):
+        self.settings = settings
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'failed': 0,
+            'overflow_sync_writes': 0,
+            'max_queue_depth': 0,
+            'last_batch_size': 0,
+            'last_batch_ms': 0.0
+        }
+        self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+        self._thread.start()
+        logger.info(f"Started audit log writer (batch_size={batch_size}, flush_interval={flush_interval}s, queue_size={queue_size})")
+
+    def enqueue(self, entry):
+        """Queue an entry; returns False if the queue stayed full past enqueue_timeout."""
+        try:
+            self._queue.put(entry, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._bump('overflow_sync_writes')
+            return False
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], depth)
+        return True
+
+    def flush(self, timeout=5.0):
+        """Block until every queued entry has been written or timeout expires."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def stop(self, timeout=5.0):
+        """Flush outstanding entries and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        logger.info(f"Stopped audit log writer: {self.stats()}")
+
+    def stats(self):
+        """Return a snapshot of the writer's counters and current queue depth."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
+
+    def _bump(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _run(self):
+        conn = connect(settings=self.settings)
+        try:
+            running = True
+            while running:
+                batch = []
+                try:
+                    entry = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                deadline = time.monotonic() + self.flush_interval
+                while entry is not None:
+                    batch.append(entry)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        entry = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                if entry is None:
+                    running = False
+                self._write_batch(conn, batch)
+                for _ in range(len(batch) + (0 if running else 1)):
+                    self._queue.task_done()
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        if not batch:
+            return
+        started = time.monotonic()
+        try:
+            conn.executemany(INSERT_AUDIT_SQL, batch)
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            self._bump('failed', len(batch))
+            logger.error(f"Failed to write {len(batch)} audit log entries: {str(e)}")
+            return
+        with self._stats_lock:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['last_batch_size'] = len(batch)
+            self._stats['last_batch_ms'] = round((time.monotonic() - started) * 1000, 2)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def _config():
+    return current_app.config if has_app_context() else vars(Config)
+
+def get_audit_writer():
+    """Return the process-wide audit log writer, starting it on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                config = _config()
+                _writer = AuditLogWriter(
+                    get_sqlite_settings(config),
+                    batch_size=config['AUDIT_LOG_BATCH_SIZE'],
+                    flush_interval=config['AUDIT_LOG_FLUSH_INTERVAL_MS'] / 1000,
+                    queue_size=config['AUDIT_LOG_QUEUE_SIZE']
+                )
+                atexit.register(_writer.stop)
+    return _writer
+
+def get_audit_writer_stats():
+    """Return the async writer's stats, or None if it has not been started."""
+    return _writer.stats() if _writer is not None else None
+
+def log_audit_action(username, action, target, details=None, sync=None):
+    """
+    Log an action to the audit_log table and logger.
+
+    Entries are buffered and written in batches by a background thread unless
+    AUDIT_LOG_MODE is 'sync', the action is listed in AUDIT_LOG_SYNC_ACTIONS,
+    or sync=True is passed.
+    """
+    entry = (username, action, target, datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'), details)
+    config = _config()
+    if sync is None:
+        sync = config['AUDIT_LOG_MODE'] == 'sync' or action in config['AUDIT_LOG_SYNC_ACTIONS']
+    if not sync and get_audit_writer().enqueue(entry):
+        logger.debug(f"Audit log queued: {username} - {action} - {target}")
+        return
     try:
         with get_db() as conn:
             c = conn.cursor()
-            c.execute(
-                "INSERT INTO audit_log (username, action, target, details) VALUES (?, ?, ?, ?)",
-                (username, action, target, details)
-            )
+            c.execute(INSERT_AUDIT_SQL, entry)
             conn.commit()
             logger.debug(f"Audit log created: {username} - {action} - {target}")
     except sqlite3.Error as e:
-        logger.error(f"Failed to log audit action for {username}: {str(e)}")
\ No newline at end of file
+        logger.error(f"Failed to log audit action for {username}: {str(e)}")
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import logging
+import threading
+from urllib.parse import urljoin
+from rezscan_app.utils.scan_logic import begin_immediate
+
+logger = logging.getLogger(__name__)
+
+# Settings rows holding the incremental sync state between runs
+SYNC_CATEGORY = 'sync'
+ETAG_KEY = 'coris_etag'
+WATERMARK_KEY = 'coris_watermark'
+SOURCE_KEY = 'coris_source'
+
+INSERT_RESIDENT_SQL = """
+    INSERT INTO residents (mdoc, name, unit, housing_unit, level, photo, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_RESIDENT_SQL = """
+    UPDATE residents SET name = ?, unit = ?, housing_unit = ?, level = ?, photo = ?, content_hash = ?
+    WHERE mdoc = ?
+"""
+
+class CorisClient:
+    """
+    HTTP client for the CORIS residents API.
+
+    Keeps one requests.Session so repeated syncs reuse the TCP/TLS
+    connection, and always applies (connect, read) timeouts. The client is
+    shared by the job threads of a worker; a sync holds lock while it uses
+    the session.
+
+    The API is expected to accept page_size and updated_since query
+    parameters and to answer with either a bare JSON array of residents or
+    a page object {"results": [...], "next": url}. A 304 in reply to
+    If-None-Match means nothing changed since the stored ETag.
+    """
+
+    def __init__(self, url, api_key, timeout=(5, 60), page_size=500):
+        self.url = url
+        self.timeout = timeout
+        self.page_size = page_size
+        # Deferred so only workers that run a CORIS sync pay for these imports
+        import requests
+        try:
+            import ijson  # Optional: stream-parse bare JSON array responses
+        except ImportError:
+            ijson = None
+        self.ijson = ijson
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Accept': 'application/json'
+        })
+        self.lock = threading.Lock()
+
+    def iter_pages(self, since=None, etag=None, response_info=None):
+        """
+        Yield lists of resident records, one per page.
+
+        Args:
+            since: Watermark from the previous sync; only newer records are requested.
+            etag: ETag from the previous sync, sent as If-None-Match.
+            response_info: Optional dict for this call's outcome. After
+                iteration its 'etag' is the ETag of the first response and
+                'not_modified' is True if the server answered 304.
+        """
+        if response_info is None:
+            response_info = {}
+        response_info.update(etag=None, not_modified=False)
+        params = {'page_size': self.page_size}
+        if since:
+            params['updated_since'] = since
+        headers = {'If-None-Match': etag} if etag else {}
+
+        url = self.url
+        first = True
+        while url:
+            with self.session.get(url, params=params, headers=headers, timeout=self.timeout, stream=True) as response:
+                if first and response.status_code == 304:
+                    response_info['not_modified'] = True
+                    return
+                response.raise_for_status()
+                if first:
+                    response_info['etag'] = response.headers.get('ETag')
+                    first = False
+
+                records, next_url = self._read_body(response)
+                yield from records
+
+            # The next link already carries the query string
+            url = urljoin(url, next_url) if next_url else None
+            params = None
+            headers = {}
+
+    def _read_body(self, response):
+        """Return (pages, next_url) for one response."""
+        if self.ijson is None:
+            return self._parse_body(response.json())
+
+        # Peek at the first byte: a bare array (unpaged API) is streamed item
+        # by item, a page object is small enough to parse in one go
+        raw = response.raw
+        raw.decode_content = True
+        head = raw.read(1)
+        while head.isspace():
+            head = raw.read(1)
+        if head != b'[':
+            return self._parse_body(json.loads(head + raw.read()))
+        return self._stream_array(_PrefixedStream(head, raw)), None
+
+    def _parse_body(self, body):
+        if isinstance(body, list):
+            return [body], None
+        records = body.get('results') or body.get('residents') or body.get('data') or []
+        return [records], body.get('next')
+
+    def _stream_array(self, stream):
+        batch = []
+        for record in self.ijson.items(stream, 'item', use_float=True):
+            batch.append(record)
+            if len(batch) >= self.page_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+class _PrefixedStream:
+    """File-like wrapper that replays bytes already read from a stream."""
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size=-1):
+        # ijson probes with read(0) to detect bytes vs text
+        if self.prefix and size != 0:
+            data, self.prefix = self.prefix, b''
+            return data
+        return self.stream.read(size)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_coris_client(url, api_key, config):
+    """Return a cached client for url/api_key so its session is reused across syncs."""
+    key = (url, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = CorisClient(
+                url, api_key,
+                timeout=(config['CORIS_CONNECT_TIMEOUT'], config['CORIS_READ_TIMEOUT']),
+                page_size=config['CORIS_PAGE_SIZE']
+            )
+            _clients[key] = client
+        return client
+
+def _get_sync_state(conn, url):
+    rows = conn.execute(
+        "SELECT key, value FROM settings WHERE category = ? AND key IN (?, ?, ?)",
+        (SYNC_CATEGORY, ETAG_KEY, WATERMARK_KEY, SOURCE_KEY)
+    ).fetchall()
+    state = {row[0]: row[1] for row in rows}
+    # A watermark from a different API URL means nothing for this one
+    if state.get(SOURCE_KEY) != url:
+        return None, None
+    return state.get(ETAG_KEY) or None, state.get(WATERMARK_KEY) or None
+
+def _save_sync_state(conn, url, etag, watermark):
+    conn.executemany('''
+        INSERT INTO settings (category, key, value) VALUES (?, ?, ?)
+        ON CONFLICT(category, key) DO UPDATE SET value = excluded.value
+    ''', [
+        (SYNC_CATEGORY, ETAG_KEY, etag or ''),
+        (SYNC_CATEGORY, WATERMARK_KEY, watermark or ''),
+        (SYNC_CATEGORY, SOURCE_KEY, url)
+    ])
+
+def _to_row(record):
+    mdoc = record.get('mdoc')
+    name = record.get('name')
+    if not mdoc or not name:
+        return None
+    # The API calls the unit 'area'
+    return (str(mdoc), name, record.get('area'), record.get('housing_unit'), record.get('level'), record.get('photo'))
+
+def resident_hash(row):
+    """
+    Content hash of a resident row's fields, excluding mdoc.
+
+    Stored in residents.content_hash so unchanged CORIS records can be
+    skipped without rewriting their page. Local edits reset the stored hash
+    to NULL (see migration 4), which always counts as changed.
+    """
+    text = '\x1f'.join('' if value is None else str(value) for value in row[1:])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _apply_batch(conn, batch, stats):
+    # Later duplicates of an mdoc in the same batch win
+    rows = {row[0]: row for row in batch}
+    placeholders = ', '.join('?' * len(rows))
+    begin_immediate(conn)
+    try:
+        existing = {
+            row[0]: row[1] for row in conn.execute(
+                f"SELECT mdoc, content_hash FROM residents WHERE mdoc IN ({placeholders})", list(rows)
+            )
+        }
+        adds, changes = [], []
+        for mdoc, row in rows.items():
+            content_hash = resident_hash(row)
+            if mdoc not in existing:
+                adds.append((*row, content_hash))
+            elif existing[mdoc] != content_hash:
+                changes.append((*row[1:], content_hash, mdoc))
+        conn.executemany(INSERT_RESIDENT_SQL, adds)
+        conn.executemany(UPDATE_RESIDENT_SQL, changes)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    stats['added'] += len(adds)
+    stats['changed'] += len(changes)
+    stats['unchanged'] += len(rows) - len(adds) - len(changes)
+    if adds or changes:
+        stats['batches'] += 1
+
+def sync_coris_residents(conn, client, full=False, batch_size=500, progress=None):
+    """
+    Pull residents from CORIS and write the ones that changed.
+
+    Incremental by default: the ETag and updated_at watermark stored by the
+    last sync of the same URL are sent so only changed residents come back.
+    Each fetched resident is compared with its stored content hash, so
+    unchanged records cost a read but no write. The sync state is saved
+    only after every batch has been written, so a failed run is simply
+    retried from the same point.
+
+    Residents missing from a full fetch are counted as removed but not
+    deleted; CORIS only ever adds and updates. Overlapping syncs through the
+    same client (e.g. a double-submitted job) run one after the other.
+
+    Args:
+        conn: Database connection.
+        client: CorisClient to fetch with.
+        full: Ignore the stored ETag/watermark and fetch everything.
+        batch_size: Rows compared and written per transaction.
+        progress: Optional callable(done, total, message) for job progress.
+
+    Returns:
+        Dict with fetched, added, changed, unchanged, removed (None unless
+        the whole roster was fetched), skipped, batches and not_modified.
+    """
+    with client.lock:
+        return _sync(conn, client, full, batch_size, progress)
+
+def _sync(conn, client, full, batch_size, progress):
+    etag, watermark = (None, None) if full else _get_sync_state(conn, client.url)
+    stats = {
+        'fetched': 0, 'added': 0, 'changed': 0, 'unchanged': 0, 'removed': None,
+        'skipped': 0, 'batches': 0, 'not_modified': False
+    }
+    new_watermark = watermark
+    seen = set()
+    batch = []
+    response_info = {}
+
+    for page in client.iter_pages(since=watermark, etag=etag, response_info=response_info):
+        for record in page:
+            stats['fetched'] += 1
+            updated_at = record.get('updated_at')
+            if updated_at and (new_watermark is None or str(updated_at) > new_watermark):
+                new_watermark = str(updated_at)
+            row = _to_row(record)
+            if row is None:
+                stats['skipped'] += 1
+                continue
+            seen.add(row[0])
+            batch.append(row)
+            if len(batch) >= batch_size:
+                _apply_batch(conn, batch, stats)
+                batch = []
+        if progress:
+            progress(stats['fetched'], None, f"Fetched {stats['fetched']} residents from CORIS")
+    if batch:
+        _apply_batch(conn, batch, stats)
+
+    if response_info['not_modified']:
+        stats['not_modified'] = True
+        logger.info("CORIS reported no changes since the last sync")
+        return stats
+
+    if watermark is None:
+        # The whole roster was fetched, and every resident in it now exists locally
+        total = conn.execute("SELECT COUNT(*) FROM residents").fetchone()[0]
+        stats['removed'] = total - len(seen)
+
+    _save_sync_state(conn, client.url, response_info['etag'], new_watermark)
+    conn.commit()
+    logger.info(
+        f"CORIS sync: {stats['fetched']} fetched, {stats['added']} added, {stats['changed']} changed, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed, watermark {new_watermark}"
+    )
+    return stats
@@ -0,0 +1,123 @@
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Optional
+from rezscan_app.config import Config
+from rezscan_app.models.database import get_db
+from rezscan_app.models.migrations import SCAN_COUNT_BACKFILL
+from rezscan_app.utils.cache import TTLCache
+from rezscan_app.utils.scan_logic import APP_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+# One entry shared by every role's dashboard; scan counts lag by up to the TTL
+_stats_cache = TTLCache(ttl=Config.DASHBOARD_STATS_TTL, max_size=1)
+
+def _today() -> str:
+    """Today's date in the configured timezone, the same one scan timestamps are written in."""
+    return datetime.now(APP_TIMEZONE).strftime('%Y-%m-%d')
+
+def _common_stats(c: sqlite3.Cursor) -> dict:
+    c.execute("SELECT COUNT(*) FROM residents")
+    total_residents = c.fetchone()[0]
+    c.execute("SELECT COUNT(*) FROM resident_current_status WHERE status = 'In'")
+    checked_in = c.fetchone()[0]
+    c.execute("SELECT COUNT(*), COUNT(CASE WHEN role = 'admin' THEN 1 END) FROM users")
+    total_users, total_admins = c.fetchone()
+    return {
+        'total_residents': total_residents,
+        'checked_in': checked_in,
+        'total_users': total_users,
+        'total_admins': total_admins
+    }
+
+def read_dashboard_stats(conn: sqlite3.Connection, today: Optional[str] = None) -> dict:
+    """
+    Read dashboard statistics from the scan counters.
+
+    Scan totals come from scan_daily_counts, which triggers on the scans
+    table keep up to date (migrations 7 and 9), so no query here scans the scans
+    table.
+
+    Args:
+        conn: Database connection.
+        today: Date (YYYY-MM-DD) to count scans for. Defaults to today in the configured timezone.
+
+    Returns:
+        Dict with total_residents, scans_today, checked_in, total_users,
+        total_admins, top_location and location_totals (location -> scans,
+        busiest first).
+    """
+    today = today or _today()
+    c = conn.cursor()
+    stats = _common_stats(c)
+    c.execute("SELECT COALESCE(SUM(scans), 0) FROM scan_daily_counts WHERE day = ?", (today,))
+    stats['scans_today'] = c.fetchone()[0]
+    c.execute('''
+        SELECT location, SUM(scans) AS total
+        FROM scan_daily_counts
+        WHERE location != ''
+        GROUP BY location
+        HAVING total > 0
+        ORDER BY total DESC, location
+    ''')
+    stats['location_totals'] = {row[0]: row[1] for row in c.fetchall()}
+    stats['top_location'] = next(iter(stats['location_totals']), None)
+    return stats
+
+def compute_dashboard_stats(conn: sqlite3.Connection, today: Optional[str] = None) -> dict:
+    """
+    Compute the same statistics as read_dashboard_stats from the scans table itself.
+
+    This is the slow path, kept for verifying the counters.
+    """
+    today = today or _today()
+    c = conn.cursor()
+    stats = _common_stats(c)
+    c.execute("SELECT COUNT(*) FROM scans WHERE timestamp >= ? AND timestamp < DATE(?, '+1 day')", (today, today))
+    stats['scans_today'] = c.fetchone()[0]
+    c.execute('''
+        SELECT location, COUNT(*) AS total
+        FROM scans
+        WHERE location IS NOT NULL AND location != ''
+        GROUP BY location
+        ORDER BY total DESC, location
+    ''')
+    stats['location_totals'] = {row[0]: row[1] for row in c.fetchall()}
+    stats['top_location'] = next(iter(stats['location_totals']), None)
+    return stats
+
+def get_dashboard_stats(conn: Optional[sqlite3.Connection] = None) -> dict:
+    """
+    Return dashboard statistics, cached for DASHBOARD_STATS_TTL seconds.
+
+    Args:
+        conn: Optional connection to use. Defaults to the request's connection from get_db().
+    """
+    if conn is None:
+        conn = get_db()
+    return _stats_cache.get_or_set('stats', lambda: read_dashboard_stats(conn))
+
+def invalidate_dashboard_stats() -> None:
+    """Drop this worker's cached statistics, e.g. after clearing the scan log."""
+    _stats_cache.clear()
+
+def rebuild_scan_counts(conn: sqlite3.Connection) -> int:
+    """
+    Recreate scan_daily_counts from the full scans table.
+
+    The caller is responsible for committing.
+
+    Args:
+        conn: Database connection.
+
+    Returns:
+        The number of (day, location) counters written.
+    """
+    c = conn.cursor()
+    c.execute("DELETE FROM scan_daily_counts")
+    c.execute(SCAN_COUNT_BACKFILL)
+    count = c.rowcount
+    invalidate_dashboard_stats()
+    logger.info(f"Rebuilt scan_daily_counts with {count} counters")
+    return count
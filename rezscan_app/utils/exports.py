@@ -0,0 +1,205 @@
+import csv
+import io
+import logging
+import os
+import re
+import zlib
+from datetime import datetime
+import pytz
+from flask import Response, stream_with_context
+from rezscan_app.models.database import get_db
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor and written per chunk of response body
+EXPORT_CHUNK_SIZE = 1000
+
+def split_timestamp(timestamp):
+    """
+    Split a stored 'YYYY-MM-DD HH:MM:SS' timestamp into export date and time.
+
+    Uses string slicing rather than strptime/strftime; the date matches
+    DATEFORMAT ('%m-%d-%Y') and the time matches TIMEFORMAT ('%H:%M:%S').
+
+    Args:
+        timestamp: Timestamp string as stored in the database, or None.
+
+    Returns:
+        Tuple of (date_str, time_str). Values that do not look like a stored
+        timestamp are returned unchanged as the date with an empty time.
+    """
+    if not timestamp:
+        return '', ''
+    if len(timestamp) < 19 or timestamp[4] != '-' or timestamp[10] != ' ':
+        return timestamp, ''
+    return f"{timestamp[5:7]}-{timestamp[8:10]}-{timestamp[0:4]}", timestamp[11:19]
+
+class LocalTimeConverter:
+    """
+    Incremental UTC to local time conversion for stored timestamps.
+
+    The UTC offset is resolved through pytz once per UTC hour and cached, so
+    converting a long run of rows costs a dict lookup and a string slice per
+    row instead of a strptime/astimezone/strftime round trip.
+    """
+
+    ISO_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?')
+    MAX_CACHED_HOURS = 100000
+
+    def __init__(self, local_tz):
+        self.local_tz = local_tz
+        self._hours = {}
+
+    def _local_hour(self, hour):
+        # Maps 'YYYY-MM-DD HH' (UTC) to the local 'YYYY-MM-DD HH', or None when
+        # the offset is not a whole number of hours and minutes shift too
+        local = self._hours.get(hour)
+        if local is None and hour not in self._hours:
+            utc_dt = pytz.utc.localize(datetime.strptime(hour, '%Y-%m-%d %H'))
+            local_dt = utc_dt.astimezone(self.local_tz)
+            local = local_dt.strftime('%Y-%m-%d %H') if local_dt.utcoffset().total_seconds() % 3600 == 0 else None
+            if len(self._hours) >= self.MAX_CACHED_HOURS:
+                self._hours.clear()
+            self._hours[hour] = local
+        return local
+
+    def to_local(self, timestamp):
+        """
+        Convert a stored UTC 'YYYY-MM-DD HH:MM:SS' timestamp to local time.
+
+        Args:
+            timestamp: UTC timestamp string (a 'T' separator is accepted).
+
+        Returns:
+            The local timestamp as 'YYYY-MM-DD HH:MM:SS', or the input unchanged
+            if it cannot be parsed.
+        """
+        if not timestamp or len(timestamp) < 19:
+            return timestamp
+        try:
+            local_hour = self._local_hour(f"{timestamp[0:10]} {timestamp[11:13]}")
+            if local_hour is not None:
+                return local_hour + timestamp[13:19]
+            utc_dt = pytz.utc.localize(datetime.strptime(timestamp[0:19].replace('T', ' '), '%Y-%m-%d %H:%M:%S'))
+            return utc_dt.astimezone(self.local_tz).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return timestamp
+
+    def to_local_us(self, timestamp):
+        """Convert like to_local, formatted as 'MM-DD-YYYY HH:MM:SS'."""
+        local = self.to_local(timestamp)
+        date_str, time_str = split_timestamp(local)
+        return f"{date_str} {time_str}" if time_str else local
+
+    def convert_text(self, text):
+        """Rewrite every ISO 8601 UTC timestamp in text as local 'MM-DD-YYYY HH:MM:SS'."""
+        if not text or 'T' not in text:
+            return text or ''
+        return self.ISO_PATTERN.sub(lambda m: self.to_local_us(m.group(0)), text)
+
+def iter_csv(query, params, header, format_row=None, chunk_size=EXPORT_CHUNK_SIZE, on_complete=None):
+    """
+    Run a query and return a generator of encoded CSV chunks.
+
+    The query is executed immediately, so database errors surface to the
+    caller before a response is started. Rows are then pulled from the
+    cursor with fetchmany, so memory stays bounded by chunk_size regardless
+    of how many rows the query returns.
+
+    Args:
+        query: SQL query to run.
+        params: Query parameters.
+        header: CSV header row.
+        format_row: Optional callable mapping a database row to a CSV row.
+        chunk_size: Rows per fetchmany call and per yielded chunk.
+        on_complete: Optional callable invoked with the row count once done.
+
+    Returns:
+        Generator yielding UTF-8 encoded CSV bytes.
+    """
+    c = get_db().cursor()
+    c.execute(query, params)
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        count = 0
+        while True:
+            rows = c.fetchmany(chunk_size)
+            if not rows:
+                break
+            if format_row:
+                rows = [format_row(row) for row in rows]
+            writer.writerows(rows)
+            count += len(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        if on_complete:
+            on_complete(count)
+
+    return generate()
+
+def gzip_chunks(chunks):
+    """Compress an iterable of bytes into a gzip stream on the fly."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def save_export(job, chunks, filename, gzip=False):
+    """
+    Write an export to a file owned by a background job.
+
+    Args:
+        job: The running Job.
+        chunks: Iterable of encoded CSV bytes, usually from iter_csv.
+        filename: Download filename without a compression suffix.
+        gzip: Compress the file and append .gz to the filename.
+
+    Returns:
+        Job result dict with the stored file name, download name and size.
+    """
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+    path = job.file_path(filename)
+    size = 0
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+    return {'file': os.path.basename(path), 'download_name': filename, 'bytes': size}
+
+def csv_response(chunks, filename, gzip=False):
+    """
+    Build a streamed CSV download response.
+
+    The generator runs inside the request context, so it can use get_db()
+    and log_audit_action; the connection is returned to the pool once the
+    stream has been fully sent.
+
+    Args:
+        chunks: Iterable of encoded CSV bytes, usually from iter_csv.
+        filename: Download filename without a compression suffix.
+        gzip: Compress the stream and append .gz to the filename.
+
+    Returns:
+        A streaming Flask Response.
+    """
+    chunks = stream_with_context(chunks)
+    mimetype = 'text/csv'
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    response = Response(chunks, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
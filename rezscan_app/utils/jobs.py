@@ -0,0 +1,214 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from rezscan_app.models.database import get_db, get_pool
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+# Minimum seconds between persisted progress updates for one job
+PROGRESS_INTERVAL = 0.5
+
+# kind -> handler(job, payload) returning a JSON-serialisable result
+JOB_HANDLERS = {}
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def job_handler(kind):
+    """
+    Register a function as the handler for a job kind.
+
+    The handler is called as handler(job, payload) inside an application
+    context, where get_db() and log_audit_action work as usual. Its return
+    value is stored as the job result.
+    """
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def _worker_id():
+    return str(os.getpid())
+
+def job_file_path(filename):
+    """Return the path of a job input or output file, creating the jobs directory."""
+    directory = current_app.config['JOB_FILES_DIR']
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, os.path.basename(filename))
+
+class Job:
+    """
+    Handle passed to a running job's handler for progress reporting.
+
+    Progress is written through a pooled connection of its own, so a handler
+    must not report progress while it holds a write transaction (e.g. after
+    begin_immediate) on get_db(): the update would wait out busy_timeout and
+    then be dropped. Report before beginning and after committing instead.
+    """
+
+    def __init__(self, job_id, kind, username):
+        self.id = job_id
+        self.kind = kind
+        self.username = username
+        self._last_update = 0.0
+
+    def progress(self, done, total=None, message=None, force=False):
+        """Record progress; writes are throttled to one per PROGRESS_INTERVAL unless force is set."""
+        now = time.monotonic()
+        if not force and now - self._last_update < PROGRESS_INTERVAL:
+            return
+        self._last_update = now
+        _update_job(self.id, progress=done, total=total, message=message)
+
+    def file_path(self, filename):
+        """Return a path for an output file owned by this job."""
+        return job_file_path(f"job{self.id}-{filename}")
+
+def _update_job(job_id, **fields):
+    fields = {k: v for k, v in fields.items() if v is not None}
+    if not fields:
+        return
+    pool = get_pool()
+    conn = pool.checkout()
+    try:
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        conn.commit()
+    except sqlite3.Error as e:
+        logger.error(f"Failed to update job {job_id}: {str(e)}")
+    finally:
+        pool.release(conn)
+
+def _get_executor():
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                workers = current_app.config['JOB_WORKERS']
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job-worker')
+                _executor_pid = os.getpid()
+                logger.info(f"Started job worker pool with {workers} thread(s)")
+    return _executor
+
+def enqueue_job(kind, payload, username):
+    """
+    Queue a job and return its id.
+
+    With JOB_MODE 'inline' the job runs to completion before this returns,
+    which keeps tests and single-process development deterministic.
+
+    Args:
+        kind: Registered job kind.
+        payload: JSON-serialisable handler arguments.
+        username: User who started the job.
+
+    Returns:
+        The new job id.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(
+            "INSERT INTO jobs (kind, username, status, payload, created_at, worker) VALUES (?, ?, 'queued', ?, ?, ?)",
+            (kind, username, json.dumps(payload), _now(), _worker_id())
+        )
+        job_id = c.lastrowid
+        conn.commit()
+    logger.info(f"User {username} queued {kind} job {job_id}")
+
+    app = current_app._get_current_object()
+    if app.config['JOB_MODE'] == 'inline':
+        _run_job(app, job_id)
+    else:
+        _get_executor().submit(_run_job, app, job_id)
+    return job_id
+
+def _run_job(app, job_id):
+    with app.app_context():
+        conn = get_db()
+        row = conn.execute("SELECT kind, username, payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            logger.error(f"Job {job_id} vanished before it started")
+            return
+        kind, username, payload = row[0], row[1], json.loads(row[2] or 'null')
+        _update_job(job_id, status='running', started_at=_now(), worker=_worker_id())
+        started = time.monotonic()
+        try:
+            result = JOB_HANDLERS[kind](Job(job_id, kind, username), payload)
+        except Exception as e:
+            logger.error(f"Job {job_id} ({kind}) failed: {str(e)}", exc_info=True)
+            if conn.in_transaction:
+                conn.rollback()
+            _update_job(job_id, status='failed', error=str(e), finished_at=_now())
+            return
+        _update_job(job_id, status='succeeded', result=json.dumps(result), finished_at=_now())
+        logger.info(f"Job {job_id} ({kind}) finished in {time.monotonic() - started:.2f}s")
+
+def _worker_alive(worker):
+    try:
+        os.kill(int(worker), 0)
+    except (TypeError, ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def get_job(job_id):
+    """
+    Return a job as a dict, or None if it does not exist.
+
+    Queued or running jobs whose worker process has exited are marked
+    failed, so a restarted server never leaves a job spinning forever.
+    """
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT id, kind, username, status, progress, total, message, result, error,
+                   worker, created_at, started_at, finished_at
+            FROM jobs WHERE id = ?
+        ''', (job_id,))
+        row = c.fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    if job['status'] in ('queued', 'running') and not _worker_alive(job['worker']):
+        job['status'] = 'failed'
+        job['error'] = 'Interrupted: the worker running this job exited'
+        job['finished_at'] = _now()
+        _update_job(job_id, status=job['status'], error=job['error'], finished_at=job['finished_at'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    del job['worker']
+    return job
+
+def prune_jobs(retention_days):
+    """Delete finished jobs older than retention_days along with their files. Returns the count removed."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+    directory = current_app.config['JOB_FILES_DIR']
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?", (cutoff,))
+        job_ids = [row[0] for row in c.fetchall()]
+        if not job_ids:
+            return 0
+        c.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+        conn.commit()
+    if os.path.isdir(directory):
+        prefixes = tuple(f"job{job_id}-" for job_id in job_ids)
+        for name in os.listdir(directory):
+            if name.startswith(prefixes):
+                os.remove(os.path.join(directory, name))
+    logger.info(f"Pruned {len(job_ids)} finished job(s) older than {retention_days} days")
+    return len(job_ids)
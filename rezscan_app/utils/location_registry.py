@@ -0,0 +1,96 @@
+import logging
+import sqlite3
+import threading
+from typing import Optional
+from rezscan_app.models.database import get_db
+
+logger = logging.getLogger(__name__)
+
+# Settings row used as a cross-worker version counter for the locations table.
+# Every add/delete bumps it; each worker compares it against the version its
+# in-memory registry was loaded at and reloads when they differ.
+VERSION_CATEGORY = 'cache'
+VERSION_KEY = 'locations_version'
+
+_lock = threading.Lock()
+_version = None
+_by_prefix = {}
+_locations = []
+
+def get_location_by_prefix(prefix: str, conn: Optional[sqlite3.Connection] = None) -> Optional[dict]:
+    """
+    Resolve a scan prefix (case-insensitive) to its location record.
+
+    Args:
+        prefix: The location prefix.
+        conn: Optional connection to use. Defaults to the request's connection from get_db().
+
+    Returns:
+        A dict with id, bldg, name, prefix and type, or None if the prefix is unknown.
+    """
+    if not prefix:
+        return None
+    _ensure_loaded(conn)
+    return _by_prefix.get(prefix.strip().upper())
+
+def get_locations(conn: Optional[sqlite3.Connection] = None) -> list:
+    """
+    Return all locations ordered by name.
+
+    Args:
+        conn: Optional connection to use. Defaults to the request's connection from get_db().
+
+    Returns:
+        A list of location dicts with id, bldg, name, prefix and type.
+    """
+    _ensure_loaded(conn)
+    return list(_locations)
+
+def invalidate_locations(conn: Optional[sqlite3.Connection] = None) -> None:
+    """
+    Bump the shared locations version so every worker reloads its registry.
+
+    Call this inside the same transaction as the change to the locations table,
+    before committing.
+
+    Args:
+        conn: Optional connection to use. Defaults to the request's connection from get_db().
+    """
+    global _version
+    if conn is None:
+        conn = get_db()
+    conn.execute('''
+        INSERT INTO settings (category, key, value) VALUES (?, ?, '1')
+        ON CONFLICT(category, key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    ''', (VERSION_CATEGORY, VERSION_KEY))
+    with _lock:
+        _version = None
+    logger.debug("Invalidated location registry")
+
+def _read_version(conn: sqlite3.Connection) -> str:
+    row = conn.execute(
+        "SELECT value FROM settings WHERE category = ? AND key = ?",
+        (VERSION_CATEGORY, VERSION_KEY)
+    ).fetchone()
+    return row[0] if row else '0'
+
+def _ensure_loaded(conn: Optional[sqlite3.Connection]) -> None:
+    """Reload the registry if the shared version differs from the loaded one."""
+    global _version, _by_prefix, _locations
+    if conn is None:
+        conn = get_db()
+    version = _read_version(conn)
+    if version == _version:
+        return
+    with _lock:
+        if version == _version:
+            return
+        rows = conn.execute("SELECT id, bldg, name, prefix, type FROM locations ORDER BY name").fetchall()
+        locations = [
+            {'id': row[0], 'bldg': row[1], 'name': row[2], 'prefix': row[3], 'type': row[4]}
+            for row in rows
+        ]
+        _by_prefix = {loc['prefix'].upper(): loc for loc in locations if loc['prefix']}
+        _locations = locations
+        _version = version
+        logger.info(f"Loaded location registry version {version} with {len(locations)} locations")
@@ -0,0 +1,103 @@
+import logging
+from rezscan_app.utils.resident_index import get_resident_index
+from rezscan_app.utils.scan_logic import begin_immediate
+from rezscan_app.utils.schedule_parser import parse_source_line
+
+logger = logging.getLogger(__name__)
+
+def suggest_match(index, source_line, suggested_name=None, mdoc=None, housing=None):
+    """
+    Fill in a review row's parsed fields and find its candidate residents.
+
+    Missing name, mdoc and housing values are parsed from the source line.
+    A known mdoc yields a single 'mdoc' candidate; otherwise a "Last, First"
+    name yields exact 'name' candidates or, failing that, scored 'fuzzy' ones.
+
+    Args:
+        index: ResidentIndex to search.
+        source_line: The schedule line the review row came from.
+        suggested_name, mdoc, housing: Values already known for the row.
+
+    Returns:
+        Tuple of (fields, candidates): fields is a dict with suggested_name,
+        suggested_mdoc and suggested_housing; candidates is a list of
+        (kind, resident, score) tuples, best first.
+    """
+    if not suggested_name or not mdoc or not housing:
+        parsed = parse_source_line(source_line or "")
+        suggested_name = suggested_name or parsed.get("suggested_name")
+        mdoc = mdoc or parsed.get("suggested_mdoc")
+        housing = housing or parsed.get("suggested_housing")
+    if suggested_name:
+        suggested_name = suggested_name.strip()
+
+    fields = {'suggested_name': suggested_name, 'suggested_mdoc': mdoc, 'suggested_housing': housing}
+    resident = index.get(mdoc)
+    if resident:
+        return fields, [('mdoc', resident, 1.0)]
+    if not suggested_name or ',' not in suggested_name:
+        return fields, []
+    exact = index.by_name(suggested_name, housing)
+    if exact:
+        return fields, [('name', resident, 1.0) for resident in exact]
+    return fields, [('fuzzy', resident, score) for resident, score in index.fuzzy(suggested_name)]
+
+def refresh_match_suggestions(conn, review_ids=None):
+    """
+    Compute and store suggestions for schedule_match_review rows.
+
+    By default only pending rows whose suggestions are missing or were
+    computed against an older resident index are refreshed, so this is
+    cheap to call before every read. The parsed fields are written back to
+    the row and the candidates replace any in schedule_match_candidates.
+
+    Args:
+        conn: Database connection with no open transaction.
+        review_ids: Refresh exactly these rows instead (e.g. just created ones).
+
+    Returns:
+        The number of rows refreshed.
+    """
+    index = get_resident_index(conn)
+    query = '''
+        SELECT id, source_line, suggested_name, suggested_mdoc, suggested_housing
+        FROM schedule_match_review
+    '''
+    if review_ids:
+        ids = list(review_ids)
+        rows = conn.execute(f"{query} WHERE id IN ({', '.join('?' * len(ids))})", ids).fetchall()
+    else:
+        rows = conn.execute(
+            f"{query} WHERE status = 'pending' AND candidates_version IS NOT ?", (index.version,)
+        ).fetchall()
+    if not rows:
+        return 0
+
+    updates = []
+    candidates = []
+    for row in rows:
+        fields, matches = suggest_match(index, row['source_line'], row['suggested_name'], row['suggested_mdoc'], row['suggested_housing'])
+        updates.append((fields['suggested_name'], fields['suggested_mdoc'], fields['suggested_housing'], index.version, row['id']))
+        candidates.extend(
+            (row['id'], rank, kind, resident['mdoc'], resident['name'], resident['housing_unit'], score)
+            for rank, (kind, resident, score) in enumerate(matches)
+        )
+
+    begin_immediate(conn)
+    try:
+        conn.executemany("DELETE FROM schedule_match_candidates WHERE review_id = ?", [(u[-1],) for u in updates])
+        conn.executemany('''
+            INSERT INTO schedule_match_candidates (review_id, rank, kind, mdoc, name, housing_unit, score)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', candidates)
+        conn.executemany('''
+            UPDATE schedule_match_review
+            SET suggested_name = ?, suggested_mdoc = ?, suggested_housing = ?, candidates_version = ?
+            WHERE id = ?
+        ''', updates)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info(f"Refreshed match suggestions for {len(rows)} review row(s) against resident index version {index.version}")
+    return len(rows)
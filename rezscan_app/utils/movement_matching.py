@@ -0,0 +1,307 @@
+import logging
+import re
+import time
+from rezscan_app.utils.resident_index import normalize_name, split_name
+from rezscan_app.utils.scan_logic import begin_immediate
+
+logger = logging.getLogger(__name__)
+
+TIERS = ('exact', 'last_name', 'unit_hint', 'fuzzy')
+
+WC_ROOMS = {"rm 109", "rm 110", "rm 118", "wc art room"}
+UNIT_I_II_ROOMS = {"rm 101", "rm 102", "rm 103", "rm 104", "rm 105", "rm 113", "rm 117"}
+
+IGNORED_PHRASES = [
+    "Report Times", "Computer Lab", "Activities Building", "HiSET", "Room",
+    "Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "OSHA", "Extra Duty",
+    "MCC", "No Evenings", "Study", "Continued", "AM", "PM", "access to technology"
+]
+
+BLOCK_HEADER = re.compile(r"^(All Day|\d{1,2}:\d{2})")
+
+def infer_block_unit(title):
+    """Return 'wc' or 'unit12' if the block title names a room in that unit, else None."""
+    lower = (title or '').lower()
+    if any(room in lower for room in WC_ROOMS):
+        return 'wc'
+    if any(room in lower for room in UNIT_I_II_ROOMS):
+        return 'unit12'
+    return None
+
+def _is_wc_housing(housing_unit):
+    housing = (housing_unit or '').lower()
+    return "women" in housing or housing.startswith("b")
+
+def normalize_line(line):
+    line = line.replace('–', '-').replace('—', '-').replace('#', '-').replace(',', ', ')
+    line = re.sub(r'-+', '-', line)
+    line = re.sub(r'([A-Za-z]),([A-Za-z])', r'\1, \2', line)
+    return re.sub(r'\s+', ' ', line.strip())
+
+def ignore_line(line):
+    return not line or any(phrase in line for phrase in IGNORED_PHRASES)
+
+def split_blocks(raw_text):
+    """
+    Split movement schedule text into blocks.
+
+    A line starting with a time or "All Day" opens a block; its text after
+    " - " is the block title. Other lines belong to the current block.
+
+    Returns:
+        List of dicts with start, title and lines (normalized).
+    """
+    blocks = []
+    current = {'start': None, 'title': '', 'lines': []}
+    for line in raw_text.strip().splitlines():
+        line = normalize_line(line)
+        if BLOCK_HEADER.match(line):
+            if current['lines']:
+                blocks.append(current)
+                current = {'start': None, 'title': '', 'lines': []}
+            parts = re.split(r' - ', line, maxsplit=1)
+            current['start'] = parts[0].strip()
+            if len(parts) > 1:
+                current['title'] = parts[1].strip()
+        else:
+            current['lines'].append(line)
+    if current['lines']:
+        blocks.append(current)
+    return blocks
+
+def parse_line(line):
+    """Split a resident line into (name, mdoc, housing); any may be None."""
+    name = mdoc = housing = None
+    for part in (p.strip() for p in line.split('-')):
+        if not part:
+            continue
+        if ',' in part:
+            name = part
+        elif part.isdigit() and len(part) >= 5:
+            mdoc = part
+        elif not housing:
+            housing = part
+    return name, mdoc, housing
+
+class MovementMatcher:
+    """
+    Resolves movement schedule lines to residents through a ResidentIndex.
+
+    Lines go through the tiers in order: exact (mdoc or full name),
+    last_name (unique last name, including hyphenated parts), unit_hint
+    (last-name candidates narrowed by the block's room) and fuzzy
+    (trigram-shortlisted similarity). Results are memoised per line and
+    block unit, and the time and hits of each tier are kept in stats.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._memo = {}
+        self.stats = {tier: {'hits': 0, 'seconds': 0.0} for tier in TIERS}
+
+    def _timed(self, tier, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.stats[tier]['seconds'] += time.perf_counter() - start
+
+    def resolve(self, name, mdoc, unit_hint):
+        """
+        Match one parsed line.
+
+        Returns:
+            Tuple of (outcome, tier, resident): outcome is 'matched',
+            'fuzzy', 'conflict' or 'unmatched'; tier is the tier that decided
+            it (None when unmatched); resident is the matched or suggested
+            resident, if any.
+        """
+        key = (normalize_name(name), mdoc, unit_hint)
+        if key not in self._memo:
+            self._memo[key] = self._resolve(name, mdoc, unit_hint)
+        outcome, tier, resident = self._memo[key]
+        if tier:
+            self.stats[tier]['hits'] += 1
+        return outcome, tier, resident
+
+    def _resolve(self, name, mdoc, unit_hint):
+        result = self._timed('exact', self._exact, name, mdoc)
+        if result:
+            return result
+
+        candidates = self._timed('last_name', self._last_name, name)
+        tier = 'last_name'
+        if unit_hint and candidates:
+            narrowed = self._timed('unit_hint', self._narrow_to_unit, candidates, unit_hint)
+            if len(narrowed) != len(candidates):
+                tier = 'unit_hint'
+            candidates = narrowed
+        if len(candidates) == 1:
+            return 'matched', tier, candidates[0]
+        if candidates:
+            return 'conflict', tier, None
+
+        result = self._timed('fuzzy', self._fuzzy, name)
+        if result:
+            return result
+        return 'unmatched', None, None
+
+    def _exact(self, name, mdoc):
+        resident = self.index.get(mdoc)
+        if resident:
+            return 'matched', 'exact', resident
+        matches = self.index.with_name(name)
+        if len(matches) == 1:
+            return 'matched', 'exact', matches[0]
+        if matches:
+            return 'conflict', 'exact', None
+        return None
+
+    def _last_name(self, name):
+        last, _ = split_name(name)
+        return self.index.with_last_name(last) if last else []
+
+    def _narrow_to_unit(self, candidates, unit_hint):
+        wants_wc = unit_hint == 'wc'
+        return [r for r in candidates if _is_wc_housing(r['housing_unit']) == wants_wc]
+
+    def _fuzzy(self, name):
+        scored = self.index.fuzzy(name)
+        if not scored:
+            return None
+        best = normalize_name(scored[0][0]['name'])
+        same_name = [resident for resident, _ in scored if normalize_name(resident['name']) == best]
+        if len(same_name) > 1:
+            return 'conflict', 'fuzzy', None
+        return 'fuzzy', 'fuzzy', same_name[0]
+
+def match_movement_text(index, raw_text):
+    """
+    Match every resident line of a movement schedule.
+
+    Args:
+        index: ResidentIndex to match against.
+        raw_text: Movement schedule text (pasted, or parsed from a PDF).
+
+    Returns:
+        Tuple of (blocks, summary, stats). Each block has start, title and
+        matched, fuzzy, conflicts and unmatched lists plus a lines list of
+        (line, outcome, name, mdoc, housing, resident) for saving.
+    """
+    matcher = MovementMatcher(index)
+    started = time.perf_counter()
+    blocks = []
+    for block in split_blocks(raw_text):
+        unit_hint = infer_block_unit(block['title'])
+        parsed = {'start': block['start'], 'title': block['title'],
+                  'matched': [], 'unmatched': [], 'conflicts': [], 'fuzzy': [], 'lines': []}
+        for line in block['lines']:
+            if ignore_line(line):
+                continue
+            name, mdoc, housing = parse_line(line)
+            outcome, _, resident = matcher.resolve(name or line, mdoc, unit_hint)
+            parsed['lines'].append((line, outcome, name, mdoc, housing, resident))
+            if outcome == 'matched':
+                parsed['matched'].append(resident)
+            elif outcome == 'fuzzy':
+                parsed['fuzzy'].append({
+                    'suggested_name': normalize_name(resident['name']),
+                    'original': line,
+                    'name': resident['name'],
+                    'mdoc': resident['mdoc'],
+                    'housing_unit': resident['housing_unit']
+                })
+            elif outcome == 'conflict':
+                parsed['conflicts'].append(line)
+            else:
+                parsed['unmatched'].append(line)
+        blocks.append(parsed)
+
+    summary = {
+        'matched': sum(len(b['matched']) for b in blocks),
+        'unmatched': sum(len(b['unmatched']) for b in blocks),
+        'conflicted': sum(len(b['conflicts']) for b in blocks),
+        'fuzzy': sum(len(b['fuzzy']) for b in blocks)
+    }
+    stats = dict(matcher.stats)
+    stats['total'] = {'hits': sum(len(b['lines']) for b in blocks), 'seconds': time.perf_counter() - started}
+    logger.info(
+        "Matched movement schedule: " + ", ".join(
+            f"{tier} {s['hits']} in {s['seconds'] * 1000:.1f}ms" for tier, s in stats.items()
+        )
+    )
+    return blocks, summary, stats
+
+def save_movement_matches(conn, blocks, auto_approve=True):
+    """
+    Write matched lines to resident_schedules and the rest to the review queue.
+
+    Matched residents in a block whose title names an existing schedule
+    group are assigned to it (when auto_approve is on) and logged as
+    approved review rows; everything else becomes a pending review row.
+    Saving the same schedule again does not duplicate assignments or
+    review rows.
+
+    Args:
+        conn: Database connection with no open transaction.
+        blocks: Blocks returned by match_movement_text.
+        auto_approve: Assign confident matches without review.
+
+    Returns:
+        Tuple of (assigned, queued, pending_ids): new resident_schedules
+        rows, new pending review rows and their ids.
+    """
+    groups = {row[1]: row[0] for row in conn.execute("SELECT id, name FROM schedule_groups")}
+    assignments = []
+    approved = []
+    pending = []
+    for block in blocks:
+        group_id = groups.get(block['title'])
+        for line, outcome, name, mdoc, housing, resident in block['lines']:
+            if outcome == 'matched' and auto_approve and group_id:
+                assignments.append((resident['mdoc'], group_id, resident['mdoc'], group_id))
+                approved.append((block['title'], block['start'], line, resident['name'], resident['mdoc'], resident['housing_unit']))
+            elif outcome == 'matched':
+                pending.append((block['title'], block['start'], line, resident['name'], resident['mdoc'], resident['housing_unit'], 'fuzzy'))
+            else:
+                match_type = 'unmatched' if outcome == 'unmatched' else outcome
+                pending.append((block['title'], block['start'], line, name, mdoc, housing, match_type))
+
+    begin_immediate(conn)
+    try:
+        first_new_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM schedule_match_review").fetchone()[0]
+        changes_before = conn.total_changes
+        conn.executemany('''
+            INSERT INTO resident_schedules (mdoc, group_id)
+            SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM resident_schedules WHERE mdoc = ? AND group_id = ?)
+        ''', assignments)
+        assigned = conn.total_changes - changes_before
+        conn.executemany('''
+            INSERT INTO schedule_match_review (
+                block_title, block_time, source_line, suggested_name, suggested_mdoc, suggested_housing,
+                match_type, status, reviewed_by, reviewed_at
+            )
+            SELECT ?1, ?2, ?3, ?4, ?5, ?6, 'fuzzy', 'approved', 'Auto', CURRENT_TIMESTAMP
+            WHERE NOT EXISTS (
+                SELECT 1 FROM schedule_match_review
+                WHERE status = 'approved' AND block_title = ?1 AND block_time IS ?2 AND source_line = ?3
+            )
+        ''', approved)
+        conn.executemany('''
+            INSERT INTO schedule_match_review (
+                block_title, block_time, source_line, suggested_name, suggested_mdoc, suggested_housing, match_type
+            )
+            SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7
+            WHERE NOT EXISTS (
+                SELECT 1 FROM schedule_match_review
+                WHERE status = 'pending' AND block_title = ?1 AND block_time IS ?2 AND source_line = ?3
+            )
+        ''', pending)
+        pending_ids = [row[0] for row in conn.execute(
+            "SELECT id FROM schedule_match_review WHERE id > ? AND status = 'pending'", (first_new_id,)
+        )]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return assigned, len(pending_ids), pending_ids
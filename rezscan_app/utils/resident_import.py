@@ -0,0 +1,236 @@
+import csv
+import io
+import logging
+import os
+import re
+from datetime import datetime
+from rezscan_app.models.database import get_db
+from rezscan_app.utils.audit_logging import log_audit_action
+from rezscan_app.utils.constants import CSV_REQUIRED_HEADERS
+from rezscan_app.utils.jobs import job_handler
+from rezscan_app.utils.scan_logic import begin_immediate
+
+logger = logging.getLogger(__name__)
+
+RESIDENT_FIELDS = ['name', 'unit', 'housing_unit', 'level', 'photo']
+
+# Housing unit spellings used by the upstream roster, mapped to our names
+HOUSING_REPLACEMENTS = {
+    'women ctr': "Women's Center",
+    'a walk': "SMWRC",
+    'b walk': "SMWRC",
+    'c walk': "SMWRC",
+    'd walk': "SMWRC",
+}
+
+MDOC_PATTERN = re.compile(r'^\d{1,10}$')
+
+STAGE_TABLE = 'resident_import_stage'
+
+# A staged row differs from the stored one if any field changed (NULL-safe)
+CHANGED_SQL = ' OR '.join(f"r.{field} IS NOT s.{field}" for field in RESIDENT_FIELDS)
+
+def parse_resident_csv(text):
+    """
+    Parse and validate an uploaded resident roster.
+
+    Args:
+        text: Decoded CSV content.
+
+    Returns:
+        Tuple of (rows, failures). rows maps mdoc to a dict of resident
+        fields (later duplicates win); failures is a list of messages for
+        rows that were skipped.
+
+    Raises:
+        ValueError: If the header row is missing a required column.
+    """
+    reader = csv.DictReader(io.StringIO(text, newline=None))
+    reader.fieldnames = [f.strip().lower() for f in reader.fieldnames or []]
+    missing = [h for h in CSV_REQUIRED_HEADERS if h not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    rows = {}
+    failures = []
+    for raw_row in reader:
+        mdoc = (raw_row.get('mdoc') or '').strip()
+        if not mdoc:
+            failures.append(f"✘ Missing MDOC for row: {raw_row}")
+            continue
+        if not MDOC_PATTERN.match(mdoc):
+            failures.append(f"✘ Invalid MDOC format for row: {mdoc}")
+            continue
+
+        row = {field: raw_row.get(field) or '' for field in RESIDENT_FIELDS}
+        row['housing_unit'] = HOUSING_REPLACEMENTS.get(row['housing_unit'].lower(), row['housing_unit'])
+        rows[mdoc] = row
+    return rows, failures
+
+def _stage(c, rows):
+    c.execute(f"DROP TABLE IF EXISTS temp.{STAGE_TABLE}")
+    c.execute(f'''
+        CREATE TEMP TABLE {STAGE_TABLE} (
+            mdoc TEXT PRIMARY KEY,
+            name TEXT, unit TEXT, housing_unit TEXT, level TEXT, photo TEXT
+        )
+    ''')
+    c.executemany(
+        f"INSERT INTO temp.{STAGE_TABLE} (mdoc, name, unit, housing_unit, level, photo) VALUES (?, ?, ?, ?, ?, ?)",
+        [(mdoc, *(row[field] for field in RESIDENT_FIELDS)) for mdoc, row in rows.items()]
+    )
+
+def _diff_sets(c):
+    c.execute(f'''
+        SELECT s.mdoc, s.name, s.unit, s.housing_unit, s.level, s.photo
+        FROM temp.{STAGE_TABLE} s
+        LEFT JOIN residents r ON r.mdoc = s.mdoc
+        WHERE r.mdoc IS NULL
+    ''')
+    adds = [tuple(row) for row in c.fetchall()]
+
+    c.execute(f'''
+        SELECT s.mdoc, s.name, s.unit, s.housing_unit, s.level, s.photo,
+               r.name, r.unit, r.housing_unit, r.level, r.photo
+        FROM temp.{STAGE_TABLE} s
+        JOIN residents r ON r.mdoc = s.mdoc
+        WHERE {CHANGED_SQL}
+    ''')
+    updates = [tuple(row) for row in c.fetchall()]
+
+    c.execute(f'''
+        SELECT r.mdoc, r.name
+        FROM residents r
+        WHERE NOT EXISTS (SELECT 1 FROM temp.{STAGE_TABLE} s WHERE s.mdoc = r.mdoc)
+    ''')
+    deletes = [tuple(row) for row in c.fetchall()]
+    return adds, updates, deletes
+
+def import_residents(conn, text, username, dry_run=False, progress=None):
+    """
+    Synchronise the residents table with an uploaded roster.
+
+    The roster is staged into a temp table and the add, update and delete
+    sets are computed with joins against residents. Unless dry_run is set,
+    the changes, the import_history row and the resident_backups of every
+    updated or deleted resident are written in a single transaction.
+
+    Args:
+        conn: Database connection.
+        text: Decoded CSV content.
+        username: User performing the import.
+        dry_run: Compute and report the changes without applying them.
+        progress: Optional callable(done, total, message, force) for job progress.
+
+    Returns:
+        Dict with stats, messages, preview_changes, update_diffs and import_id.
+
+    Raises:
+        ValueError: If the CSV is missing a required column.
+        sqlite3.Error: If the import fails; nothing is applied in that case.
+    """
+    report = progress or (lambda *args, **kwargs: None)
+    report(0, 4, "Parsing CSV", force=True)
+    rows, failures = parse_resident_csv(text)
+    for message in failures:
+        logger.warning(f"User {username} skipped row in CSV import: {message}")
+
+    # Progress is written on another connection, so it is reported only while
+    # this one holds no write lock
+    report(1, 4, f"Comparing {len(rows)} residents", force=True)
+    c = conn.cursor()
+    begin_immediate(conn)
+    try:
+        _stage(c, rows)
+        adds, updates, deletes = _diff_sets(c)
+
+        stats = {
+            'added': len(adds),
+            'updated': len(updates),
+            'deleted': len(deletes),
+            'failed': len(failures),
+            'processed': len(rows)
+        }
+        preview_changes = [f"➕ Add: {row[1]}" for row in adds]
+        update_diffs = []
+        for row in updates:
+            new, current = row[1:6], row[6:11]
+            diffs = {
+                field: {'from': current[i], 'to': new[i]}
+                for i, field in enumerate(RESIDENT_FIELDS) if current[i] != new[i]
+            }
+            preview_changes.append(f"✏️ Update: {row[1]}")
+            update_diffs.append({'mdoc': row[0], 'name': row[1], 'diffs': diffs})
+        preview_changes.extend(f"❌ Delete: {row[1]}" for row in deletes)
+
+        result = {
+            'stats': stats,
+            'messages': list(failures),
+            'preview_changes': preview_changes,
+            'update_diffs': update_diffs,
+            'import_id': None
+        }
+
+        if dry_run:
+            conn.rollback()
+            result['messages'].append("🧪 Dry Run: No changes committed.")
+            logger.info(f"User {username} performed dry run import: {stats['processed']} rows processed")
+            return result
+
+        c.execute('''
+            INSERT INTO import_history (timestamp, username, added, updated, deleted, failed, total, csv_content)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (datetime.utcnow().isoformat(), username, stats['added'], stats['updated'], stats['deleted'],
+              stats['failed'], stats['processed'], text))
+        import_id = c.lastrowid
+
+        # Back up every resident about to be updated or deleted, before touching them
+        c.execute(f'''
+            INSERT INTO resident_backups (import_id, mdoc, name, unit, housing_unit, level, photo)
+            SELECT ?, r.mdoc, r.name, r.unit, r.housing_unit, r.level, r.photo
+            FROM residents r
+            LEFT JOIN temp.{STAGE_TABLE} s ON s.mdoc = r.mdoc
+            WHERE s.mdoc IS NULL OR {CHANGED_SQL}
+        ''', (import_id,))
+
+        c.executemany(
+            "INSERT INTO residents (mdoc, name, unit, housing_unit, level, photo) VALUES (?, ?, ?, ?, ?, ?)",
+            adds
+        )
+        c.executemany(
+            "UPDATE residents SET name = ?, unit = ?, housing_unit = ?, level = ?, photo = ? WHERE mdoc = ?",
+            [(*row[1:6], row[0]) for row in updates]
+        )
+        c.executemany("DELETE FROM residents WHERE mdoc = ?", [(row[0],) for row in deletes])
+        c.execute(f"DROP TABLE temp.{STAGE_TABLE}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    report(3, 4, f"Applied {len(adds)} adds, {len(updates)} updates, {len(deletes)} deletes", force=True)
+    result['import_id'] = import_id
+    result['messages'].append("✅ Changes committed to database.")
+    logger.info(f"User {username} committed resident import {import_id}: {stats['added']} added, {stats['updated']} updated, {stats['deleted']} deleted, {stats['failed']} failed")
+    return result
+
+@job_handler('import_residents')
+def run_import_job(job, payload):
+    """Background job: import the roster saved at payload['path'], then remove the file."""
+    try:
+        with open(payload['path'], encoding='utf-8') as f:
+            text = f.read()
+    finally:
+        os.remove(payload['path'])
+
+    dry_run = payload.get('dry_run', False)
+    result = import_residents(get_db(), text, job.username, dry_run=dry_run, progress=job.progress)
+    stats = result['stats']
+    log_audit_action(
+        username=job.username,
+        action='import_residents' if not dry_run else 'import_residents_dry_run',
+        target='residents',
+        details=f"Processed {stats['processed']} rows: {stats['added']} added, {stats['updated']} updated, {stats['deleted']} deleted, {stats['failed']} failed"
+    )
+    job.progress(4, 4, "Dry run complete" if dry_run else "Import committed", force=True)
+    return result
@@ -0,0 +1,232 @@
+import heapq
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Optional
+from rezscan_app.models.database import get_db
+from rezscan_app.utils.location_registry import VERSION_CATEGORY
+
+logger = logging.getLogger(__name__)
+
+# Settings row bumped by triggers on the residents table (migration 5); each
+# worker rebuilds its index when the stored version moves on.
+VERSION_KEY = 'residents_version'
+
+FUZZY_THRESHOLD = 0.85  # Minimum SequenceMatcher ratio for a fuzzy candidate
+FUZZY_LIMIT = 10  # Fuzzy candidates returned per name
+FUZZY_SHORTLIST = 50  # Trigram-ranked names re-scored with SequenceMatcher
+MEMO_SIZE = 4096  # Fuzzy lookups remembered per index
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_name(name: str) -> str:
+    """Lower-case a name and collapse its whitespace for comparison."""
+    return _WHITESPACE.sub(' ', (name or '').strip().lower())
+
+def split_name(name: str) -> tuple:
+    """
+    Split a "Last, First" name.
+
+    Returns:
+        Tuple of (last name lower-cased, first initial as written), either of
+        which may be ''.
+    """
+    last, _, first = (name or '').partition(',')
+    first = first.strip()
+    return last.strip().lower(), first[0] if first else ''
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class ResidentIndex:
+    """
+    In-memory lookup structures over residents for name matching.
+
+    Holds an mdoc map, full-name and last-name hash maps (including each
+    part of a hyphenated last name), (last name, first initial) buckets,
+    housing unit buckets and a trigram inverted index used to shortlist
+    fuzzy candidates without comparing against every resident.
+    Residents are dicts with mdoc, name and housing_unit.
+    """
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.residents = [
+            {'mdoc': row[0], 'name': row[1], 'housing_unit': row[2]}
+            for row in rows if row[1]
+        ]
+        self.by_mdoc = {}
+        self.by_key = {}
+        self.by_last = {}
+        self.by_last_part = {}
+        self.by_last_initial = {}
+        self.by_housing = {}
+        self._keys = []
+        self._gram_counts = []
+        self._postings = {}
+        self._memo = {}
+
+        for i, resident in enumerate(self.residents):
+            if resident['mdoc']:
+                self.by_mdoc[str(resident['mdoc'])] = resident
+            last, initial = split_name(resident['name'])
+            self.by_last.setdefault(last, []).append(i)
+            if '-' in last:
+                for part in filter(None, (p.strip() for p in last.split('-'))):
+                    self.by_last_part.setdefault(part, []).append(i)
+            if initial:
+                self.by_last_initial.setdefault((last, initial), []).append(i)
+            housing = (resident['housing_unit'] or '').lower()
+            if housing:
+                self.by_housing.setdefault(housing, set()).add(i)
+
+            key = normalize_name(resident['name'])
+            self.by_key.setdefault(key, []).append(i)
+            grams = _trigrams(key)
+            self._keys.append(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+    def __len__(self):
+        return len(self.residents)
+
+    def get(self, mdoc) -> Optional[dict]:
+        """Return the resident with this mdoc, or None."""
+        return self.by_mdoc.get(str(mdoc)) if mdoc else None
+
+    def with_name(self, name: str) -> list:
+        """Residents whose full name equals name (case and whitespace-insensitive)."""
+        return [self.residents[i] for i in self.by_key.get(normalize_name(name), [])]
+
+    def with_last_name(self, last: str) -> list:
+        """Residents with this last name, or with it as part of a hyphenated last name."""
+        last = last.strip().lower()
+        return [self.residents[i] for i in self.by_last.get(last) or self.by_last_part.get(last, [])]
+
+    def in_housing(self, housing: str) -> set:
+        """Return indexes of residents whose housing unit contains housing (case-insensitive)."""
+        needle = housing.lower()
+        matched = set()
+        for unit, members in self.by_housing.items():
+            if needle in unit:
+                matched |= members
+        return matched
+
+    def by_name(self, name: str, housing: Optional[str] = None) -> list:
+        """
+        Exact candidates for a "Last, First" name.
+
+        Matches on last name, narrowed to residents whose housing unit
+        contains housing (if given) and whose first name starts with the
+        same initial (if the name has one).
+        """
+        last, initial = split_name(name)
+        members = self.by_last_initial.get((last, initial), []) if initial else self.by_last.get(last, [])
+        if housing and members:
+            in_housing = self.in_housing(housing)
+            members = [i for i in members if i in in_housing]
+        return [self.residents[i] for i in members]
+
+    def fuzzy(self, name: str, threshold: float = FUZZY_THRESHOLD, limit: int = FUZZY_LIMIT) -> list:
+        """
+        Residents whose name is similar to name, best first.
+
+        Names sharing the most trigrams are shortlisted, then re-scored with
+        SequenceMatcher and kept if the ratio reaches threshold.
+
+        Returns:
+            List of (resident, ratio) tuples.
+        """
+        key = normalize_name(name)
+        memo_key = (key, threshold, limit)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        if not key:
+            return []
+
+        grams = _trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        # ratio() is 2*M/(a + b) for M matched characters, so it is at most
+        # 2*min(a, b)/(a + b), which bounds the usable lengths b. A match at the
+        # threshold has M >= threshold*(a + b)/2; each of the a - M unmatched
+        # characters of the name breaks at most 3 of its trigrams, and each of
+        # the b - M characters only in the candidate at most the 2 spanning it
+        a = len(key)
+        min_len = math.ceil(a * threshold / (2 - threshold))
+        max_len = math.floor(a * (2 - threshold) / threshold)
+        min_shared = {}
+        for b in range(min_len, max_len + 1):
+            matched = math.ceil(threshold * (a + b) / 2 - 1e-9)
+            min_shared[b] = max(1, len(grams) - 3 * (a - matched) - 2 * (b - matched))
+        shortlist = heapq.nlargest(
+            FUZZY_SHORTLIST,
+            ((count / (len(grams) + self._gram_counts[i]), i)
+             for i, count in shared.items()
+             if count >= min_shared.get(len(self._keys[i]), math.inf))
+        )
+
+        scored = []
+        for _, i in shortlist:
+            ratio = SequenceMatcher(None, key, self._keys[i]).ratio()
+            if ratio >= threshold:
+                scored.append((ratio, i))
+        scored.sort(key=lambda item: -item[0])
+        result = [(self.residents[i], ratio) for ratio, i in scored[:limit]]
+
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[memo_key] = result
+        return result
+
+    def candidates(self, name: str, housing: Optional[str] = None) -> list:
+        """
+        Exact candidates for name, falling back to fuzzy ones if there are none.
+
+        Returns:
+            List of (resident, score) tuples; exact candidates score 1.0.
+        """
+        exact = self.by_name(name, housing)
+        if exact:
+            return [(resident, 1.0) for resident in exact]
+        return self.fuzzy(name)
+
+_lock = threading.Lock()
+_version = None
+_index = None
+
+def get_resident_index(conn: Optional[sqlite3.Connection] = None) -> ResidentIndex:
+    """
+    Return this worker's resident index, rebuilding it if residents changed.
+
+    Args:
+        conn: Optional connection to use. Defaults to the request's connection from get_db().
+
+    Returns:
+        The current ResidentIndex.
+    """
+    global _version, _index
+    if conn is None:
+        conn = get_db()
+    row = conn.execute(
+        "SELECT value FROM settings WHERE category = ? AND key = ?",
+        (VERSION_CATEGORY, VERSION_KEY)
+    ).fetchone()
+    version = row[0] if row else '0'
+    if version == _version:
+        return _index
+    with _lock:
+        if version != _version:
+            rows = conn.execute("SELECT mdoc, name, housing_unit FROM residents").fetchall()
+            _index = ResidentIndex(rows, version)
+            _version = version
+            logger.info(f"Built resident index version {version} with {len(_index)} residents")
+        return _index
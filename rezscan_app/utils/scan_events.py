@@ -0,0 +1,128 @@
+import logging
+import queue
+import sqlite3
+import threading
+from rezscan_app.models.database import connect
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per poll; larger bursts are drained over successive polls.
+FETCH_LIMIT = 200
+# Per-subscriber buffer; slow clients drop events rather than stall the bus.
+SUBSCRIBER_QUEUE_SIZE = 100
+
+FETCH_EVENTS_SQL = """
+    SELECT s.scanid, s.mdoc, r.name, s.status, s.location, s.timestamp
+    FROM scans s
+    LEFT JOIN residents r ON s.mdoc = r.mdoc
+    WHERE s.scanid > ?
+    ORDER BY s.scanid
+    LIMIT ?
+"""
+
+class ScanEventBus:
+    """
+    In-process publish/subscribe bus for scan events.
+
+    The cursor is the scans AUTOINCREMENT sequence in sqlite_sequence, so every
+    gunicorn worker sees scans recorded by any other worker. A single poller
+    thread per worker reads the sequence and fans new scans out to subscriber
+    queues; publish() wakes it immediately for scans recorded in this worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._subscribers = set()
+        self._thread = None
+        self._settings = None
+        self._poll_interval = 1.0
+        self.cursor = None
+
+    def start(self, settings: dict, poll_interval: float = 1.0) -> None:
+        """Start the poller thread if it is not already running."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._settings = settings
+            self._poll_interval = poll_interval
+            self._thread = threading.Thread(target=self._run, name='scan-event-bus', daemon=True)
+            self._thread.start()
+            logger.info(f"Started scan event bus poller (interval={poll_interval}s)")
+
+    def publish(self) -> None:
+        """Signal that a scan was committed in this worker."""
+        self._wake.set()
+
+    def subscribe(self) -> queue.Queue:
+        """Register a subscriber and return its event queue."""
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+        logger.debug(f"Scan event subscriber added ({len(self._subscribers)} active)")
+        return q
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        """Remove a subscriber queue."""
+        with self._lock:
+            self._subscribers.discard(q)
+        logger.debug(f"Scan event subscriber removed ({len(self._subscribers)} active)")
+
+    def _run(self) -> None:
+        conn = connect(settings=self._settings)
+        try:
+            if self.cursor is None:
+                self.cursor = _read_sequence(conn)
+            while True:
+                self._wake.wait(self._poll_interval)
+                self._wake.clear()
+                if not self._subscribers:
+                    self.cursor = _read_sequence(conn)
+                    continue
+                try:
+                    self._dispatch(conn)
+                except sqlite3.Error as e:
+                    logger.error(f"Scan event bus failed to read new scans: {str(e)}")
+        finally:
+            conn.close()
+
+    def _dispatch(self, conn: sqlite3.Connection) -> None:
+        if _read_sequence(conn) <= self.cursor:
+            return
+        for event in fetch_events_since(conn, self.cursor):
+            self.cursor = event['id']
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for q in subscribers:
+                try:
+                    q.put_nowait(event)
+                except queue.Full:
+                    logger.warning("Scan event subscriber queue full, dropping event")
+
+def fetch_events_since(conn: sqlite3.Connection, cursor: int, limit: int = FETCH_LIMIT) -> list:
+    """
+    Fetch scans recorded after the given scanid.
+
+    Args:
+        conn: Database connection.
+        cursor: The last scanid already delivered.
+        limit: Maximum number of events to return.
+
+    Returns:
+        A list of event dicts ordered by scanid.
+    """
+    rows = conn.execute(FETCH_EVENTS_SQL, (cursor, limit)).fetchall()
+    return [
+        {'id': row[0], 'mdoc': row[1], 'name': row[2], 'status': row[3], 'location': row[4], 'timestamp': row[5]}
+        for row in rows
+    ]
+
+def _read_sequence(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'scans'").fetchone()
+    return row[0] if row else 0
+
+scan_event_bus = ScanEventBus()
+
+def publish_scan_event() -> None:
+    """Wake the scan event bus after a scan has been committed."""
+    scan_event_bus.publish()
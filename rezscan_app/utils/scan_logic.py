@@ -4,6 +4,9 @@ from datetime import datetime, timedelta
 from typing import Optional
 import pytz
 from rezscan_app.config import Config
+from rezscan_app.models.database import get_db
+from rezscan_app.utils.location_registry import get_location_by_prefix
+from rezscan_app.utils.scan_events import publish_scan_event
 from rezscan_app.utils.logging_config import setup_logging
 
 # Configure logging
@@ -19,13 +22,39 @@ except pytz.exceptions.UnknownTimeZoneError:
 
 TOO_SOON_SECONDS = 1  # configurable scan cooldown
 
-def process_scan(mdoc: str, prefix: str) -> str:
+# Statement text is kept constant so sqlite3's per-connection statement cache
+# reuses the prepared statements across scans on the same connection.
+SELECT_RESIDENT_SQL = "SELECT id FROM residents WHERE mdoc = ?"
+INSERT_UNKNOWN_RESIDENT_SQL = "INSERT INTO residents (mdoc, name) VALUES (?, ?)"
+SELECT_LAST_SCAN_SQL = """
+    SELECT location, status, timestamp
+    FROM scans
+    WHERE mdoc = ?
+    ORDER BY timestamp DESC
+    LIMIT 1
+"""
+INSERT_SCAN_SQL = "INSERT INTO scans (mdoc, timestamp, status, location) VALUES (?, ?, ?, ?)"
+UPSERT_CURRENT_STATUS_SQL = """
+    INSERT INTO resident_current_status (mdoc, location, status, timestamp)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(mdoc) DO UPDATE SET
+        location = excluded.location,
+        status = excluded.status,
+        timestamp = excluded.timestamp
+"""
+
+def process_scan(mdoc: str, prefix: str, conn: Optional[sqlite3.Connection] = None) -> str:
     """
     Process a barcode scan and insert into scans table.
 
+    The location lookup, resident auto-insert, last-scan lookup and scan
+    inserts all run on a single connection inside one BEGIN IMMEDIATE
+    transaction, committed once.
+
     Args:
         mdoc: The resident's MDOC identifier.
         prefix: The location prefix.
+        conn: Optional connection to use. Defaults to the request's connection from get_db().
 
     Returns:
         A message indicating the result of the scan operation.
@@ -35,73 +64,23 @@ def process_scan(mdoc: str, prefix: str) -> str:
             logger.warning(f"Invalid input: mdoc='{mdoc}', prefix='{prefix}'")
             return "Invalid input: MDOC and prefix cannot be empty."
 
-        location_name = get_location_name_by_prefix(prefix)
+        if conn is None:
+            conn = get_db()
+
+        location_name = get_location_name_by_prefix(prefix, conn)
         if not location_name:
             logger.warning(f"Prefix '{prefix}' not found")
             return f"Prefix '{prefix}' not associated with any location."
 
-        with sqlite3.connect(Config.DB_PATH) as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT id FROM residents WHERE mdoc = ?", (mdoc,))
-            resident = cursor.fetchone()
-            resident_not_found = not resident
-            if resident_not_found:
-                cursor.execute("""
-                INSERT INTO residents (mdoc, name)
-                VALUES (?, ?)
-            """, (mdoc, "Update Resident"))
-            logger.info(f"Added unknown resident with MDOC '{mdoc}' to database.")
-
-            cursor.execute("""
-                SELECT location, status, timestamp
-                FROM scans
-                WHERE mdoc = ?
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """, (mdoc,))
-            last_scan = cursor.fetchone()
-            
-            # Use configured timezone for current time
-            now = datetime.now(APP_TIMEZONE)
-            scan_time = now
-            out_time = now - timedelta(seconds=1)
-
-            if last_scan:
-                last_location, last_status, last_timestamp = last_scan
-                # Parse stored timestamp as configured timezone
-                last_timestamp = APP_TIMEZONE.localize(datetime.strptime(last_timestamp, "%Y-%m-%d %H:%M:%S"))
-
-                if (now - last_timestamp).total_seconds() < TOO_SOON_SECONDS:
-                    logger.info(f"Ignored rapid scan for MDOC '{mdoc}' at {location_name}")
-                    return f"Scan ignored: too soon since last scan."
-
-                if last_status == 'In' and last_location != location_name:
-                    # Missed Out scan — record Out for last location, then In for current
-                    insert_scan(cursor, mdoc, out_time, 'Out', last_location)
-                    insert_scan(cursor, mdoc, scan_time, 'In', location_name)
-                    conn.commit()
-                    message = f"Scan recorded: 'Out' at {last_location}, 'In' at {location_name} (missed scan corrected)"
-                    logger.info(f"Missed scan corrected for MDOC '{mdoc}': Out at {last_location}, In at {location_name}")
-                    return _format_return_message(message, resident_not_found)
-
-                if last_location == location_name:
-                    # Same location, toggle In/Out
-                    status = 'Out' if last_status == 'In' else 'In'
-                    insert_scan(cursor, mdoc, scan_time, status, location_name)
-                    conn.commit()
-                    message = f"Scan recorded: '{status}' at {location_name}"
-                    logger.info(f"Toggled scan for MDOC '{mdoc}': {status} at {location_name}")
-                    return _format_return_message(message, resident_not_found)
-
-            # Default to 'In'
-            insert_scan(cursor, mdoc, scan_time, 'In', location_name)
+        begin_immediate(conn)
+        try:
+            message = _record_scan(conn.cursor(), mdoc, location_name)
             conn.commit()
-            message = f"Scan recorded: 'In' at {location_name}"
-            if resident_not_found:
-                message += f" Unknown resident with MDOC '{mdoc}' added to database."
-            logger.info(f"Initial scan for MDOC '{mdoc}': In at {location_name}")
-            return _format_return_message(message, resident_not_found)
+        except Exception:
+            conn.rollback()
+            raise
+        publish_scan_event()
+        return message
 
     except sqlite3.Error as e:
         logger.error(f"Database error during scan for MDOC '{mdoc}': {e}")
@@ -110,6 +89,79 @@ def process_scan(mdoc: str, prefix: str) -> str:
         logger.error(f"Unexpected error during scan for MDOC '{mdoc}': {e}")
         return f"Unexpected error: {str(e)}"
 
+def begin_immediate(conn: sqlite3.Connection) -> None:
+    """
+    Start a write transaction, taking the RESERVED lock up front.
+
+    Any implicit transaction left open on the connection is committed first so
+    the scan runs in a transaction of its own.
+
+    Args:
+        conn: Database connection.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+
+def _record_scan(cursor: sqlite3.Cursor, mdoc: str, location_name: str) -> str:
+    """
+    Apply the scan rules for a resident inside the caller's transaction.
+
+    Args:
+        cursor: Database cursor with an open transaction.
+        mdoc: The resident's MDOC identifier.
+        location_name: The resolved location name.
+
+    Returns:
+        A message indicating the result of the scan operation.
+    """
+    cursor.execute(SELECT_RESIDENT_SQL, (mdoc,))
+    resident_not_found = cursor.fetchone() is None
+    if resident_not_found:
+        cursor.execute(INSERT_UNKNOWN_RESIDENT_SQL, (mdoc, "Update Resident"))
+        logger.info(f"Added unknown resident with MDOC '{mdoc}' to database.")
+
+    cursor.execute(SELECT_LAST_SCAN_SQL, (mdoc,))
+    last_scan = cursor.fetchone()
+
+    # Use configured timezone for current time
+    now = datetime.now(APP_TIMEZONE)
+    scan_time = now
+    out_time = now - timedelta(seconds=1)
+
+    if last_scan:
+        last_location, last_status, last_timestamp = last_scan
+        # Parse stored timestamp as configured timezone
+        last_timestamp = APP_TIMEZONE.localize(datetime.strptime(last_timestamp, "%Y-%m-%d %H:%M:%S"))
+
+        if (now - last_timestamp).total_seconds() < TOO_SOON_SECONDS:
+            logger.info(f"Ignored rapid scan for MDOC '{mdoc}' at {location_name}")
+            return f"Scan ignored: too soon since last scan."
+
+        if last_status == 'In' and last_location != location_name:
+            # Missed Out scan — record Out for last location, then In for current
+            insert_scan(cursor, mdoc, out_time, 'Out', last_location)
+            insert_scan(cursor, mdoc, scan_time, 'In', location_name)
+            message = f"Scan recorded: 'Out' at {last_location}, 'In' at {location_name} (missed scan corrected)"
+            logger.info(f"Missed scan corrected for MDOC '{mdoc}': Out at {last_location}, In at {location_name}")
+            return _format_return_message(message, resident_not_found)
+
+        if last_location == location_name:
+            # Same location, toggle In/Out
+            status = 'Out' if last_status == 'In' else 'In'
+            insert_scan(cursor, mdoc, scan_time, status, location_name)
+            message = f"Scan recorded: '{status}' at {location_name}"
+            logger.info(f"Toggled scan for MDOC '{mdoc}': {status} at {location_name}")
+            return _format_return_message(message, resident_not_found)
+
+    # Default to 'In'
+    insert_scan(cursor, mdoc, scan_time, 'In', location_name)
+    message = f"Scan recorded: 'In' at {location_name}"
+    if resident_not_found:
+        message += f" Unknown resident with MDOC '{mdoc}' added to database."
+    logger.info(f"Initial scan for MDOC '{mdoc}': In at {location_name}")
+    return _format_return_message(message, resident_not_found)
+
 def insert_scan(cursor: sqlite3.Cursor, mdoc: str, timestamp: datetime, status: str, location: str) -> None:
     """
     Insert a scan record into the scans table.
@@ -123,31 +175,39 @@ def insert_scan(cursor: sqlite3.Cursor, mdoc: str, timestamp: datetime, status:
     """
     # Ensure timestamp is in configured timezone and format as string
     timestamp_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute("""
-        INSERT INTO scans (mdoc, timestamp, status, location)
-        VALUES (?, ?, ?, ?)
-    """, (mdoc, timestamp_str, status, location))
+    cursor.execute(INSERT_SCAN_SQL, (mdoc, timestamp_str, status, location))
+    update_current_status(cursor, mdoc, timestamp_str, status, location)
     logger.debug(f"Inserted scan: {mdoc=} {status=} {location=} {timestamp_str=}")
 
-def get_location_name_by_prefix(prefix: str) -> Optional[str]:
+def update_current_status(cursor: sqlite3.Cursor, mdoc: str, timestamp: str, status: str, location: str) -> None:
+    """
+    Upsert the resident's row in resident_current_status.
+
+    Must run in the same transaction as the scans insert it mirrors.
+
+    Args:
+        cursor: Database cursor.
+        mdoc: The resident's MDOC identifier.
+        timestamp: The stored scan timestamp string.
+        status: The scan status.
+        location: The location name.
+    """
+    cursor.execute(UPSERT_CURRENT_STATUS_SQL, (mdoc, location, status, timestamp))
+
+def get_location_name_by_prefix(prefix: str, conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
     """
-    Get location name by prefix (case-insensitive).
+    Get location name by prefix (case-insensitive) from the location registry.
 
     Args:
         prefix: The location prefix.
+        conn: Optional connection to use. Defaults to the request's connection from get_db().
 
     Returns:
         The location name or None if not found.
     """
     try:
-        with sqlite3.connect(Config.DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT name FROM locations WHERE UPPER(prefix) = UPPER(?)",
-                (prefix.strip(),)
-            )
-            row = cursor.fetchone()
-            return row[0] if row else None
+        location = get_location_by_prefix(prefix, conn)
+        return location['name'] if location else None
     except sqlite3.Error as e:
         logger.error(f"Failed to fetch location for prefix '{prefix}': {e}")
         return None
@@ -0,0 +1,104 @@
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from rezscan_app.models.migrations import ROLLUP_BACKFILL
+from rezscan_app.utils.scan_logic import APP_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+# Heatmap windows offered to users, in days
+HEATMAP_RANGES = {'1 day': 1, '7 days': 7, '30 days': 30, '90 days': 90}
+DEFAULT_HEATMAP_RANGE = '1 day'
+
+def heatmap_start_hour(date_filter: str) -> str:
+    """First hour bucket ('YYYY-MM-DD HH:00', configured timezone) of a heatmap window."""
+    days = HEATMAP_RANGES.get(date_filter, HEATMAP_RANGES[DEFAULT_HEATMAP_RANGE])
+    return (datetime.now(APP_TIMEZONE) - timedelta(days=days)).strftime('%Y-%m-%d %H:00')
+
+def read_occupancy_heatmap(conn: sqlite3.Connection, start_hour: str) -> dict:
+    """
+    Build the occupancy heatmap from scan_rollup_hourly.
+
+    Columns are the hours from start_hour on in which any location saw a
+    scan. Each cell is the location's occupancy (residents in, never below
+    zero) at the end of that hour, carried forward through hours in which
+    the location itself had no scans.
+
+    Args:
+        conn: Database connection.
+        start_hour: First hour bucket to include.
+
+    Returns:
+        Dict with locations, time_buckets and values (one row per location).
+    """
+    c = conn.cursor()
+    # Occupancy going into the window, from each location's last earlier hour.
+    # Locations are walked with one (location, hour) key seek each rather
+    # than a scan of the table, then each one's latest row is a seek too.
+    c.execute('''
+        WITH RECURSIVE locations(location) AS (
+            SELECT MIN(location) FROM scan_rollup_hourly
+            UNION ALL
+            SELECT (SELECT MIN(location) FROM scan_rollup_hourly WHERE location > locations.location)
+            FROM locations
+            WHERE location IS NOT NULL
+        )
+        SELECT location, (
+            SELECT occupancy FROM scan_rollup_hourly
+            WHERE location = locations.location AND hour < ?
+            ORDER BY hour DESC
+            LIMIT 1
+        ) AS occupancy
+        FROM locations
+        WHERE location IS NOT NULL
+    ''', (start_hour,))
+    current = {location: occupancy for location, occupancy in c.fetchall() if occupancy is not None}
+
+    c.execute('''
+        SELECT hour, location, occupancy
+        FROM scan_rollup_hourly
+        WHERE hour >= ?
+        ORDER BY hour
+    ''', (start_hour,))
+    rows = c.fetchall()
+
+    locations = sorted(set(current) | {row[1] for row in rows})
+    position = {location: i for i, location in enumerate(locations)}
+    values = [[] for _ in locations]
+    time_buckets = []
+    i = 0
+    while i < len(rows):
+        hour = rows[i][0]
+        while i < len(rows) and rows[i][0] == hour:
+            current[rows[i][1]] = rows[i][2]
+            i += 1
+        time_buckets.append(hour)
+        for location in locations:
+            values[position[location]].append(max(current.get(location, 0), 0))
+
+    # Locations that stayed empty for the whole window add nothing to the map
+    keep = [j for j, row in enumerate(values) if any(row)]
+    return {
+        'locations': [locations[j] for j in keep],
+        'time_buckets': time_buckets,
+        'values': [values[j] for j in keep]
+    }
+
+def rebuild_hourly_rollups(conn: sqlite3.Connection) -> int:
+    """
+    Recreate scan_rollup_hourly from the full scans table.
+
+    The caller is responsible for committing.
+
+    Args:
+        conn: Database connection.
+
+    Returns:
+        The number of (location, hour) rollups written.
+    """
+    c = conn.cursor()
+    c.execute("DELETE FROM scan_rollup_hourly")
+    c.execute(ROLLUP_BACKFILL)
+    count = c.rowcount
+    logger.info(f"Rebuilt scan_rollup_hourly with {count} rollups")
+    return count
@@ -1,5 +1,21 @@
+import multiprocessing
+import os
 import re
-from PyPDF2 import PdfReader
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+TIME_HEADER_PATTERN = re.compile(r"(\d{1,2}:\d{2})\s*[-–]\s*(\d{1,2}:\d{2})", re.IGNORECASE)
+
+# pdfium is not thread-safe and uploads are parsed on job worker threads, so
+# every in-process use of it (page counts, small documents) holds this lock
+_pdfium_lock = threading.Lock()
+
+# Started on the first large upload and kept for the life of the worker:
+# spawning processes costs far more than extracting a typical schedule
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
 
 def parse_source_line(line):
     result = {
@@ -34,44 +50,141 @@ def parse_source_line(line):
                 break
 
     return result
-def parse_schedule_blocks(pdf_path):
-    text = ""
-    with open(pdf_path, "rb") as f:
-        reader = PdfReader(f)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
+def _extract_page_range(task):
+    """Process pool worker: return the text of pages [start, stop) of a PDF."""
+    import pypdfium2 as pdfium
+    pdf_path, start, stop = task
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        texts = []
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return texts
+    finally:
+        pdf.close()
 
-    return parse_ocr_text(text)
+def _extract_page_range_locked(task):
+    """In-process extraction, serialized with every other pdfium call in this process."""
+    with _pdfium_lock:
+        return _extract_page_range(task)
 
-def parse_ocr_text(raw_text):
-    blocks = []
-    lines = raw_text.splitlines()
-    current_block = None
+def _get_pool(workers):
+    """Return the shared extraction pool, (re)starting it with the given number of processes."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn, not fork: the caller is usually a job thread in a multi-threaded server
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+def _discard_pool(pool):
+    """Forget a pool whose processes died, so the next upload starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+def iter_pdf_pages(pdf_path, workers=4, pages_per_task=10, on_page=None, parallel_min_pages=100):
+    """
+    Yield the text of each page of a PDF, in order.
+
+    Pages are extracted with pdfium in chunks of pages_per_task. Documents of
+    at least parallel_min_pages pages are spread over a long-lived process
+    pool (at most one process per CPU), and pages are yielded as soon as
+    their chunk is done. Shorter documents are extracted in this process,
+    where pdfium calls are serialized by a module lock.
+
+    Args:
+        pdf_path: Path of the PDF.
+        workers: Maximum worker processes; 1 extracts in this process.
+        pages_per_task: Pages extracted per worker task.
+        on_page: Optional callable(done, total) called after each page.
+        parallel_min_pages: Smallest document handed to the process pool.
+    """
+    # Imported here: parse_source_line is used on every review page, pdfium only for uploads
+    import pypdfium2 as pdfium
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            total = len(pdf)
+        finally:
+            pdf.close()
 
-    time_header_pattern = re.compile(r"(\d{1,2}:\d{2})\s*[-–]\s*(\d{1,2}:\d{2})", re.IGNORECASE)
+    tasks = [(pdf_path, start, min(start + pages_per_task, total)) for start in range(0, total, pages_per_task)]
+    workers = min(workers, len(tasks), os.cpu_count() or 1)
+    pool = None
+    if workers > 1 and total >= parallel_min_pages:
+        pool = _get_pool(workers)
+        futures = [pool.submit(_extract_page_range, task) for task in tasks]
+        chunks = (future.result() for future in futures)
+    else:
+        futures = []
+        chunks = (_extract_page_range_locked(task) for task in tasks)
+
+    done = 0
+    try:
+        for texts in chunks:
+            for text in texts:
+                done += 1
+                if on_page:
+                    on_page(done, total)
+                yield text
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+def iter_schedule_blocks(lines):
+    """
+    Group schedule lines into blocks as they arrive.
+
+    A line with a time range, or starting with wc/cr/rm/unit, opens a new
+    block; other non-blank lines are residents of the current block.
+
+    Args:
+        lines: Iterable of text lines.
 
+    Yields:
+        Dicts with title, time and residents.
+    """
+    current_block = None
     for line in lines:
         line = line.strip()
         if not line:
             continue
 
         # Detect a new block header
-        if time_header_pattern.search(line) or line.lower().startswith(("wc", "cr", "rm", "unit")):
+        header = TIME_HEADER_PATTERN.search(line)
+        if header or line.lower().startswith(("wc", "cr", "rm", "unit")):
             if current_block:
-                blocks.append(current_block)
+                yield current_block
             current_block = {
                 "title": line,
-                "time": time_header_pattern.search(line).group(0) if time_header_pattern.search(line) else None,
+                "time": header.group(0) if header else None,
                 "residents": []
             }
-        else:
-            if current_block:
-                current_block["residents"].append(line)
+        elif current_block:
+            current_block["residents"].append(line)
 
     if current_block:
-        blocks.append(current_block)
+        yield current_block
 
-    return blocks
+def iter_pdf_schedule_blocks(pdf_path, workers=4, pages_per_task=10, on_page=None, parallel_min_pages=100):
+    """Yield schedule blocks from a PDF while its pages are still being extracted."""
+    pages = iter_pdf_pages(pdf_path, workers, pages_per_task, on_page, parallel_min_pages)
+    return iter_schedule_blocks(line for text in pages for line in text.splitlines())
 
+def parse_schedule_blocks(pdf_path, workers=4, pages_per_task=10, on_page=None, parallel_min_pages=100):
+    return list(iter_pdf_schedule_blocks(pdf_path, workers, pages_per_task, on_page, parallel_min_pages))
+
+def parse_ocr_text(raw_text):
+    return list(iter_schedule_blocks(raw_text.splitlines()))